@@ -1,14 +1,23 @@
 from .preprocessing_hypotheses import (
     compute_verknuepfung_hypotheses,
     compute_verknuepfung_h2_hypotheses,
+    compute_strong_answer_ranking,
     compute_strong_counts_hypotheses)
 
+from association_scan import compute_association_scan
+
 import QUESTION_LIST as hyp_const
+import src.plotting.plotting_config as cfg
+from Umfrage_JG_Analyse.preprocessing_jg_analyse import df_jg_dict
+
+# gu_kmu + segmentation cube of the JG jobs (same fingerprint -> built once per run)
+SHARED_JG_JOBS = [job for job in df_jg_dict if job["key"] in ("gu_kmu", "cube")]
 
-df_hypotheses_dict = [
+df_hypotheses_dict = SHARED_JG_JOBS + [
     {
         "key": "H1",
         "func": compute_verknuepfung_hypotheses,
+        "needs": ["df_tidy", "bootstrap", "weights"],
         "params": {
             "initial_question": hyp_const.Q2,
             "target_question": hyp_const.Q11,
@@ -17,6 +26,7 @@ df_hypotheses_dict = [
     {
         "key": "H2",
         "func": compute_verknuepfung_h2_hypotheses,
+        "needs": ["df_tidy", "bootstrap", "weights"],
         "params": {
             "initial_question": hyp_const.Q4,
             "target_question": hyp_const.Q11
@@ -25,35 +35,54 @@ df_hypotheses_dict = [
     {
         "key": "H3",
         "func": compute_verknuepfung_hypotheses,
+        "needs": ["df_tidy", "bootstrap", "weights"],
         "params": {
             "initial_question": hyp_const.Q10,
             "target_question": hyp_const.Q11,
         }
     },
+    {
+        # strong answers (spec "strong_answers") of every matrix / likert item, per segment
+        "key": "strong_answers",
+        "func": compute_strong_answer_ranking,
+        "needs": ["cube", "strong_sets"],
+    },
     {
         "key": "H4.1",
         "func": compute_strong_counts_hypotheses,
+        "needs": ["strong_answers"],
         "params": {
             "target_question": hyp_const.Q31,
-            "strong_set": hyp_const.STRONG_CATEGORY_HEMMNIS
         },
-
     },
     {
         "key": "H4.2",
         "func": compute_strong_counts_hypotheses,
+        "needs": ["strong_answers"],
         "params": {
             "target_question": hyp_const.Q32,
-            "strong_set": hyp_const.STRONG_CATEGORY_ZUSTIMMUNG
         },
     },
     {
         "key": "H4.3",
         "func": compute_strong_counts_hypotheses,
+        "needs": ["strong_answers"],
         "params": {
             "target_question": hyp_const.Q33,
-            "strong_set": hyp_const.STRONG_CATEGORY_HEMMNIS
         },
     }
 
-]
\ No newline at end of file
+]
+
+# exploratory: Cramér's V for every pair of single / likert questions, checkbox options
+# and ordinal matrix items
+if cfg.ASSOCIATION_SCAN:
+    df_hypotheses_dict.append({
+        "key": "association_scan",
+        "func": compute_association_scan,
+        "needs": ["df_tidy"],
+        "params": {
+            "max_categories": cfg.ASSOCIATION_MAX_CATEGORIES,
+            "min_n": cfg.ASSOCIATION_MIN_N,
+        },
+    })
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import  Optional,List,Tuple
+from typing import  Optional,List,Tuple,Callable
 import matplotlib.ticker as mtick
 import numpy as np
 import pandas as pd
@@ -7,6 +7,11 @@ import matplotlib.pyplot as plt
 import src.plotting.plotting_config as cfg
 import src.plotting.plotting_helper as helper
 from pathlib import Path
+import textwrap
+from matplotlib.colors import LinearSegmentedColormap
+from render_cache import RenderManifest, fingerprint, config_fingerprint, source_fingerprint
+from association_scan import association_matrix
+from logger import span
 
 
 
@@ -17,12 +22,14 @@ def plot_diverging(
     df_hypotheses: pd.DataFrame,
     ylabel: str,
     show_n_in_labels: bool = False,
+    show_ci: bool = True,
 ) -> plt.Figure:
     """
     Creates a diverging horizontal bar plot:
       left  = NO (negative)
       right = YES (positive)
     Ticks shown as 0..100% on both sides (abs formatter).
+    Error bars if the frame has bootstrap CIs (yes_pct_lo/_hi, no_pct_lo/_hi) and show_ci.
     Legend outside top-right like your "single question" plotting_function_jg_analyse.
     """
 
@@ -48,6 +55,10 @@ def plot_diverging(
     ax.barh(y, -no, color=cfg.PALETTE[2], label="noch nicht umgesetzt")
     ax.barh(y,  yes, color=cfg.PALETTE[0], label="bereits umgesetzt")
 
+    # bootstrap CIs (no side is drawn negative -> mirrored interval)
+    if show_ci and {"yes_pct_lo", "yes_pct_hi", "no_pct_lo", "no_pct_hi"} <= set(df.columns):
+        helper._draw_ci(ax, y, yes, df["yes_pct_lo"].to_numpy(float), df["yes_pct_hi"].to_numpy(float))
+        helper._draw_ci(ax, y, -no, -df["no_pct_hi"].to_numpy(float), -df["no_pct_lo"].to_numpy(float))
 
     # middle line
     ax.axvline(0, color=cfg.PALETTE[0], lw=1.2, alpha=0.8)
@@ -147,11 +158,16 @@ def plot_diverging_h2(df_hypotheses: pd.DataFrame) -> plt.Figure:
 # ============================================================
 def plot_netzdiagramm(
     df_hypotheses: "pd.Series",
+    k: int = 5,
 ):
+    """
+    Radar chart of the top-k items of a strong-answer Series (item -> n_strong), e.g.
+    H4.x or strong_series(df_hypotheses["strong_answers"], question, segmentation, segment)
+    for any matrix / likert question with "strong_answers" in the spec.
+    """
     # --- 1) Top-k auswählen (und NaNs absichern) ---
     s = df_hypotheses.dropna().sort_values(ascending=False)
 
-    k = 5 # nur 5 am meisten ausgewählte options
     r_step = 5
 
     s = s.head(k)
@@ -197,10 +213,41 @@ def plot_netzdiagramm(
     ax.tick_params(labelsize=cfg.FONT_LEGEND_SIZE)
 
     for a, v in zip(angles, values):
-        ax.text(a, v +2, f"{int(v)}", ha="center", va="center", fontsize=10)
+        ax.text(a, v +2, f"{v:.0f}", ha="center", va="center", fontsize=10)
+
+    return fig
+
+# ============================================================
+# Association scan (exploratory)
+# ============================================================
+def plot_association_heatmap(
+    scan: pd.DataFrame,
+    top: int = cfg.ASSOCIATION_HEATMAP_TOP,
+) -> plt.Figure:
+    """
+    Cramér's V heatmap of the `top` variables with the strongest associations
+    (ranked table of association_scan.py); empty cells = not tested / same question.
+    """
+    m = association_matrix(scan, top=top)
+    labels = helper._wrap_labels([textwrap.shorten(lab, 90, placeholder=" …") for lab in m.index], width=45, max_lines=2)
+
+    fig = plt.figure(figsize=cfg.FIGSIZE)
+    ax = fig.add_axes([cfg.AX_BOX_LEFT, cfg.AX_BOX_BOTTOM, cfg.AX_BOX_WIDTH, cfg.AX_BOX_HEIGHT])
+
+    cmap = LinearSegmentedColormap.from_list("cramers_v", ["#FFFFFF", cfg.ACATECH_BLUE])
+    cmap.set_bad("#F2F2F2")
+    im = ax.imshow(np.ma.masked_invalid(m.to_numpy(float)), cmap=cmap, vmin=0, vmax=1, aspect="auto")
+
+    ax.set_xticks(np.arange(len(labels)))
+    ax.set_yticks(np.arange(len(labels)))
+    ax.set_xticklabels(labels, rotation=90, fontsize=cfg.FONT_LEGEND_SIZE)
+    ax.set_yticklabels(labels, fontsize=cfg.FONT_LEGEND_SIZE)
 
+    cbar = fig.colorbar(im, ax=ax, fraction=0.04, pad=0.02)
+    cbar.set_label("Cramér's V")
     return fig
 
+
 def plot_hypotheses_and_save(
     df_hypotheses: dict,
     out_dir: Path,
@@ -215,15 +262,26 @@ def plot_hypotheses_and_save(
     captions: List[str] = []
     prefix_index = 1
 
-    def save(fig, caption_text: str, safe_name: str):
+    # incremental render (see render_cache.py): the figure is only drawn when its data,
+    # caption / file name, the plot config or the plotting code changed
+    manifest = RenderManifest(out_dir)
+    static_hash = fingerprint(config_fingerprint(), source_fingerprint(plot_hypotheses_and_save))
+
+    def save(draw: Callable[[], plt.Figure], data, caption_text: str, safe_name: str):
         nonlocal prefix_index
 
         cap = f"Abbildung {prefix_index}: {caption_text}"
-        helper._add_caption(fig, cap)
 
         filename = f"{prefix_index:02d}_{safe_name}.{cfg.SAVE_FORMAT}"
         out_path = out_dir / filename
-        helper._save_fig(fig, out_path)
+
+        digest = fingerprint(data, cap, filename, static_hash)
+        if manifest.lookup(filename, digest) is None:
+            with span("figure", figure=filename):
+                fig = draw()
+                helper._add_caption(fig, cap)
+                helper._save_fig(fig, out_path)
+            manifest.record(filename, digest, [out_path])
 
         out_paths.append(out_path)
         captions.append(cap)
@@ -234,59 +292,74 @@ def plot_hypotheses_and_save(
     # --- plotting_function_hypotheses ---
 
     # ------H1--------
-    fig = plot_diverging_h1(
-        df_hypotheses=df_hypotheses["H1"],
-        ylabel="Anzahl der Beschäftigten",
-        show_n_in_labels=False,
-    )
-
-    save(fig, caption_text="Hypothese 1 – Größere Unternehmen setzen häufiger bereits Kreislaufwirtschaft um als kleine Unternehmen.",
-         safe_name="Hypothese 1 – Größere Unternehmen setzen häufiger bereits Kreislaufwirtschaft um als kleine Unternehmen.")
+    save(
+        lambda: plot_diverging_h1(
+            df_hypotheses=df_hypotheses["H1"],
+            ylabel="Anzahl der Beschäftigten",
+            show_n_in_labels=False,
+        ),
+        df_hypotheses["H1"],
+        caption_text="Hypothese 1 – Größere Unternehmen setzen häufiger bereits Kreislaufwirtschaft um als kleine Unternehmen.",
+        safe_name="Hypothese 1 – Größere Unternehmen setzen häufiger bereits Kreislaufwirtschaft um als kleine Unternehmen.")
 
 
     # --- H2 ---
-    fig = plot_diverging_h2(
-        df_hypotheses=df_hypotheses["H2"])
-
-    save(fig, caption_text="Hypothese 2 – Branchen mit hohen Materialkosten sind eher bereit, Kreislaufwirtschaft umzusetzen als Branchen mit geringeren Materialkosten.",
-         safe_name="Hypothese 2 – Branchen mit hohen Materialkosten sind eher bereit, Kreislaufwirtschaft umzusetzen als Branchen mit geringeren Materialkosten.")
+    save(
+        lambda: plot_diverging_h2(
+            df_hypotheses=df_hypotheses["H2"]),
+        df_hypotheses["H2"],
+        caption_text="Hypothese 2 – Branchen mit hohen Materialkosten sind eher bereit, Kreislaufwirtschaft umzusetzen als Branchen mit geringeren Materialkosten.",
+        safe_name="Hypothese 2 – Branchen mit hohen Materialkosten sind eher bereit, Kreislaufwirtschaft umzusetzen als Branchen mit geringeren Materialkosten.")
 
     # --- H3 ---
 
-    fig = plot_diverging(
-        df_hypotheses=df_hypotheses["H3"],
-        ylabel="Monatliche Stückzahl",
-        show_n_in_labels=False,
-    )
-
-    save(fig,caption_text="Hypothese 3 – Kleinserien oder Einzelanfertigungen eignen sich für die Wiederaufbereitung eher als Großserienprodukte.",
+    save(
+        lambda: plot_diverging(
+            df_hypotheses=df_hypotheses["H3"],
+            ylabel="Monatliche Stückzahl",
+            show_n_in_labels=False,
+        ),
+        df_hypotheses["H3"],
+        caption_text="Hypothese 3 – Kleinserien oder Einzelanfertigungen eignen sich für die Wiederaufbereitung eher als Großserienprodukte.",
         safe_name="Hypothese 3 – Kleinserien oder Einzelanfertigungen eignen sich für die Wiederaufbereitung eher als Großserienprodukte.")
 
 
     # --- H4.1  ---
 
-    fig = plot_netzdiagramm(
-        df_hypotheses=df_hypotheses["H4.1"],
-    )
-
-    save(fig,caption_text="Top-5 bewertete Hemmnisse für die Umsetzung von Kreislaufwirtschaft in Unternehmen.",
-         safe_name="Top-5 bewertete Hemmnisse für die Umsetzung von Kreislaufwirtschaft in Unternehmen.")
+    save(
+        lambda: plot_netzdiagramm(
+            df_hypotheses=df_hypotheses["H4.1"],
+        ),
+        df_hypotheses["H4.1"],
+        caption_text="Top-5 bewertete Hemmnisse für die Umsetzung von Kreislaufwirtschaft in Unternehmen.",
+        safe_name="Top-5 bewertete Hemmnisse für die Umsetzung von Kreislaufwirtschaft in Unternehmen.")
 
 
     # ------H4.2 ----------
-    fig = plot_netzdiagramm(
-        df_hypotheses=df_hypotheses["H4.2"] )
-
-    save(fig,caption_text="Top-5 bewertete Zustimmung zur Aussage der Umsetzung von CE bezogen auf die Wettbewerbsfähigkeit",
-         safe_name="Top-5 bewertete Zustimmung zur Aussage der Umsetzung von CE bezogen auf die Wettbewerbsfähigkeit")
+    save(
+        lambda: plot_netzdiagramm(
+            df_hypotheses=df_hypotheses["H4.2"] ),
+        df_hypotheses["H4.2"],
+        caption_text="Top-5 bewertete Zustimmung zur Aussage der Umsetzung von CE bezogen auf die Wettbewerbsfähigkeit",
+        safe_name="Top-5 bewertete Zustimmung zur Aussage der Umsetzung von CE bezogen auf die Wettbewerbsfähigkeit")
 
     #------H4.3 ----------
-    fig = plot_netzdiagramm(
-        df_hypotheses=df_hypotheses["H4.3"],
-    )
-
-    save(fig,caption_text="Top-5 der bewerteten Hemmnisse für die Elementen der Umsetzung zirkulärer Wertschöpfungsprozesse",
-         safe_name="Top-5 der bewerteten Hemmnisse für die Elementen der Umsetzung zirkulärer Wertschöpfungsprozesse")
+    save(
+        lambda: plot_netzdiagramm(
+            df_hypotheses=df_hypotheses["H4.3"],
+        ),
+        df_hypotheses["H4.3"],
+        caption_text="Top-5 der bewerteten Hemmnisse für die Elementen der Umsetzung zirkulärer Wertschöpfungsprozesse",
+        safe_name="Top-5 der bewerteten Hemmnisse für die Elementen der Umsetzung zirkulärer Wertschöpfungsprozesse")
+
+    #------Association scan (optional) ----------
+    scan = df_hypotheses.get("association_scan")
+    if scan is not None and len(scan):
+        save(
+            lambda: plot_association_heatmap(scan),
+            scan,
+            caption_text="Stärkste Zusammenhänge zwischen den Fragen (Cramér's V, explorativ)",
+            safe_name="Zusammenhaenge Cramers V")
 
     return out_paths, captions
 
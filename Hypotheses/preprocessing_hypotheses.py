@@ -5,6 +5,14 @@ import QUESTION_LIST as hyp_const
 import textwrap
 from typing import Dict
 
+from answer_matrix import answer_matrix_of
+from job_graph import run_jobs
+from bootstrap import bootstrap_ratio
+from weighting import weights_for
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.segmentation_cube import (
+    SegmentationCube, TOTAL_SEGMENTATION, TOTAL_SEGMENT,
+)
+
 
 #-----------------
 #Preprocessing Helper
@@ -35,96 +43,146 @@ def _add_material_cost_group(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 # For H1,H2,H3
-def compute_verknuepfung_hypotheses(df_tidy: pd.DataFrame,initial_question:str,target_question:str) -> pd.DataFrame:
+def compute_verknuepfung_hypotheses(df_tidy: pd.DataFrame,initial_question:str,target_question:str,bootstrap: dict | None = None,weights: pd.Series | None = None) -> pd.DataFrame:
 
     """
     For single-select grouping question:
     returns df with columns: group, yes_n, no_n, base_n, yes_pct, no_pct
+    (+ rest_yes_n, rest_no_n if the groups overlap (checkbox): yes / no outside the group)
+    (+ yes_pct_lo/_hi, no_pct_lo/_hi with bootstrap settings, see bootstrap.py)
+    weights: respondent weights (weighting.py) -> counts are sums of weights
+
+    Runs on the answer matrix (no merge): every (respondent, initial answer) is
+    combined with all target rows of that respondent, as an inner join would.
     """
-    df = df_tidy.copy()
-    group_initial = df[df["question_text"] == initial_question][["respondent_id", "answer"]].rename(columns={"answer": "initial_question_label"})
-    group_target = df[df["question_text"] == target_question][["respondent_id", "answer"]].rename(columns={"answer": "target_question"})
-
-    m = group_initial.merge(group_target, on="respondent_id", how="inner")
-    m["target_question"] = m["target_question"].astype(str)
-
-    m["is_yes"] = m["target_question"].str.strip().str.lower().eq("ja")
-    m["is_no"]  = m["target_question"].str.strip().str.lower().eq("nein")
-
-    agg = (
-        m.groupby("initial_question_label", dropna=False)
-        .agg(
-            yes_n=("is_yes", "sum"),
-            no_n=("is_no", "sum"),
-            base_n=("target_question", "count"),
-        )
-        .reset_index()
-        .rename(columns={"group": "label"})
-    )
+    am = answer_matrix_of(df_tidy)
+
+    # initial answers per respondent (checkbox: several labels)
+    group_n, labels, group_na = am.answer_counts(initial_question)
+
+    # target rows / yes / no per respondent (answer text compared like str.strip().lower())
+    target_n, target_labels, target_na = am.answer_counts(target_question)
+    norm = np.array([str(a).strip().lower() for a in target_labels], dtype=object)
+    rows = target_n.sum(axis=1) + target_na
+    yes = target_n[:, norm == "ja"].sum(axis=1)
+    no = target_n[:, norm == "nein"].sum(axis=1)
+    if weights is not None:
+        w = weights_for(weights, am.respondents)
+        rows, yes, no = rows * w, yes * w, no * w
+
+    # groups sorted like groupby(dropna=False): labels first, missing answer last
+    order = sorted(range(len(labels)), key=lambda k: labels[k])
+    group_n = np.column_stack([group_n[:, order], group_na])
+    group_labels = [labels[k] for k in order] + [np.nan]
+
+    agg = pd.DataFrame({
+        "initial_question_label": pd.Series(group_labels, dtype=object),
+        "yes_n": group_n.T @ yes,
+        "no_n": group_n.T @ no,
+        "base_n": group_n.T @ rows,
+    })
+    # only groups that have target rows (inner join)
+    keep = agg["base_n"].to_numpy() > 0
+    agg = agg[keep].reset_index(drop=True)
 
     agg["yes_pct"] = np.where(agg["base_n"] > 0, agg["yes_n"] / agg["base_n"] * 100, 0.0)
     agg["no_pct"]  = np.where(agg["base_n"] > 0, agg["no_n"]  / agg["base_n"] * 100, 0.0)
 
+    # checkbox grouping question: groups overlap -> yes / no of the respondents outside
+    # each group, so every group is tested on its own (selected vs not, significance.py)
+    member = group_n[:, keep] > 0
+    if (member.sum(axis=1) > 1).any():
+        agg["rest_yes_n"] = (~member).T @ yes
+        agg["rest_no_n"] = (~member).T @ no
+
+    if bootstrap is not None:
+        # resample respondents: yes / no rows over target rows, per group (one pass for both)
+        g = group_n[:, keep]
+        num = np.hstack([g * yes[:, None], g * no[:, None]])
+        den = np.hstack([g * rows[:, None]] * 2)
+        lo, hi = bootstrap_ratio(num, den, bootstrap, scale=100.0)
+        k = g.shape[1]
+        agg["yes_pct_lo"], agg["yes_pct_hi"] = lo[:k], hi[:k]
+        agg["no_pct_lo"], agg["no_pct_hi"] = lo[k:], hi[k:]
+
     out = agg
     return out
 
-def compute_verknuepfung_h2_hypotheses(df_tidy: pd.DataFrame,initial_question:str,target_question:str,)-> pd.DataFrame:
-    out2 = compute_verknuepfung_hypotheses(df_tidy=df_tidy,initial_question=initial_question,target_question=target_question)
+def compute_verknuepfung_h2_hypotheses(df_tidy: pd.DataFrame,initial_question:str,target_question:str,bootstrap: dict | None = None,weights: pd.Series | None = None)-> pd.DataFrame:
+    out2 = compute_verknuepfung_hypotheses(df_tidy=df_tidy,initial_question=initial_question,target_question=target_question,bootstrap=bootstrap,weights=weights)
     out2_final = _add_material_cost_group(out2)
     return out2_final
 
 
-def compute_strong_counts_hypotheses(
-    df_tidy: pd.DataFrame,
-    target_question: str,
-    strong_set: set[str],
-) -> pd.Series:
+def strong_answer_sets(catalog: list[dict]) -> Dict[str, list[str]]:
+    """spec-declared strong answers ("strong_answers") per matrix / likert question"""
+    return {
+        q["question_text"]: list(q["strong_answers"])
+        for q in catalog
+        if q.get("strong_answers") and str(q.get("type", "")).lower() in {"matrix", "likert"}
+    }
+
+
+def compute_strong_answer_ranking(cube: SegmentationCube, strong_sets: Dict[str, list[str]]) -> pd.DataFrame:
+    """
+    Strong-answer counts, shares and ranks of all items of all questions in strong_sets,
+    for all respondents and every segment of the cube, in one pass (cube.strong_table).
+    """
+    return cube.strong_table(strong_sets)
 
-    d = df_tidy[df_tidy["question_text"] == target_question].copy()
 
-    d = d[d["answer"].notna()]
-    d = d[d["answer"].isin(strong_set)]
+def strong_series(
+    strong_answers: pd.DataFrame,
+    question_text: str,
+    segmentation: str = TOTAL_SEGMENTATION,
+    segment: str = TOTAL_SEGMENT,
+    value: str = "n_strong",
+) -> pd.Series:
+    """
+    One question / segment of the strong-answer ranking as item -> value (n_strong or share),
+    sorted descending, ties by item label (the order of the former groupby("item") counts,
+    so the same items make the top-k of the radar charts): the input of plot_netzdiagramm.
+    """
+    d = strong_answers[
+        (strong_answers["question_text"] == question_text)
+        & (strong_answers["segmentation"] == segmentation)
+        & (strong_answers["segment"] == segment)
+        & (strong_answers["n_strong"] > 0)
+    ]
+    d = d.sort_values([value, "item"], ascending=[False, True], kind="stable")
+    return d.set_index("item")[value]
 
-    # count per item (dimension)
 
-    counts = d.groupby("item")["respondent_id"].nunique().sort_values(ascending=False)
-    return counts
+# For H4.1, H4.2, H4.3
+def compute_strong_counts_hypotheses(
+    strong_answers: pd.DataFrame,
+    target_question: str,
+) -> pd.Series:
+    """respondents with a strong answer per item of target_question (all respondents)"""
+    return strong_series(strong_answers, target_question)
 
 
 
-def get_df_hypotheses(df_tidy, hypotheses_config):
+def get_df_hypotheses(df_tidy, hypotheses_config, bootstrap=None, weights=None, strong_sets=None):
     """
-    Runs hypothesis jobs defined in hypotheses_config.
+    Runs hypothesis jobs defined in hypotheses_config
+    (job_graph.run_jobs: concurrent + memoized by df_tidy / params fingerprint).
 
     Each job must have:
       - key: str
       - func: callable
       - params: dict (optional)
+      - needs: inputs, context values or keys of other jobs (optional), e.g. ["df_tidy"],
+        ["bootstrap"] (CI settings, see bootstrap.py), ["weights"] (respondent weights,
+        see weighting.py; None = unweighted) or ["strong_sets"] (strong_answer_sets)
 
     All funcs are called like:
-      func(df_tidy=df_tidy, **params)
+      func(**needs, **params)
     """
-    results = {}
-
-    for job in hypotheses_config:
-        key = job["key"]
-        func = job["func"]
-        params = job.get("params", {}) or {}
-
-        # --- Optional: quick validation for nicer errors ---
-        if not callable(func):
-            raise TypeError(f"[{key}] 'func' is not callable: {func}")
-
-        try:
-            out = func(df_tidy=df_tidy, **params)
-        except TypeError as e:
-            # Provide a helpful debug message (common in config-driven pipelines)
-            raise TypeError(
-                f"Error running hypothesis '{key}' with func='{getattr(func, '__name__', str(func))}'.\n"
-                f"Passed params: {params}\n"
-                f"Original error: {e}"
-            ) from e
-
-        results[key] = out
-
-    return results
+    context = {
+        "df_tidy": df_tidy,
+        "bootstrap": bootstrap,
+        "weights": weights,
+        "strong_sets": strong_sets or {},
+    }
+    return run_jobs(list(hypotheses_config), context)
@@ -1,5 +1,3 @@
-import numpy as np
-
 # NOT COMPLETED QUESTION LIST
 # ONLY NEEDED TO PREPROCESSING JG ANALYSE, HYPOTHESES AND PLOTTING QUESTION
 
@@ -30,34 +28,7 @@ Q31 = "In welchem Maß stellen die folgenden Punkte ein Hemmnis für die Umsetzu
 Q32 = "Inwieweit stimmen Sie folgenden Aussagen zur Umsetzung von Kreislaufwirtschaft bezogen auf die Wettbewerbsfähigkeit aus der Sicht Ihres Unternehmens zu?"
 Q33 = "In welchen Lebenszyklusphasen bzw. Elementen des zirkulären Wertschöpfungsprozesses sehen Sie die größten Hemmnisse für die Umsetzung zirkulärer Wertschöpfungsprozesse?"
 
-# --- Likert mappings (H4) ---
-LIKERT_HEMMNIS_MAPPING = {
-    "Kein Hemmnis": 1,
-    "Geringes Hemmnis": 2,
-    "Mittleres Hemmnis": 3,
-    "Starkes Hemmnis": 4,
-    "Sehr starkes Hemmnis": 5,
-    "Keine Antwort": np.nan,
-}
-
-LIKERT_ZUSTIMMUNG_MAPPING = {
-    "Keine Zustimmung": 1,
-    "Geringe Zustimmung": 2,
-    "Teilweise Zustimmung": 3,
-    "Hohe Zustimmung": 4,
-    "Sehr hohe Zustimmung": 5,
-    "Keine Antwort": np.nan,
-}
-
-LIKERT_Q16_MAPPING = {
-    "Keine Erfassung": 1,
-    "Manuelle Erfassung, keine Nutzung": 2,
-    "Manuelle Erfassung, manuelle Auswertung": 3,
-    "Automatisierte Erfassung, manuelle Auswertung": 4,
-    "Automatisierte Erfassung, automatisierte Auswertung": 5,
-    "Keine Antwort": np.nan,
-
-}
+# --- Likert scales: "ordinal" questions of question_spec.json (likert_codes.py) ---
 
 # H2: Material-cost grouping + sorting + marking
 
@@ -78,11 +49,24 @@ LOW_COST_INDUSTRIES = {
     "Papierbranche",
 }
 
-#H4: Kategorisierung der Hemmnisse
+#H4: strong answers per matrix / likert question: "strong_answers" in question_spec.json
 
-STRONG_CATEGORY_HEMMNIS = {"Starkes Hemmnis", "Sehr starkes Hemmnis"}
-STRONG_CATEGORY_ZUSTIMMUNG = {"Hohe Zustimmung ", "Sehr hohe Zustimmung"}
 
 #Valid answer list
 VALID_ANSWERS_Q17 = ["Im Einsatz", "In Planung"]
 VALID_ANSWERS_YN = ["Ja", "Nein"]
+
+#Segmentations of the segmentation cube (Umfrage_JG_Analyse/preprocessing_jg_analyse/segmentation_cube.py)
+#  "question": segments = answers of that question (checkbox: one segment per option)
+#  "mapping":  segments = values of a respondent mapping (column) passed to the cube
+SEGMENTATIONS = [
+    {"key": "company_size", "mapping": "gu_kmu", "column": "company_size_class"},
+    {"key": "branche", "question": Q4},
+    {"key": "stueckzahl", "question": Q10},
+    {"key": "kreislaufwirtschaft", "question": Q11},
+]
+
+#Population marginals for survey weighting (weighting.py, plotting_config.WEIGHTING)
+#  {question_text: {answer: population share}}; checkbox questions: share per option
+#  e.g. {Q2: {"< 10": 0.62, "10 - 49": 0.25, "50 - 250": 0.10, "> 250": 0.03}, Q4: {"Maschinenbau": 0.15, ...}}
+WEIGHTING_TARGETS = {}
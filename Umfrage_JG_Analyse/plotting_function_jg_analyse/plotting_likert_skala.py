@@ -13,6 +13,7 @@ def plot_grouped_likert_means(
     xlim: tuple[float, float] = (1, 5),
     xticks: tuple[int, ...] = (1, 2, 3, 4, 5),
     footnote_text: str = "n variiert je Dimension aufgrund fehlender Antworten.",
+    show_ci: bool = True,
 ) -> plt.Figure:
     """
     Required columns:
@@ -20,6 +21,7 @@ def plot_grouped_likert_means(
       - company_size_class
       - value
       - n_total
+    Optional: value_lo, value_hi (bootstrap CIs) -> error bars if show_ci
     """
 
     d = df_plot[df_plot["question_text"] == question_texts].copy()
@@ -67,6 +69,20 @@ def plot_grouped_likert_means(
     ax.barh(y + off, v2, height=h, color=cfg.PALETTE[1], label=legend_label(group_order[0]))
     ax.legend(fontsize=cfg.FONT_LEGEND_SIZE)
 
+    # bootstrap CIs of the means
+    if show_ci and {"value_lo", "value_hi"} <= set(d.columns):
+        def ci_of(g: str, col: str):
+            return (
+                d[d["company_size_class"] == g]
+                .assign(item=lambda x: x["item"].astype(str))
+                .set_index("item")[col]
+                .reindex(labels)
+                .to_numpy(float)
+            )
+
+        helper._draw_ci(ax, y - off, v1, ci_of(group_order[1], "value_lo"), ci_of(group_order[1], "value_hi"))
+        helper._draw_ci(ax, y + off, v2, ci_of(group_order[0], "value_lo"), ci_of(group_order[0], "value_hi"))
+
 
     ax.set_yticks(y)
     ax.tick_params(labelsize=cfg.FONT_TICK)
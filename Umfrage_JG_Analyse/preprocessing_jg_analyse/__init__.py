@@ -1,5 +1,7 @@
 # Umfrage_JG_Analyse/preprocessing_jg_analyse/__init__.py
 
+from .gu_kmu_classification import gu_kmu_classification
+from .segmentation_cube import compute_segmentation_cube
 from .i_40_einsatz import compute_i40_einsatz_planung_summary
 from .zustimmung import compute_zustimmung_summary
 from .likert_skala import wrapper_all_likert_data_frame
@@ -8,35 +10,49 @@ from .crosstab_kw_mit_ks_und_zp import compute_kw_mit_kz_und_zp_summary
 from .crosstab_us_mit_ks_und_zp import compute_us_mit_ks_und_zp_summary
 
 
+# jobs run by get_df_jg (job_graph.run_jobs): "needs" are context values or outputs of
+# other jobs; "intermediate" jobs only feed other jobs and are computed only if needed
 df_jg_dict = [
+    {
+        "key": "gu_kmu",
+        "func": gu_kmu_classification,
+        "needs": ["df_tidy"],
+        "intermediate": True,
+    },
+    {
+        "key": "cube",
+        "func": compute_segmentation_cube,
+        "needs": ["df_tidy", "gu_kmu", "weights"],
+        "intermediate": True,
+    },
     {
         "key": "i40_einsatz_planung",
         "func": compute_i40_einsatz_planung_summary,
-        "needs": ["df_tidy", "gu_kmu"],
+        "needs": ["cube", "bootstrap"],
     },
     {
         "key": "zustimmung",
         "func": compute_zustimmung_summary,
-        "needs": ["df_tidy", "gu_kmu"],
+        "needs": ["cube", "bootstrap"],
     },
     {
         "key": "likert_mean",
         "func": wrapper_all_likert_data_frame,
-        "needs": ["df_tidy", "gu_kmu"],
+        "needs": ["cube", "bootstrap"],
     },
     {
         "key": "stueckzahl_kennzahlen",
         "func": compute_stueckzahl_kennzahlen_summary,
-        "needs": ["df_tidy"],
+        "needs": ["df_tidy", "weights", "bootstrap"],
     },
     {
         "key": "kw_mit_kz_und_zp",
         "func": compute_kw_mit_kz_und_zp_summary,
-        "needs": ["df_tidy"],
+        "needs": ["df_tidy", "weights", "bootstrap"],
     },
     {
         "key": "us_mit_ks_und_zp",
         "func": compute_us_mit_ks_und_zp_summary,
-        "needs": ["df_tidy"],
+        "needs": ["df_tidy", "weights", "bootstrap"],
     },
 ]
@@ -0,0 +1,175 @@
+# ------------------------------------------------------------
+# Crosstab engine: segment (question/item) x target (question/item)
+#
+# One call computes many pairs:
+#   - df_tidy is sliced ONCE for all questions involved
+#   - respondent / question / item / answer are integer-coded once
+#   - every distinct side (question, item, valid answers) becomes a
+#     respondent x answer indicator matrix via np.bincount (built once,
+#     shared by all pairs that use it)
+#   - n[segment, answer] = respondents with that segment AND that answer
+#     (indicator_seg.T @ indicator_target)
+#   - total[segment]     = respondents with that segment and any valid answer
+#
+# Counts are distinct respondents (same as merge + groupby-nunique);
+# with respondent weights (weighting.py) sums of their weights.
+# With bootstrap settings (bootstrap.py) pct gets a CI (pct_lo / pct_hi),
+# all pairs resampled in one pass.
+# Only observed (segment, answer) combinations are returned, sorted by
+# segment, answer.
+#
+# Pair spec (dict):
+#   analysis_key, segment_question, target_question      required
+#   segment_item, target_item                            None = whole question
+#   segment_answers, target_answers                      None = all answers
+#   denom_type                                           default "segment_valid_total"
+#
+# Output per pair: finalize_crosstab_output schema
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import QUESTION_LIST as const
+from bootstrap import bootstrap_ratio
+from tidy_access import select_questions
+from weighting import weights_for
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import finalize_crosstab_output
+
+COL_ID = const.COL_ID
+
+CROSSTAB_COLS = ["segment", "answer", "n", "total", "pct"]
+
+
+class _CodedTidy:
+    """integer codes of the df_tidy rows of all involved questions"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.resp, self.respondents = pd.factorize(df[COL_ID], sort=False)
+        self.question, self.questions = pd.factorize(df["question_text"], sort=False)
+        self.item, self.items = pd.factorize(df["item"], sort=False)
+        self.answer, self.answers = pd.factorize(df["answer"], sort=False)
+        self.n_resp = len(self.respondents)
+
+    def indicator(
+        self,
+        question: str,
+        item: Optional[str],
+        answers: Optional[Sequence[str]],
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        bool matrix respondent x answer (answer labels sorted) for one side
+        """
+        qpos = self.questions.get_indexer([question])[0]
+        mask = (self.question == qpos) & (self.answer >= 0) & (qpos >= 0)
+        if item is not None:
+            ipos = self.items.get_indexer([item])[0]
+            mask &= (self.item == ipos) & (ipos >= 0)
+        if answers is not None:
+            keep = self.answers.get_indexer(list(answers))
+            mask &= np.isin(self.answer, keep[keep >= 0])
+
+        # local answer codes in sorted label order (groupby order)
+        used = np.unique(self.answer[mask])
+        labels = [str(a) for a in self.answers[used]]
+        order = np.argsort(labels, kind="stable")
+        labels = [labels[i] for i in order]
+        local = np.empty(len(self.answers), dtype=np.intp)
+        local[used[order]] = np.arange(len(used))
+
+        n_ans = len(labels)
+        flat = self.resp[mask] * n_ans + local[self.answer[mask]]
+        ind = np.bincount(flat, minlength=self.n_resp * n_ans).reshape(self.n_resp, n_ans) > 0
+        return ind, labels
+
+
+def _crosstab_from_indicators(
+    seg: np.ndarray, seg_labels: List[str],
+    tar: np.ndarray, tar_labels: List[str],
+    w: Optional[np.ndarray] = None,
+    with_ratio: bool = False,
+) -> Tuple[pd.DataFrame, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    crosstab frame + (with_ratio, for the bootstrap) per respondent numerator / denominator
+    of every row's pct; both None otherwise (respondents x rows, only built when needed)
+    """
+    seg_i = seg.astype(np.int64) if w is None else seg * w[:, None]
+    n = seg_i.T @ tar.astype(np.int64)                  # segment x answer
+    total = seg_i.T @ tar.any(axis=1).astype(np.int64)  # segment
+
+    s_idx, a_idx = np.nonzero(n)
+    n_vals = n[s_idx, a_idx]
+    t_vals = total[s_idx]
+    dtype = int if w is None else float
+    df = pd.DataFrame({
+        "segment": np.array(seg_labels, dtype=object)[s_idx],
+        "answer": np.array(tar_labels, dtype=object)[a_idx],
+        "n": n_vals.astype(dtype),
+        "total": t_vals.astype(dtype),
+        "pct": np.where(t_vals > 0, n_vals / np.where(t_vals > 0, t_vals, 1) * 100.0, 0.0),
+    }, columns=CROSSTAB_COLS)
+    if not with_ratio:
+        return df, None, None
+    num = seg_i[:, s_idx] * tar[:, a_idx]
+    den = seg_i[:, s_idx] * tar.any(axis=1)[:, None]
+    return df, num, den
+
+
+def compute_crosstabs(
+    df_tidy: pd.DataFrame,
+    pairs: List[Dict[str, Any]],
+    weights: Optional[pd.Series] = None,
+    bootstrap: Optional[Dict[str, Any]] = None,
+) -> List[pd.DataFrame]:
+    """
+    All segment x target crosstabs of `pairs` in one pass over df_tidy.
+    Returns one finalize_crosstab_output frame per pair (same order).
+    weights: respondent weights (weighting.py) -> n / total are sums of weights
+    bootstrap: settings (bootstrap.py) -> CI of pct as pct_lo / pct_hi
+    """
+    questions = [p[k] for p in pairs for k in ("segment_question", "target_question")]
+    coded = _CodedTidy(select_questions(df_tidy, questions, columns=[COL_ID, "question_text", "item", "answer"]))
+
+    w = weights_for(weights, coded.respondents) if weights is not None else None
+
+    sides: Dict[Tuple, Tuple[np.ndarray, List[str]]] = {}
+
+    def side(question: str, item: Optional[str], answers: Optional[Sequence[str]]):
+        key = (question, item, tuple(answers) if answers is not None else None)
+        if key not in sides:
+            sides[key] = coded.indicator(question, item, answers)
+        return sides[key]
+
+    frames, nums, dens = [], [], []
+    for p in pairs:
+        seg, seg_labels = side(p["segment_question"], p.get("segment_item"), p.get("segment_answers"))
+        tar, tar_labels = side(p["target_question"], p.get("target_item"), p.get("target_answers"))
+
+        df, num, den = _crosstab_from_indicators(seg, seg_labels, tar, tar_labels, w, with_ratio=bootstrap is not None)
+        frames.append(df)
+        if bootstrap is not None:
+            nums.append(num)
+            dens.append(den)
+
+    if bootstrap is not None:
+        # one resampling pass for all pairs (same respondents)
+        lo, hi = bootstrap_ratio(np.hstack(nums), np.hstack(dens), bootstrap, scale=100.0)
+        bounds = np.cumsum([0] + [len(df) for df in frames])
+        for df, start, stop in zip(frames, bounds[:-1], bounds[1:]):
+            df["pct_lo"], df["pct_hi"] = lo[start:stop], hi[start:stop]
+
+    out = []
+    for p, df in zip(pairs, frames):
+        out.append(finalize_crosstab_output(
+            df,
+            analysis_key=p["analysis_key"],
+            segment_question=p["segment_question"],
+            target_question=p["target_question"],
+            target_item=p.get("target_item"),
+            denom_type=p.get("denom_type", "segment_valid_total"),
+        ))
+    return out
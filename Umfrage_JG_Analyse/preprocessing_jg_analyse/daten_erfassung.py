@@ -10,6 +10,7 @@
 from __future__ import annotations
 import pandas as pd
 import QUESTION_LIST as const
+from tidy_access import select_question
 from typing import List,Dict
 
 from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import finalize_matrix_output
@@ -37,7 +38,7 @@ def compute_data_capture_summary(
     """
 
     # 1) Filter question
-    df_data = df_tidy.loc[df_tidy["question_text"] == Q16,[COL_ID, "item", "answer"]].copy()
+    df_data = select_question(df_tidy, Q16, columns=[COL_ID, "item", "answer"])
     q_cat = _get_question_from_catalog(catalog, Q16)
 
     # 2) Merge GU/KMU
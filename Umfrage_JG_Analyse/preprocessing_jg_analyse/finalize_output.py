@@ -2,6 +2,8 @@
 from __future__ import annotations
 import pandas as pd
 
+from job_graph import run_jobs
+
 def finalize_crosstab_output(
     df: pd.DataFrame,
     *,
@@ -32,6 +34,8 @@ def finalize_crosstab_output(
         "n", "total", "pct",
         "denom_type",
     ]
+    # bootstrap CIs of pct (optional)
+    cols += [c for c in ("pct_lo", "pct_hi") if c in out.columns]
     return out[cols]
 
 
@@ -61,6 +65,8 @@ def finalize_matrix_output(
         "n", "total", "pct",
         "denom_type",
     ]
+    # bootstrap CIs of pct (optional)
+    cols += [c for c in ("pct_lo", "pct_hi") if c in out.columns]
     return out[cols]
 
 # output_contracts.py (same file)
@@ -93,21 +99,12 @@ def finalize_metric_output(
     ]
     return out[cols]
 
-def get_df_jg(df_jg_dict: dict, context: dict) -> dict:
+def get_df_jg(df_jg_dict: dict, context: dict, targets: list | None = None) -> dict:
     """
-    Runs each preprocessing job and returns:
-        results[job["key"]] = job["func"](**kwargs)
+    Runs the preprocessing jobs (job_graph.run_jobs: lazy, concurrent, memoized) and returns:
+        results[job["key"]] = job["func"](**inputs)
+    for every job that is not "intermediate" (gu_kmu, cube, ...), or for the given targets.
+    context["bootstrap"]: bootstrap CI settings (bootstrap.py), default None = no CIs.
+    context["weights"]: respondent weights (weighting.py), default None = unweighted.
     """
-    results = {}
-
-    for spec in df_jg_dict:
-        key = spec["key"]
-        func = spec["func"]
-        needs = spec.get("needs", [])
-
-        kwargs = {n: context[n] for n in needs}
-        df_jg_dict = func(**kwargs)
-
-        results[key] = df_jg_dict
-
-    return results
+    return run_jobs(df_jg_dict, {"bootstrap": None, "weights": None, **context}, targets=targets)
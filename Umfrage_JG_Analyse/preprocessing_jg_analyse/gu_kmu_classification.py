@@ -15,6 +15,7 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple
 
 import QUESTION_LIST as const
+from respondent_index import respondent_index_of
 
 COL_ID = const.COL_ID
 Q1 = const.Q1
@@ -22,43 +23,38 @@ Q2 = const.Q2
 Q3 = const.Q3
 
 
-def gu_kmu_classification(df_tidy: pd.DataFrame) ->(pd.DataFrame):
-
-    filter_ids = set(df_tidy.loc[
-                       (df_tidy["question_text"] == Q1) &
-                       (df_tidy["answer"].isin(["Produzierendes Unternehmen"])),
-                        COL_ID
-                   ])
+PRODUCING_ANSWERS = ["Produzierendes Unternehmen"]
+PRODUCING_OTHER_TEXTS = [
+    "Sonstiges: Ingenieurbüro",
+    "Sonstiges: Sondermaschinenbau + Service",
+    "Sonstiges: Sensortechnik-Unternehmen",
+]
+GU_EMPLOYEES = ["> 250"]
+GU_TURNOVER = ["> 250 Mio. EUR", "50 - 250 Mio. EUR"]
 
-    other_filter_ids = set(df_tidy.loc[
-                               (df_tidy["question_text"] == Q1) &
-        (df_tidy["other_text"].isin(["Sonstiges: Ingenieurbüro",
-                                     "Sonstiges: Sondermaschinenbau + Service",
-                                     "Sonstiges: Sensortechnik-Unternehmen"])),
-        COL_ID
-                         ])
 
-    merge_filter_ids = np.array(sorted(filter_ids | other_filter_ids))
-    n_filter_ids = int(len(merge_filter_ids))
+def gu_kmu_classification(df_tidy: pd.DataFrame) ->(pd.DataFrame):
 
-    # 2) only those respondents for Q2/Q3
-    out = (df_tidy[df_tidy[COL_ID].isin(merge_filter_ids) & df_tidy["question_text"].isin([Q2, Q3])]
-            .pivot_table(index=COL_ID, columns="question_text", values="answer", aggfunc="first")
-            .reset_index())
+    # sub-populations as respondent bitsets (respondent_index.py), no df_tidy scans
+    idx = respondent_index_of(df_tidy)
 
-    # 3) GU / KMU logic
-    kmu = ((out[Q2] != "> 250") |
-           ((out[Q3] == "< 5 Mio. EUR") |
-           (out[Q3] == "5 - 50 Mio. EUR")))
+    # 1) producing companies (answer or matching "Sonstiges" free text)
+    producing = idx.bits(Q1, answers=PRODUCING_ANSWERS) | idx.other_bits(Q1, PRODUCING_OTHER_TEXTS)
 
-    gu = ((out[Q2] == "> 250") &
-          ((out[Q3] == "> 250 Mio. EUR") |
-           (out[Q3] == "50 - 250 Mio. EUR")))
+    # 2) only those respondents for Q2/Q3 (at least one of both answered)
+    classified = producing & (idx.bits(Q2) | idx.bits(Q3))
 
-    out["company_size_class"] = np.where(gu, "GU", np.where(kmu, "KMU", "KMU"))
+    # 3) GU / KMU logic: GU = > 250 employees AND turnover >= 50 Mio; everything else KMU
+    gu = classified & idx.bits(Q2, answers=GU_EMPLOYEES) & idx.bits(Q3, answers=GU_TURNOVER)
 
-    df_size_class = out[[COL_ID, "company_size_class"]].copy()
+    ids = idx.ids(classified)
+    is_gu = idx.member(ids, gu)
+    order = np.argsort(ids, kind="stable")
 
-    counts = df_size_class["company_size_class"].value_counts().astype(int).to_dict()
+    df_size_class = pd.DataFrame({
+        COL_ID: pd.Series(ids[order]).infer_objects(),
+        "company_size_class": np.where(is_gu[order], "GU", "KMU").astype(object),
+    })
+    df_size_class.columns.name = "question_text"
 
     return df_size_class
@@ -1,8 +1,9 @@
 from __future__ import annotations
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import QUESTION_LIST as const
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.segmentation_cube import SegmentationCube
 from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import finalize_matrix_output
 from QUESTION_LIST import VALID_ANSWERS_Q17
 
@@ -18,58 +19,26 @@ def _get_question_from_catalog(catalog: List[Dict], question_text: str) -> Dict:
 
 
 def compute_i40_einsatz_planung_summary(
-    df_tidy: pd.DataFrame,
-    gu_kmu: pd.DataFrame
-        
+    cube: SegmentationCube,
+    segmentation: str = "company_size",
+    bootstrap: Optional[dict] = None,
 ) -> pd.DataFrame:
     """
     For each I4.0 item, compute counts & % of respondents in GU/KMU who chose each answer option.
     Denominator = total respondents per company_size_class (GU/KMU), as you described.
+    Read from the segmentation cube (any segmentation; default GU/KMU).
+    bootstrap: settings (bootstrap.py) -> CI columns pct_lo / pct_hi
     """
 
-    df_i40 = df_tidy.loc[df_tidy["question_text"] == Q17, [COL_ID, "item", "answer"]].copy()
+    t = cube.table(segmentation, Q17, answers=VALID_ANSWERS_Q17, bootstrap=bootstrap)
 
-    # merge class
-    df_i40 = df_i40.merge(gu_kmu, on=COL_ID, how="left").dropna(subset=["company_size_class"])
+    # complete grid: items answered (any row) by at least one classified respondent
+    has_rows = t.groupby("item", sort=False)["rows"].transform("sum") > 0
+    out = t[has_rows].rename(columns={"segment": "company_size_class"}).reset_index(drop=True)
 
-    # denominator: total respondents per group (from mapping, not from df_i40)
-    totals = (
-        gu_kmu.groupby("company_size_class")[COL_ID]
-                     .nunique()
-                     .rename("total")
-                     .reset_index()
-    )
-
-    # counts (unique respondents)
-    df_counts = (
-        df_i40[df_i40["answer"].isin(VALID_ANSWERS_Q17)]
-        .groupby(["item", "company_size_class", "answer"])[COL_ID]
-        .nunique()
-        .rename("n")
-        .reset_index()
-    )
-
-    # add totals & pct
-    out = df_counts.merge(totals, on="company_size_class", how="left")
-    out["pct"] = (out["n"] / out["total"]) * 100.0
-
-    # complete grid (fill missing with 0)
-    all_items = df_i40["item"].dropna().unique()
-    all_classes = gu_kmu["company_size_class"].dropna().unique()
-
-    full_idx = pd.MultiIndex.from_product(
-        [all_items, all_classes, VALID_ANSWERS_Q17],
-        names=["item", "company_size_class", "answer"]
-    )
-
-    out = (
-        out.set_index(["item", "company_size_class", "answer"])
-           .reindex(full_idx)
-           .reset_index()
-           .merge(totals, on="company_size_class", how="left", suffixes=("", "_tmp"))
-    )
-
-    out["n"] = out["n"].fillna(0).astype(int)
+    # combinations nobody chose: n = 0, total / pct NaN
+    missing = out["n"] == 0
+    out["total"] = out["total"].where(~missing) if missing.any() else out["total"]
     out["pct"] = (out["n"] / out["total"]) * 100.0
 
     out = finalize_matrix_output(
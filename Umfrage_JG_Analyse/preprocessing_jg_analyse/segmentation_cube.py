@@ -0,0 +1,364 @@
+# ------------------------------------------------------------
+# Segmentation cube: every (question, item, answer) x every segment
+#
+# Segmentations are declared in QUESTION_LIST.SEGMENTATIONS:
+#   {"key": ..., "question": Q}                        segments = answers of Q
+#                                                      (checkbox: one segment per option)
+#   {"key": ..., "mapping": name, "column": col}       segments = values of a
+#                                                      respondent mapping (e.g. gu_kmu)
+#
+# One pass on the answer matrix (answer_matrix.py):
+#   S  respondents x segments                 (membership, all segmentations)
+#   A  respondents x (question, item, answer) (one-hot answer codes)
+#   P  respondents x (question, item)         (respondent has a row)
+#   counts = S.T @ A,  rows = S.T @ P,  totals = column sums of S
+# All counts are distinct respondents. A new breakdown is one more entry in
+# SEGMENTATIONS; the summaries only look tables up (cube.table / cube.means).
+# S, A and P are bool; they are cast to numbers only inside the products and A / P are
+# not kept. Bootstrap CIs of the looked-up tables (bootstrap.py) use S (kept, bool) and
+# the one-hot columns they need, read off the answer codes (shared with the answer matrix).
+# Strong-answer rankings (cube.strong_table) sum the counts over each item's strong
+# answers: one product counts @ K for all items of all questions and all segments.
+# Likert means / medians / top-box shares (cube.means) reduce the ordinal int8 codes
+# of likert_codes.py (df_tidy.likert) per segment, without mapping answer labels.
+# With respondent weights w (weighting.py) every count is a sum of weights:
+#   counts = S.T @ (w * A),  rows = S.T @ (w * P),  totals = S.T @ w
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import QUESTION_LIST as const
+from answer_matrix import NO_ROW, answer_matrix_of
+from bootstrap import bootstrap_ratio
+from likert_codes import LikertCodes, likert_codes_of, ordinal_counts, ordinal_stats
+from weighting import weights_for
+from tidy_access import TidyLike
+
+COL_ID = const.COL_ID
+
+# all respondents in strong_table (segmentation / segment labels)
+TOTAL_SEGMENTATION = "total"
+TOTAL_SEGMENT = "Gesamt"
+
+
+class SegmentationCube:
+    def __init__(
+        self,
+        segmentations: Sequence[Dict[str, Any]],
+        segments: List[Tuple[str, str]],
+        columns: List[Tuple[str, Optional[str]]],
+        codebooks: List[List[str]],
+        counts: np.ndarray,
+        rows: np.ndarray,
+        totals: np.ndarray,
+        key_totals: np.ndarray,
+        member: np.ndarray,
+        codes: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        likert: Optional[LikertCodes] = None,
+    ):
+        self.segmentations = list(segmentations)
+        self.segments = segments        # (segmentation key, segment label)
+        self.columns = columns          # (question_text, item) of the answer matrix
+        self.codebooks = codebooks
+        self.counts = counts            # segments x answer keys
+        self.rows = rows                # segments x columns
+        self.totals = totals            # segments
+        self.key_totals = key_totals    # answer keys (all respondents)
+        self.member = member            # respondents x segments (bool)
+        self.codes = codes              # respondents x columns, answer codes (answer_matrix.py)
+        self.weights = weights          # respondents (None = unweighted)
+        self.likert = likert            # ordinal codes, rows = respondents (likert_codes.py)
+
+        self._offsets = np.concatenate([[0], np.cumsum([len(b) for b in codebooks])]).astype(np.intp)
+        # answer key -> (column, code)
+        self._key_col = np.repeat(np.arange(len(codebooks)), np.diff(self._offsets))
+        self._key_code = np.arange(self._offsets[-1]) - self._offsets[self._key_col]
+        self._q_cols: Dict[str, List[int]] = {}
+        for j, (q, _) in enumerate(columns):
+            self._q_cols.setdefault(q, []).append(j)
+
+    def segment_positions(self, segmentation: str) -> List[int]:
+        return [g for g, (key, _) in enumerate(self.segments) if key == segmentation]
+
+    def segment_labels(self, segmentation: str) -> List[str]:
+        return [self.segments[g][1] for g in self.segment_positions(segmentation)]
+
+    def segment_totals(self, segmentation: str) -> pd.DataFrame:
+        """segment | total (respondents in segment)"""
+        pos = self.segment_positions(segmentation)
+        return pd.DataFrame({
+            "segment": [self.segments[g][1] for g in pos],
+            "total": self.totals[pos],
+        })
+
+    def _answer_keys(self, j: int, labels: Sequence[str]) -> np.ndarray:
+        """positions of labels among the answer keys of column j (-1: not in the codebook)"""
+        book = self.codebooks[j]
+        k = np.array([book.index(a) if a in book else -1 for a in labels], dtype=np.intp)
+        return np.where(k >= 0, self._offsets[j] + k, -1)
+
+    def _onehot_of(self, keys: np.ndarray) -> np.ndarray:
+        """respondents x keys, bool (unknown keys -> all False)"""
+        k = np.maximum(keys, 0)
+        return (self.codes[:, self._key_col[k]] == self._key_code[k]) & (keys >= 0)
+
+    def _weighted(self, x: np.ndarray) -> np.ndarray:
+        """respondents x statistics, scaled by the respondent weights"""
+        return x if self.weights is None else x * self.weights[:, None]
+
+    def table(
+        self,
+        segmentation: str,
+        question_text: str,
+        answers: Optional[Sequence[str]] = None,
+        bootstrap: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Long table, one row per item x segment x answer (full grid, in column /
+        segment / answer order):
+          item | segment | answer | n | rows | total [| pct_lo | pct_hi]
+        n      respondents in segment with that answer
+        rows   respondents in segment with a row for the item (incl. no answer)
+        total  respondents in segment
+        answers: answer labels + order (default: codebook of each item)
+        bootstrap: settings (bootstrap.py) -> CI of n / total * 100 as pct_lo / pct_hi
+        """
+        pos = self.segment_positions(segmentation)
+        parts, nums, dens = [], [], []
+        for j in self._q_cols.get(question_text, []):
+            labels = list(answers) if answers is not None else self.codebooks[j]
+            # unknown answers -> zero counts
+            keys = self._answer_keys(j, labels)
+            n = np.where(keys >= 0, self.counts[np.ix_(pos, np.maximum(keys, 0))], 0)
+            if bootstrap is not None:
+                seg = self.member[:, pos]
+                nums.append((seg[:, :, None] & self._onehot_of(keys)[:, None, :]).reshape(len(seg), -1))
+                dens.append(np.repeat(seg, len(labels), axis=1))
+            parts.append(pd.DataFrame({
+                "item": self.columns[j][1],
+                "segment": np.repeat([self.segments[g][1] for g in pos], len(labels)),
+                "answer": np.tile(np.array(labels, dtype=object), len(pos)),
+                "n": n.ravel(),
+                "rows": np.repeat(self.rows[pos, j], len(labels)),
+                "total": np.repeat(self.totals[pos], len(labels)),
+            }))
+        if not parts:
+            return pd.DataFrame(columns=["item", "segment", "answer", "n", "rows", "total"])
+        out = pd.concat(parts, ignore_index=True)
+
+        if bootstrap is not None:
+            # one resampling pass for the whole table: share of segment members with the answer
+            out["pct_lo"], out["pct_hi"] = bootstrap_ratio(
+                self._weighted(np.hstack(nums)), self._weighted(np.hstack(dens)), bootstrap, scale=100.0
+            )
+        return out
+
+    def likert_counts(self, segmentation: str, question_text: str) -> Tuple[List[Optional[str]], List[str], np.ndarray]:
+        """
+        (items, segment labels, segments x items x (k + 1) counts of the ordinal codes);
+        slot 0 = "Keine Antwort", slot v = value v (likert_codes.ordinal_counts)
+        """
+        pos = self.segment_positions(segmentation)
+        lc = self.likert
+        if lc is None or question_text not in lc.scales:
+            return [], [self.segments[g][1] for g in pos], np.zeros((len(pos), 0, 1))
+        counts = ordinal_counts(
+            lc.codes_of(question_text), len(lc.scales[question_text]), self.member[:, pos], self.weights
+        )
+        return lc.items(question_text), [self.segments[g][1] for g in pos], counts
+
+    def means(
+        self,
+        segmentation: str,
+        question_text: str,
+        bootstrap: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Mean / median / top-box share of the ordinal codes per item x segment
+        ("Keine Antwort" excluded; items x segments without valid answers dropped):
+          item | segment | value | median | top_box_pct | n_valid | n_keine_antwort | total [| value_lo | value_hi]
+        bootstrap: settings (bootstrap.py) -> CI of the mean as value_lo / value_hi
+        """
+        items, labels, counts = self.likert_counts(segmentation, question_text)
+        pos = self.segment_positions(segmentation)
+        top = self.likert.top[question_text] if items else []
+        stats = ordinal_stats(counts, top)
+        n_items, n_seg = len(items), len(labels)
+
+        # segments x items -> items x segments (item-major rows)
+        flat = lambda x: np.asarray(x).T.ravel()
+        out = pd.DataFrame({
+            "item": np.repeat(np.array(items, dtype=object), n_seg),
+            "segment": np.tile(np.array(labels, dtype=object), n_items),
+            "value": flat(stats["mean"]),
+            "median": flat(stats["median"]),
+            "top_box_pct": flat(stats["top_box_pct"]),
+            "n_valid": flat(stats["n_valid"]),
+            "n_keine_antwort": flat(stats["n_keine_antwort"]),
+            "total": np.tile(np.asarray(self.totals[pos]), n_items),
+        })
+
+        if bootstrap is not None:
+            if n_items:
+                # per respondent: value + valid flag per item x segment
+                codes = self.likert.codes_of(question_text)
+                valid = codes > 0
+                seg = self.member[:, pos]
+                nums = (np.where(valid, codes, 0)[:, :, None] * seg[:, None, :]).reshape(len(codes), -1)
+                dens = (valid[:, :, None] & seg[:, None, :]).reshape(len(codes), -1)
+                lo, hi = bootstrap_ratio(self._weighted(nums.astype(np.float64)), self._weighted(dens.astype(np.float64)), bootstrap)
+                out = out.assign(value_lo=lo, value_hi=hi)
+            else:
+                out = out.assign(value_lo=np.nan, value_hi=np.nan)
+
+        out = out[out["n_valid"] > 0].reset_index(drop=True)
+        if self.weights is None:
+            out = out.astype({"n_valid": np.int64, "n_keine_antwort": np.int64})
+        return out
+
+
+    def strong_table(
+        self,
+        strong_sets: Dict[str, Sequence[str]],
+        segmentations: Optional[Sequence[str]] = None,
+        exclude_answers: Sequence[str] = ("Keine Antwort",),
+    ) -> pd.DataFrame:
+        """
+        Strong-answer ranking of every item of every question in strong_sets
+        ({question_text: strong answer labels}), for all respondents and every segment:
+          segmentation | segment | question_text | item | n_strong | n_valid | share | rank
+        n_strong  respondents with one of the strong answers for the item
+        n_valid   respondents with an answer other than exclude_answers
+        share     n_strong / n_valid * 100
+        rank      1 = most strong answers, within (segmentation, segment, question)
+        All respondents are segmentation TOTAL_SEGMENTATION / segment TOTAL_SEGMENT;
+        segmentations: keys to include (default: all of the cube).
+        """
+        cols = [j for q in strong_sets for j in self._q_cols.get(q, [])]
+        exclude = set(exclude_answers)
+
+        # answer key -> item column: strong answers (K) and valid answers (Kv)
+        K = np.zeros((int(self._offsets[-1]), len(cols)))
+        Kv = np.zeros_like(K)
+        for c, j in enumerate(cols):
+            strong = set(strong_sets[self.columns[j][0]])
+            for k, a in enumerate(self.codebooks[j]):
+                K[self._offsets[j] + k, c] = a in strong
+                Kv[self._offsets[j] + k, c] = a not in exclude
+
+        # rows: all respondents + the segments, one product for both tables
+        keys = [s["key"] for s in self.segmentations] if segmentations is None else list(segmentations)
+        pos = [g for key in keys for g in self.segment_positions(key)]
+        base = np.vstack([self.key_totals[None, :], self.counts[pos]])
+        n = base @ np.hstack([K, Kv])
+        n_strong, n_valid = n[:, :len(cols)], n[:, len(cols):]
+
+        seg_keys = [TOTAL_SEGMENTATION] + [self.segments[g][0] for g in pos]
+        seg_labels = [TOTAL_SEGMENT] + [self.segments[g][1] for g in pos]
+        out = pd.DataFrame({
+            "segmentation": np.repeat(np.array(seg_keys, dtype=object), len(cols)),
+            "segment": np.repeat(np.array(seg_labels, dtype=object), len(cols)),
+            "question_text": np.tile(np.array([self.columns[j][0] for j in cols], dtype=object), len(seg_keys)),
+            "item": np.tile(np.array([self.columns[j][1] for j in cols], dtype=object), len(seg_keys)),
+            "n_strong": n_strong.ravel() if self.weights is not None else n_strong.ravel().astype(np.int64),
+            "n_valid": n_valid.ravel() if self.weights is not None else n_valid.ravel().astype(np.int64),
+        })
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["share"] = np.where(out["n_valid"] > 0, out["n_strong"] / out["n_valid"] * 100.0, np.nan)
+        out["rank"] = (
+            out.groupby(["segmentation", "segment", "question_text"], sort=False)["n_strong"]
+            .rank(ascending=False, method="min")
+            .astype(np.int64)
+        )
+        return out
+
+
+def _question_segments(am, question: str) -> Tuple[np.ndarray, List[str]]:
+    counts, labels, _ = am.answer_counts(question)
+    return counts > 0, labels
+
+
+def _mapping_segments(am, mapping: pd.DataFrame, column: str) -> Tuple[np.ndarray, List[str]]:
+    m = mapping[[COL_ID, column]].dropna(subset=[column])
+    labels = [str(x) for x in m[column].unique()]
+    rows = pd.Index(am.respondents).get_indexer(pd.Index(m[COL_ID]))
+    seg = pd.Index(labels).get_indexer(m[column].astype(str))
+    member = np.zeros((am.n_respondents, len(labels)), dtype=bool)
+    ok = rows >= 0
+    member[rows[ok], seg[ok]] = True
+    return member, labels
+
+
+def _segment_sums(S: np.ndarray, X: np.ndarray, w: Optional[np.ndarray]) -> np.ndarray:
+    """S.T @ X for bool S / X (respondents x ...), cast for the product only; weighted: S.T @ (w * X)"""
+    if w is None:
+        return S.T.astype(np.int64) @ X.astype(np.int64)
+    return (S.T * w) @ X.astype(np.float64)
+
+
+def build_segmentation_cube(
+    df_tidy: TidyLike,
+    segmentations: Sequence[Dict[str, Any]],
+    mappings: Optional[Dict[str, pd.DataFrame]] = None,
+    weights: Optional[pd.Series] = None,
+    likert: Optional[LikertCodes] = None,
+) -> SegmentationCube:
+    """
+    counts for every (question, item, answer) x every declared segment, in one pass
+    weights: respondent weights (weighting.py) -> counts / rows / totals are sums of weights
+    likert: ordinal codes of df_tidy (likert_codes.py, same respondent rows) for cube.means
+    """
+    am = answer_matrix_of(df_tidy)
+    mappings = mappings or {}
+
+    # S: respondents x segments
+    blocks, segments = [], []
+    for s in segmentations:
+        if "mapping" in s:
+            member, labels = _mapping_segments(am, mappings[s["mapping"]], s["column"])
+        else:
+            member, labels = _question_segments(am, s["question"])
+        blocks.append(member)
+        segments += [(s["key"], lab) for lab in labels]
+    S = np.hstack(blocks) if blocks else np.zeros((am.n_respondents, 0), dtype=bool)
+
+    # A: one-hot answer codes, P: has a row (both bool, only needed for the products)
+    offsets = np.concatenate([[0], np.cumsum([len(b) for b in am.codebooks])]).astype(np.intp)
+    r, j = np.nonzero(am.codes >= 0)
+    A = np.zeros((am.n_respondents, int(offsets[-1])), dtype=bool)
+    A[r, offsets[j] + am.codes[r, j]] = True
+    P = am.codes != NO_ROW
+
+    w = weights_for(weights, am.respondents) if weights is not None else None
+    everyone = np.ones((am.n_respondents, 1), dtype=bool)
+    return SegmentationCube(
+        segmentations=segmentations,
+        segments=segments,
+        columns=list(am.columns),
+        codebooks=[list(b) for b in am.codebooks],
+        counts=_segment_sums(S, A, w),
+        rows=_segment_sums(S, P, w),
+        totals=S.sum(axis=0) if w is None else S.T @ w,
+        key_totals=_segment_sums(everyone, A, w)[0],
+        member=S,
+        codes=am.codes,
+        weights=w,
+        likert=likert,
+    )
+
+
+def compute_segmentation_cube(
+    df_tidy: TidyLike,
+    gu_kmu: pd.DataFrame,
+    weights: Optional[pd.Series] = None,
+) -> SegmentationCube:
+    """job entry point (df_jg_dict): the cube of QUESTION_LIST.SEGMENTATIONS"""
+    return build_segmentation_cube(
+        df_tidy, const.SEGMENTATIONS, {"gu_kmu": gu_kmu}, weights=weights, likert=likert_codes_of(df_tidy)
+    )
@@ -7,7 +7,9 @@
 
 from __future__ import annotations
 import pandas as pd
+from typing import Optional
 import QUESTION_LIST as const
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.segmentation_cube import SegmentationCube
 from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import finalize_matrix_output
 
 COL_ID = const.COL_ID
@@ -16,59 +18,21 @@ VALID_ANSWERS_YN = const.VALID_ANSWERS_YN
 
 
 def compute_zustimmung_summary(
-    df_tidy: pd.DataFrame,
-    gu_kmu: pd.DataFrame,
-
+    cube: SegmentationCube,
+    segmentation: str = "company_size",
+    bootstrap: Optional[dict] = None,
 ) -> pd.DataFrame:
 
+    # counts per item x class x valid answer (drops "Keine Antwort"), from the cube
+    # (bootstrap settings -> CI columns pct_lo / pct_hi)
+    t = cube.table(segmentation, Q20, answers=VALID_ANSWERS_YN, bootstrap=bootstrap)
 
-    df_q = df_tidy.loc[df_tidy["question_text"] == Q20, [COL_ID, "item", "answer"]].copy()
-
-    # 2) Merge GU/KMU
-    df_q = (
-        df_q.merge(gu_kmu, on=COL_ID, how="left")
-            .dropna(subset=["company_size_class"])
-    )
-
-    # 3) Keep valid answers only (drops "Keine Antwort")
-    df_q = df_q[df_q["answer"].isin(VALID_ANSWERS_YN)].copy()
-
-    # 4) Denominator per item+class (valid respondents)
-    totals = (
-        gu_kmu.groupby(["company_size_class"])[COL_ID]
-            .nunique()
-            .rename("total")
-            .reset_index()
-    )
-
-    # 5) Counts per answer
-    counts = (
-        df_q.groupby(["item", "company_size_class", "answer"])[COL_ID]
-            .nunique()
-            .rename("n")
-            .reset_index()
-    )
-
-    out = counts.copy()
-
-    # 7) Ensure full grid (fill missing with 0)
-    all_items = df_q["item"].dropna().unique()
-    all_classes = gu_kmu["company_size_class"].dropna().unique()
-
-    full_idx = pd.MultiIndex.from_product(
-        [all_items, all_classes, VALID_ANSWERS_YN],
-        names=["item", "company_size_class", "answer"]
-    )
-
-    out = (
-        out.set_index(["item", "company_size_class", "answer"])
-           .reindex(full_idx)
-           .reset_index()
-    )
+    # full grid over items with at least one valid answer (missing -> n 0, pct NaN)
+    has_valid = t.groupby("item", sort=False)["n"].transform("sum") > 0
+    out = t[has_valid].rename(columns={"segment": "company_size_class"}).reset_index(drop=True)
 
-    out = out.merge(totals, on="company_size_class", how="left")
-    out["pct"] = (out["n"] / out["total"]) * 100.0
-    out["n"] = out["n"].fillna(0).astype(int)
+    # denominator: respondents per class
+    out["pct"] = (out["n"].where(out["n"] > 0) / out["total"]) * 100.0
 
     out = finalize_matrix_output(
         out,
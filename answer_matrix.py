@@ -0,0 +1,245 @@
+# answer_matrix.py
+"""
+Dense respondent x question answer-code matrix (shared analysis substrate).
+
+One row per respondent, one column per
+  - (question_text, item)     single / likert (item None) and matrix questions
+  - (question_text, option)   checkbox questions (and any question with several rows per
+                              respondent): one column per option
+and one small integer per cell:
+  - code >= 0   index into the codebook of that column
+  - NA_ANSWER   the respondent has a row for the column, but no answer (NaN)
+  - NO_ROW      no row in df_tidy (not asked / skipped)
+Checkbox columns have the codebook [option] (0 = selected, NO_ROW = not selected).
+
+Codebooks follow the spec (catalog) order:
+  - single / likert / checkbox   options_order (checkbox: items_order = option columns)
+  - matrix                       answer_order, else options_order
+Answers that are not in the spec order are appended in order of appearance, so
+every answer of df_tidy has a code. Codes are int8 (int16 for codebooks > 127).
+
+Filters, crosstabs and means then run as array operations on .codes, without
+merging df_tidy slices on respondent_id.
+
+Built by prepare_data(answer_matrix=True) and attached to the TidyStore
+(df_tidy.answers); answer_matrix_of() returns it (or builds one without spec order).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tidy_access import TidyLike, TidyStore, as_frame, decode_column
+
+NO_ROW = -1
+NA_ANSWER = -2
+
+ColumnKey = Tuple[str, Optional[str]]
+
+
+@dataclass
+class AnswerMatrix:
+    respondents: np.ndarray          # respondent_id per row (order of first appearance)
+    columns: List[ColumnKey]         # (question_text, item / checkbox option)
+    multi: np.ndarray                # bool per column: checkbox option column
+    codebooks: List[List[str]]       # answer labels per column
+    codes: np.ndarray                # respondents x columns, int8 / int16
+    _col_index: Dict[ColumnKey, int] = field(default_factory=dict, repr=False)
+    _q_cols: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._col_index = {c: j for j, c in enumerate(self.columns)}
+        self._q_cols = {}
+        for j, (q, _) in enumerate(self.columns):
+            self._q_cols.setdefault(q, []).append(j)
+
+    @property
+    def n_respondents(self) -> int:
+        return len(self.respondents)
+
+    def question_columns(self, question_text: str) -> List[int]:
+        """all column positions of one question (items / checkbox options), in column order"""
+        return list(self._q_cols.get(question_text, []))
+
+    def column(self, question_text: str, item: Optional[str] = None) -> int:
+        """column position of (question, item); -1 if unknown"""
+        return self._col_index.get((question_text, item), -1)
+
+    def codes_of(self, question_text: str, item: Optional[str] = None) -> np.ndarray:
+        """codes of one column (all NO_ROW if the column does not exist)"""
+        j = self.column(question_text, item)
+        if j < 0:
+            return np.full(self.n_respondents, NO_ROW, dtype=self.codes.dtype)
+        return self.codes[:, j]
+
+    def code(self, question_text: str, item: Optional[str], answer: str) -> int:
+        """code of one answer label in one column; NO_ROW if unknown"""
+        j = self.column(question_text, item)
+        if j < 0:
+            return NO_ROW
+        book = self.codebooks[j]
+        return book.index(answer) if answer in book else NO_ROW
+
+    def isin(self, question_text: str, item: Optional[str], answers: Sequence[str]) -> np.ndarray:
+        """bool per respondent: answer of (question, item) is one of answers"""
+        j = self.column(question_text, item)
+        if j < 0:
+            return np.zeros(self.n_respondents, dtype=bool)
+        book = self.codebooks[j]
+        wanted = [book.index(a) for a in answers if a in book]
+        return np.isin(self.codes[:, j], wanted)
+
+    def answer_counts(self, question_text: str) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Per respondent: how many rows of the question carry each answer label
+        (over all items / checkbox options), like the rows of a df_tidy slice.
+        Returns (counts respondents x labels, labels, rows without answer per respondent).
+        """
+        cols = self.question_columns(question_text)
+        labels: List[str] = []
+        for j in cols:
+            labels += [a for a in self.codebooks[j] if a not in labels]
+        pos = {a: n for n, a in enumerate(labels)}
+
+        counts = np.zeros((self.n_respondents, len(labels)), dtype=np.int64)
+        na = np.zeros(self.n_respondents, dtype=np.int64)
+        for j in cols:
+            c = self.codes[:, j].astype(np.intp)
+            local = np.array([pos[a] for a in self.codebooks[j]], dtype=np.intp)
+            hit = c >= 0
+            np.add.at(counts, (np.flatnonzero(hit), local[c[hit]]), 1)
+            na += c == NA_ANSWER
+        return counts, labels, na
+
+    def decode(self, j: int) -> np.ndarray:
+        """labels of column j (object array; NaN for NO_ROW / NA_ANSWER)"""
+        book = np.array(self.codebooks[j] + [np.nan], dtype=object)
+        c = self.codes[:, j].astype(np.intp)
+        return book[np.where(c >= 0, c, len(book) - 1)]
+
+
+#---------------------
+#BUILD
+#---------------------
+
+def _spec_order(q: Optional[Dict[str, Any]]) -> List[str]:
+    if not q:
+        return []
+    qtype = str(q.get("type") or "").lower()
+    if qtype == "matrix":
+        return list(q.get("answer_order") or q.get("options_order") or [])
+    return list(q.get("options_order") or [])
+
+
+def build_answer_matrix(
+    df_tidy: TidyLike,
+    catalog: Optional[List[Dict[str, Any]]] = None,
+) -> AnswerMatrix:
+    """
+    Dense answer codes from df_tidy (frame, encoded frame or TidyStore).
+    catalog: spec order for the codebooks / checkbox option columns; without it,
+    codebooks are in order of appearance.
+    Questions with several rows per (respondent, item) are treated as checkbox columns
+    (catalog type or not); ValueError if such an item is not None (matrix with
+    several answers per item), which no column layout here can hold.
+    """
+    df = as_frame(df_tidy)
+    specs = {q["question_text"]: q for q in (catalog or [])}
+
+    qtext = decode_column(df["question_text"]).to_numpy()
+    item = decode_column(df["item"]).to_numpy()
+    answer = decode_column(df["answer"]).to_numpy()
+    resp_codes, respondents = pd.factorize(df["respondent_id"], sort=False)
+
+    # checkbox questions: catalog type, plus every (question, item) with several rows per
+    # respondent (one code per cell could only keep one of them)
+    q_codes, q_uniques = pd.factorize(pd.Series(qtext), sort=False)
+    qi = pd.DataFrame({"q": q_codes, "i": pd.Series(item).fillna("\0").to_numpy(), "r": resp_codes})
+    dup = qi.duplicated(["q", "i", "r"]).to_numpy()
+    multi_q = np.zeros(len(q_uniques), dtype=bool)
+    multi_q[qi.loc[dup, "q"].unique()] = True
+    if catalog is not None:
+        multi_q |= np.array([str(specs.get(q, {}).get("type", "")).lower() == "checkbox" for q in q_uniques], dtype=bool)
+    # option columns have no item: several answers per (respondent, item) do not fit
+    itemized = q_uniques[np.unique(q_codes[dup & pd.notna(item)])].tolist()
+    if itemized:
+        raise ValueError(f"answer matrix: several answers per respondent and item in {itemized}")
+    row_multi = multi_q[q_codes] if len(q_codes) else np.zeros(0, dtype=bool)
+
+    # column key per row (checkbox: the option; rows without option are dropped there)
+    key2 = np.where(row_multi, answer, item)
+    keep = ~(row_multi & pd.isna(answer))
+    keys = pd.DataFrame({"q": qtext[keep], "k": key2[keep]})
+    col_codes = keys.groupby(["q", "k"], sort=False, dropna=False).ngroup().to_numpy()
+    first = keys.assign(c=col_codes).drop_duplicates("c").sort_values("c")
+    observed_cols = [(q, None if pd.isna(k) else k) for q, k in zip(first["q"], first["k"])]
+
+    # column order: questions in order of appearance; checkbox options in spec order
+    col_order: List[int] = []
+    for q in dict.fromkeys(c[0] for c in observed_cols):
+        idx = [j for j, c in enumerate(observed_cols) if c[0] == q]
+        if multi_q[q_uniques.get_loc(q)]:
+            spec_opts = list(specs.get(q, {}).get("items_order") or specs.get(q, {}).get("options_order") or [])
+            rank = {o: n for n, o in enumerate(spec_opts)}
+            idx.sort(key=lambda j: rank.get(observed_cols[j][1], len(rank)))
+        col_order.append(idx)
+    col_order_flat = [j for idx in col_order for j in idx]
+    new_pos = np.empty(len(observed_cols), dtype=np.intp)
+    new_pos[col_order_flat] = np.arange(len(col_order_flat))
+    columns = [observed_cols[j] for j in col_order_flat]
+    col_codes = new_pos[col_codes]
+    multi = np.array([multi_q[q_uniques.get_loc(q)] for q, _ in columns], dtype=bool)
+
+    # codebooks + per-row answer code (via the unique (column, answer) pairs)
+    ans_kept = answer[keep]
+    ans_na = pd.isna(ans_kept)
+    pair_codes, pair_uniques = pd.factorize(
+        pd.MultiIndex.from_arrays([col_codes, np.where(ans_na, "", ans_kept)]), sort=False
+    )
+    codebooks: List[List[str]] = []
+    for j, (q, k) in enumerate(columns):
+        codebooks.append([k] if multi[j] else [str(a) for a in _spec_order(specs.get(q))])
+    pair_value = np.empty(len(pair_uniques), dtype=np.int64)
+    for n, (j, a) in enumerate(pair_uniques):
+        if multi[j]:
+            pair_value[n] = 0
+            continue
+        if a == "":
+            pair_value[n] = NA_ANSWER
+            continue
+        book = codebooks[j]
+        a = str(a)
+        if a not in book:
+            book.append(a)
+        pair_value[n] = book.index(a)
+    row_value = pair_value[pair_codes]
+    row_value[ans_na & ~multi[col_codes]] = NA_ANSWER
+
+    max_book = max((len(b) for b in codebooks), default=0)
+    dtype = np.int8 if max_book <= np.iinfo(np.int8).max else np.int16
+    codes = np.full((len(respondents), len(columns)), NO_ROW, dtype=dtype)
+    codes[resp_codes[keep], col_codes] = row_value.astype(dtype)  # one row per cell (see multi above)
+
+    return AnswerMatrix(
+        respondents=np.asarray(respondents),
+        columns=columns,
+        multi=multi,
+        codebooks=codebooks,
+        codes=codes,
+    )
+
+
+def answer_matrix_of(df_tidy: TidyLike) -> AnswerMatrix:
+    """
+    The answer matrix of df_tidy: the one attached by prepare_data(answer_matrix=True),
+    else built here (codebooks in order of appearance; cached on a TidyStore).
+    """
+    if isinstance(df_tidy, TidyStore):
+        if df_tidy.answers is None:
+            df_tidy.answers = build_answer_matrix(df_tidy)
+        return df_tidy.answers
+    return build_answer_matrix(df_tidy)
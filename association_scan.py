@@ -0,0 +1,258 @@
+# association_scan.py
+"""
+Exploratory all-pairs association scan (Cramér's V + chi-square).
+
+Variables come from the answer matrix (answer_matrix.py):
+  - single / likert questions   one variable, categories = answer codes
+                                (EXCLUDE_ANSWERS such as "Keine Antwort" are missing)
+  - checkbox questions          one binary variable per option
+                                (selected / not selected among respondents of the question)
+  - ordinal matrix items        one variable per item, named "question | item",
+                                categories = ordinal codes 1..k (likert_codes.py;
+                                "Keine Antwort" is missing)
+Other matrix items are not scanned, nor are variables with fewer than 2 or more than
+max_categories categories (free text).
+
+Every pair of variables of different questions (so no two options of one checkbox
+question; the items of one matrix are variables of their own and are paired)
+gets its contingency table over the respondents that have a value in both. Tables are built in chunks of pairs
+with one np.bincount on
+    pair * K * K + code_a * K + code_b          K = largest category count
+and tested together: Pearson chi-square (no continuity correction), p-value
+(significance.chi2_sf) and Cramér's V = sqrt(chi2 / (n * (min(r, c) - 1))),
+r / c counting non-empty rows / columns. Large scans spread the chunks over a
+process pool (ASSOCIATION_WORKERS in plotting_config).
+
+Result: one row per tested pair, ranked by Cramér's V:
+  rank | question_a | option_a | question_b | option_b | n | dof | chi2 | p_value | p_adj | cramers_v
+(option None for single / likert questions and matrix items; p_adj over all pairs
+of the scan).
+Pairs with n < min_n are not tested.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import src.plotting.plotting_config as cfg
+from answer_matrix import AnswerMatrix, answer_matrix_of
+from likert_codes import LikertCodes, likert_codes_of
+from significance import chi2_sf, p_adjust
+from tidy_access import TidyLike, TidyStore
+
+EXCLUDE_ANSWERS = ("Keine Antwort",)
+
+ITEM_SEP = " | "  # variable name of a matrix item: question | item
+
+# respondents x pairs values per chunk (memory bound of one bincount)
+CHUNK_CELLS = 20_000_000
+MAX_CHUNK = 2000
+
+# pair counts from which chunks go to a process pool (below: in-process)
+PARALLEL_MIN_PAIRS = 20_000
+
+SCAN_COLS = [
+    "rank", "question_a", "option_a", "question_b", "option_b",
+    "n", "dof", "chi2", "p_value", "p_adj", "cramers_v",
+]
+
+Variable = Tuple[str, Optional[str]]
+
+
+#---------------------
+#VARIABLES
+#---------------------
+
+def scan_variables(
+    am: AnswerMatrix,
+    max_categories: int = 15,
+    exclude_answers: Sequence[str] = EXCLUDE_ANSWERS,
+    likert: Optional[LikertCodes] = None,
+) -> Tuple[List[Variable], np.ndarray, np.ndarray]:
+    """
+    (variables (question, checkbox option / None), codes respondents x variables
+    (-1 = missing), category count per variable)
+    likert: ordinal codes (rows in answer matrix order) -> ordinal matrix items are scanned
+    """
+    ordinal = {key: c for c, key in enumerate(likert.columns)} if likert is not None else {}
+
+    answered = {}
+    for q in dict.fromkeys(q for q, _ in am.columns):
+        cols = am.question_columns(q)
+        answered[q] = (am.codes[:, cols] >= 0).any(axis=1)
+
+    variables: List[Variable] = []
+    columns: List[np.ndarray] = []
+    n_cat: List[int] = []
+    for j, (q, item) in enumerate(am.columns):
+        codes = am.codes[:, j].astype(np.intp)
+        if am.multi[j]:
+            variables.append((q, item))
+            columns.append(np.where(answered[q], (codes >= 0).astype(np.intp), -1))
+            n_cat.append(2)
+            continue
+        if item is not None:
+            # matrix item: only ordinal ones, codes 1..k -> 0..k-1
+            c = ordinal.get((q, item))
+            k = len(likert.scales[q]) if c is not None else 0
+            if not 2 <= k <= max_categories:
+                continue
+            codes = likert.codes[:, c].astype(np.intp)
+            variables.append((f"{q}{ITEM_SEP}{item}", None))
+            columns.append(np.where(codes > 0, codes - 1, -1))
+            n_cat.append(k)
+            continue
+        book = am.codebooks[j]
+        kept = [k for k, a in enumerate(book) if a not in exclude_answers]
+        if not 2 <= len(kept) <= max_categories:
+            continue
+        local = np.full(len(book) + 1, -1, dtype=np.intp)  # last slot: NO_ROW / NA_ANSWER
+        local[kept] = np.arange(len(kept))
+        variables.append((q, None))
+        columns.append(local[np.where(codes >= 0, codes, len(book))])
+        n_cat.append(len(kept))
+
+    V = np.column_stack(columns) if columns else np.zeros((am.n_respondents, 0), dtype=np.intp)
+    return variables, V.astype(np.int16), np.array(n_cat, dtype=np.intp)
+
+
+def scan_pairs(variables: Sequence[Variable]) -> Tuple[np.ndarray, np.ndarray]:
+    """(a, b) positions of all variable pairs a < b of different questions"""
+    a, b = np.triu_indices(len(variables), k=1)
+    questions = pd.factorize(pd.Series([q for q, _ in variables], dtype=object))[0]
+    keep = questions[a] != questions[b] if len(a) else np.zeros(0, dtype=bool)
+    return a[keep], b[keep]
+
+
+#---------------------
+#TABLES + STATISTICS (per chunk of pairs)
+#---------------------
+
+def contingency_tables(V: np.ndarray, k: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """pairs x k x k counts of (code of a, code of b) over respondents with both"""
+    va = V[:, a].astype(np.intp)
+    vb = V[:, b].astype(np.intp)
+    ok = (va >= 0) & (vb >= 0)
+    flat = (np.arange(len(a), dtype=np.intp) * k * k)[None, :] + va * k + vb
+    return np.bincount(flat[ok], minlength=len(a) * k * k).reshape(len(a), k, k)
+
+
+def _scan_chunk(V: np.ndarray, k: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """n, dof, chi2, cramers_v per pair (pairs x 4)"""
+    t = contingency_tables(V, k, a, b).astype(np.float64)
+    rows = t.sum(axis=2)
+    cols = t.sum(axis=1)
+    n = rows.sum(axis=1)
+    r = (rows > 0).sum(axis=1)
+    c = (cols > 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = rows[:, :, None] * cols[:, None, :] / n[:, None, None]
+        chi2 = np.where(expected > 0, (t - expected) ** 2 / expected, 0.0).sum(axis=(1, 2))
+        dof = (r - 1) * (c - 1)
+        v = np.sqrt(chi2 / (n * (np.minimum(r, c) - 1)))
+    ok = dof > 0
+    return np.column_stack([n, np.where(ok, dof, 0), np.where(ok, chi2, np.nan), np.where(ok, v, np.nan)])
+
+
+#---------------------
+#SCAN
+#---------------------
+
+def association_scan(
+    df_tidy: TidyLike,
+    max_categories: int = 15,
+    min_n: int = 20,
+    correction: Optional[str] = "fdr_bh",
+    workers: Optional[int] = None,
+    catalog: Optional[Sequence[Dict[str, Any]]] = None,
+) -> pd.DataFrame:
+    """
+    ranked association table of all variable pairs (see module doc)
+    catalog: spec questions for the ordinal matrix items, if df_tidy has no Likert
+    codes attached (prepare_data(likert_codes=True)); without either, no matrix items
+    """
+    am = answer_matrix_of(df_tidy)
+    attached = isinstance(df_tidy, TidyStore) and df_tidy.likert is not None
+    likert = likert_codes_of(df_tidy, catalog) if attached or catalog is not None else None
+    variables, V, n_cat = scan_variables(am, max_categories=max_categories, likert=likert)
+    a, b = scan_pairs(variables)
+    if not len(a):
+        return pd.DataFrame(columns=SCAN_COLS)
+
+    k = int(n_cat.max())
+    chunk = max(1, min(MAX_CHUNK, CHUNK_CELLS // max(1, am.n_respondents)))
+    starts = range(0, len(a), chunk)
+    parts_a = [a[s:s + chunk] for s in starts]
+    parts_b = [b[s:s + chunk] for s in starts]
+
+    workers = int(workers if workers is not None else cfg.ASSOCIATION_WORKERS)
+    if workers > 1 and len(parts_a) > 1 and len(a) >= PARALLEL_MIN_PAIRS:
+        # spawn: safe when called from the job runner's threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(parts_a)), mp_context=ctx) as pool:
+            parts = list(pool.map(_scan_chunk, [V] * len(parts_a), [k] * len(parts_a), parts_a, parts_b))
+    else:
+        parts = [_scan_chunk(V, k, pa, pb) for pa, pb in zip(parts_a, parts_b)]
+    stats = np.vstack(parts)
+
+    n, dof, chi2, v = stats.T
+    tested = (dof > 0) & (n >= min_n)
+    out = pd.DataFrame({
+        "question_a": [variables[i][0] for i in a],
+        "option_a": [variables[i][1] for i in a],
+        "question_b": [variables[i][0] for i in b],
+        "option_b": [variables[i][1] for i in b],
+        "n": n.astype(np.int64),
+        "dof": dof.astype(np.int64),
+        "chi2": chi2,
+        "cramers_v": v,
+    })[tested].reset_index(drop=True)
+
+    out["p_value"] = chi2_sf(out["chi2"].to_numpy(float), out["dof"].to_numpy(float))
+    out["p_adj"] = p_adjust(out["p_value"].to_numpy(float), correction)
+    out = out.sort_values(["cramers_v", "p_value"], ascending=[False, True], kind="stable", ignore_index=True)
+    out["rank"] = np.arange(1, len(out) + 1)
+    return out[SCAN_COLS]
+
+
+def compute_association_scan(
+    df_tidy: TidyLike,
+    max_categories: int = 15,
+    min_n: int = 20,
+) -> pd.DataFrame:
+    """job entry point (df_hypotheses_dict)"""
+    return association_scan(
+        df_tidy,
+        max_categories=max_categories,
+        min_n=min_n,
+        correction=cfg.SIGNIFICANCE_CORRECTION,
+    )
+
+
+def association_matrix(scan: pd.DataFrame, top: int = 20) -> pd.DataFrame:
+    """
+    Symmetric Cramér's V matrix of the `top` variables with the strongest
+    associations (variables as 'question' or 'question: option'), for the heatmap.
+    """
+    def label(q, o) -> str:
+        return str(q) if o is None or pd.isna(o) else f"{q}: {o}"
+
+    la = [label(q, o) for q, o in zip(scan["question_a"], scan["option_a"])]
+    lb = [label(q, o) for q, o in zip(scan["question_b"], scan["option_b"])]
+    strength = pd.concat([
+        pd.Series(scan["cramers_v"].to_numpy(float), index=la),
+        pd.Series(scan["cramers_v"].to_numpy(float), index=lb),
+    ]).groupby(level=0, sort=False).max()
+    keep = strength.sort_values(ascending=False, kind="stable").index[:top].tolist()
+
+    pos = {lab: i for i, lab in enumerate(keep)}
+    vals = np.full((len(keep), len(keep)), np.nan)
+    for x, y, val in zip(la, lb, scan["cramers_v"].to_numpy(float)):
+        if x in pos and y in pos:
+            vals[pos[x], pos[y]] = vals[pos[y], pos[x]] = val
+    return pd.DataFrame(vals, index=keep, columns=keep)
@@ -0,0 +1,82 @@
+# benchmarks/bench_normalize.py
+"""
+Benchmark: per-cell DataFrame.map vs. column-wise normalize_frame.
+
+Builds a wide synthetic survey export (strings, padding, Ja/Nein variants,
+empty cells, NaN) and checks that both variants give exactly the same frame.
+
+Run (from the repo root):
+    python -m benchmarks.bench_normalize
+    python -m benchmarks.bench_normalize --rows 50000 --cols 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import normalize_frame, normalize_str, normalize_yes_no
+
+VALUE_POOL = [
+    "Ja", " ja ", "JA", "Nein", "nein ", "Keine Antwort", "keineangabe", "k. a.", "K.A.",
+    "", "   ", "Hoher Mehrwert", "Sehr hoher Mehrwert ", " Geringes Hemmnis", "10 - 49",
+    "> 250", "Im Einsatz", "In Planung", "1", np.nan,
+]
+
+
+def make_wide_export(n_rows: int, n_cols: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    pool = np.empty(len(VALUE_POOL), dtype=object)
+    pool[:] = VALUE_POOL
+
+    data = {}
+    for i in range(n_cols):
+        # every column draws from a few answers, some columns are (almost) empty
+        k = rng.integers(2, len(pool) + 1)
+        choices = pool[rng.choice(len(pool), size=k, replace=False)]
+        col = choices[rng.integers(0, k, size=n_rows)]
+        if i % 25 == 0:
+            col = np.full(n_rows, np.nan, dtype=object)
+        data[f"Frage {i} [Item {i}]"] = col
+    return pd.DataFrame(data)
+
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--cols", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_wide_export(args.rows, args.cols)
+
+    def per_cell():
+        return df.map(normalize_str).map(normalize_yes_no)
+
+    expected = per_cell()
+    got = normalize_frame(df)
+    pd.testing.assert_frame_equal(got, expected)
+
+    t_map = _time(per_cell, args.repeat)
+    t_vec = _time(lambda: normalize_frame(df), args.repeat)
+
+    print(f"export:          {args.rows} rows x {args.cols} cols ({df.size:,} cells)")
+    print(f"DataFrame.map x2 {t_map:8.3f} s")
+    print(f"normalize_frame  {t_vec:8.3f} s")
+    print(f"speedup          {t_map / t_vec:8.1f}x  (results identical)")
+
+
+if __name__ == "__main__":
+    main()
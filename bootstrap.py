@@ -0,0 +1,97 @@
+# bootstrap.py
+"""
+Bootstrap confidence intervals for reported percentages and Likert means.
+
+Every reported statistic is a ratio over respondents:
+    stat[m] = sum_r num[r, m] / sum_r den[r, m]
+  - percentage    num = respondent has the answer (in the segment), den = respondent counts
+  - Likert mean   num = sum of mapped values,                     den = valid answers
+A bootstrap replicate resamples respondents with replacement, i.e. weights them with
+w ~ Multinomial(R, 1/R). All replicates of a chunk are one matrix product:
+    stats = (W @ num) / (W @ den)          W: replicates x respondents
+CIs are percentile intervals of the replicate statistics (NaN where a replicate has
+no respondents in the denominator are ignored).
+
+Reproducible: replicates are drawn in fixed-size chunks, each seeded from
+SeedSequence(seed).spawn(...), so results do not depend on the number of workers.
+Large replicate counts are spread over a process pool.
+
+Settings (plotting_config BOOTSTRAP_*), passed to the analysis jobs as the context
+value "bootstrap" (None = no CIs):
+    {"replicates": 2000, "seed": 42, "level": 0.95, "workers": 4}
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# weights per chunk: replicates x respondents values (memory bound of one matrix product)
+CHUNK_CELLS = 20_000_000
+MAX_CHUNK = 1000
+
+# replicate counts from which chunks go to a process pool (below: in-process)
+PARALLEL_MIN_REPLICATES = 5000
+
+
+def bootstrap_settings(cfg) -> Optional[Dict[str, Any]]:
+    """settings dict from the BOOTSTRAP_* config constants (None if switched off)"""
+    if not cfg.BOOTSTRAP_REPLICATES:
+        return None
+    return {
+        "replicates": int(cfg.BOOTSTRAP_REPLICATES),
+        "seed": int(cfg.BOOTSTRAP_SEED),
+        "level": float(cfg.BOOTSTRAP_LEVEL),
+        "workers": int(cfg.BOOTSTRAP_WORKERS),
+    }
+
+
+def _ratio_chunk(num: np.ndarray, den: np.ndarray, seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """size replicates of sum(w * num) / sum(w * den) (size x M)"""
+    n = num.shape[0]
+    rng = np.random.default_rng(seed)
+    w = rng.multinomial(n, np.full(n, 1.0 / n), size=size).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (w @ num) / (w @ den)
+
+
+def bootstrap_ratio(
+    num: np.ndarray,
+    den: np.ndarray,
+    settings: Dict[str, Any],
+    scale: float = 1.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile CI (lo, hi) per column of sum(num) / sum(den) * scale.
+    num, den: respondents x statistics.
+    """
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    n, m = num.shape
+    if n == 0 or m == 0:
+        return np.full(m, np.nan), np.full(m, np.nan)
+
+    replicates = int(settings["replicates"])
+    chunk = max(1, min(MAX_CHUNK, CHUNK_CELLS // n))
+    sizes = [min(chunk, replicates - start) for start in range(0, replicates, chunk)]
+    seeds = np.random.SeedSequence(int(settings["seed"])).spawn(len(sizes))
+
+    workers = int(settings.get("workers", 1) or 1)
+    if workers > 1 and len(sizes) > 1 and replicates >= PARALLEL_MIN_REPLICATES:
+        # spawn: safe when called from the job runner's threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes)), mp_context=ctx) as pool:
+            parts = list(pool.map(_ratio_chunk, [num] * len(sizes), [den] * len(sizes), seeds, sizes))
+    else:
+        parts = [_ratio_chunk(num, den, s, size) for s, size in zip(seeds, sizes)]
+    stats = np.vstack(parts) * scale
+
+    alpha = (1.0 - float(settings["level"])) / 2.0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns -> NaN
+        lo, hi = np.nanpercentile(stats, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return lo, hi
@@ -0,0 +1,288 @@
+# job_graph.py
+"""
+Dependency-aware job runner for the analysis job lists (df_jg_dict, df_hypotheses_dict).
+
+A job is a dict:
+  - key           output name: the result is published under this key
+  - func          callable
+  - needs         inputs (list of names): context values or outputs of other jobs,
+                  passed as keyword arguments
+  - params        constant keyword arguments (optional)
+  - intermediate  True: input for other jobs only, not part of the returned results
+
+run_jobs() builds the graph from `needs` and
+  - runs lazily: only jobs reachable from the requested targets (an intermediate
+    job nobody needs, e.g. gu_kmu, is never computed)
+  - runs concurrently: every job whose inputs are ready goes to a thread pool
+    (JOB_WORKERS in plotting_config; 1 = serial, in dependency order)
+  - memoizes: a job's fingerprint hashes its key, params, the source of the module
+    defining func and of every project module it reaches through imports (helpers
+    such as answer_matrix, segmentation_cube, bootstrap, weighting), and the
+    fingerprints of its inputs (context values: their content, a TidyStore also its
+    spec-derived answer / Likert codebooks; job outputs: the fingerprint of the
+    producing job). Results are kept in memory and pickled to
+    JOB_CACHE_DIR/<key>-<fingerprint>.pkl, so a re-run only recomputes jobs whose
+    inputs (or code) changed.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import src.plotting.plotting_config as cfg
+from answer_matrix import answer_matrix_of
+from logger import span
+from render_cache import fingerprint, source_fingerprint
+from tidy_access import TidyStore, as_frame
+
+# bump when cached job results must not be reused (e.g. after changing the result layout)
+JOB_CACHE_VERSION = 4
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+_DEFAULT = object()
+
+# fingerprint -> result, for repeated runs in one process
+_MEMO: Dict[str, Any] = {}
+
+
+#---------------------
+#FINGERPRINTS
+#---------------------
+
+def _normalize(obj: Any) -> Any:
+    """json-stable params (sets in sorted order, so the hash does not depend on PYTHONHASHSEED)"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_normalize(x) for x in obj), key=repr)
+    if isinstance(obj, dict):
+        return {str(k): _normalize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_normalize(x) for x in obj]
+    return obj
+
+
+def _store_codebooks(store: TidyStore) -> Dict[str, Any]:
+    """
+    spec-derived parts of a TidyStore that its rows do not show: answer codebooks
+    (options / answer order) and Likert scales / top boxes (ordinal, strong_answers)
+    """
+    am = answer_matrix_of(store)  # attached by prepare_data, else built (and cached) once
+    lc = store.likert
+    return {
+        "answers": {"columns": am.columns, "multi": am.multi.tolist(), "codebooks": am.codebooks},
+        "likert": None if lc is None else {
+            "columns": lc.columns,
+            "scales": lc.scales,
+            "top": {q: np.asarray(t).tolist() for q, t in lc.top.items()},
+        },
+    }
+
+
+def value_fingerprint(value: Any) -> str:
+    """content hash of a context value (frames, TidyStore incl. its codebooks, json-like values)"""
+    if isinstance(value, TidyStore):
+        return fingerprint(as_frame(value), _store_codebooks(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return fingerprint(value)
+    return fingerprint(_normalize(value))
+
+
+def _is_project_module(m: Any) -> bool:
+    f = getattr(m, "__file__", None)
+    if not isinstance(m, ModuleType) or not f:
+        return False
+    path = Path(f).resolve()
+    return path.is_relative_to(PROJECT_ROOT) and not any(
+        p in ("site-packages", "dist-packages", ".venv", "venv") for p in path.parts
+    )
+
+
+@lru_cache(maxsize=None)
+def project_modules(module_name: str) -> Tuple[str, ...]:
+    """
+    names of the project modules reachable from module_name through its imports
+    (module globals that are modules, or functions / classes defined in one), itself included
+    """
+    seen = {module_name}
+    todo = [module_name]
+    while todo:
+        m = sys.modules.get(todo.pop())
+        for v in list(vars(m).values()) if m is not None else []:
+            dep = v if isinstance(v, ModuleType) else sys.modules.get(getattr(v, "__module__", None) or "")
+            if dep is not None and dep.__name__ not in seen and _is_project_module(dep):
+                seen.add(dep.__name__)
+                todo.append(dep.__name__)
+    return tuple(sorted(seen))
+
+
+def code_fingerprint(func: Any) -> str:
+    """source hash of the module defining func and of the project modules it imports"""
+    module = getattr(func, "__module__", None)
+    if module not in sys.modules:
+        return source_fingerprint(func)
+    return source_fingerprint(*[sys.modules[m] for m in project_modules(module)])
+
+
+def job_fingerprint(job: Dict[str, Any], input_fps: Sequence[str]) -> str:
+    return fingerprint(
+        JOB_CACHE_VERSION,
+        job["key"],
+        getattr(job["func"], "__qualname__", repr(job["func"])),
+        code_fingerprint(job["func"]),
+        _normalize(job.get("params") or {}),
+        list(job.get("needs", [])),
+        list(input_fps),
+    )
+
+
+#---------------------
+#DISK CACHE
+#---------------------
+
+def _cache_path(cache_dir: Path, key: str, fp: str) -> Path:
+    safe = "".join(c if c.isalnum() or c in "._-" else "_" for c in key)
+    return cache_dir / f"{safe}-{fp[:24]}.pkl"
+
+
+def _load(path: Path) -> Any:
+    with open(path, "rb") as fp:
+        return pickle.load(fp)
+
+
+def _store(path: Path, value: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fp:
+        pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+#---------------------
+#GRAPH
+#---------------------
+
+def _required(jobs: Dict[str, Dict[str, Any]], context: Dict[str, Any], targets: Iterable[str]) -> List[str]:
+    """jobs reachable from targets, in dependency order (inputs first)"""
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(key: str, path: List[str]) -> None:
+        if state.get(key) == "done":
+            return
+        if state.get(key) == "visiting":
+            raise ValueError(f"Cyclic job dependencies: {' -> '.join(path + [key])}")
+        state[key] = "visiting"
+        for n in jobs[key].get("needs", []):
+            if n in jobs:
+                visit(n, path + [key])
+            elif n not in context:
+                raise KeyError(f"Job '{key}' needs '{n}', which is neither in the context nor a job output")
+        state[key] = "done"
+        order.append(key)
+
+    for t in targets:
+        if t not in jobs:
+            raise KeyError(f"Unknown job: {t}")
+        visit(t, [])
+    return order
+
+
+def _call(job: Dict[str, Any], kwargs: Dict[str, Any]) -> Any:
+    func = job["func"]
+    if not callable(func):
+        raise TypeError(f"[{job['key']}] 'func' is not callable: {func}")
+    params = job.get("params", {}) or {}
+    try:
+        with span(f"job {job['key']}", job=job["key"]):
+            return func(**kwargs, **params)
+    except TypeError as e:
+        # helpful message for config-driven jobs (wrong needs / params)
+        raise TypeError(
+            f"Error running job '{job['key']}' with func='{getattr(func, '__name__', str(func))}'.\n"
+            f"Passed inputs: {list(kwargs)}, params: {params}\n"
+            f"Original error: {e}"
+        ) from e
+
+
+def run_jobs(
+    jobs: Sequence[Dict[str, Any]],
+    context: Dict[str, Any],
+    targets: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    cache_dir: Any = _DEFAULT,
+) -> Dict[str, Any]:
+    """
+    Runs the jobs needed for targets (default: every non-intermediate job) and returns
+    {target: result} in target order.
+    workers: thread pool size (default JOB_WORKERS); cache_dir: on-disk memo
+    (default JOB_CACHE_DIR, None = in memory only).
+    """
+    by_key = {j["key"]: j for j in jobs}
+    if targets is None:
+        targets = [j["key"] for j in jobs if not j.get("intermediate")]
+    workers = max(1, int(workers if workers is not None else cfg.JOB_WORKERS))
+    cache_dir = cfg.JOB_CACHE_DIR if cache_dir is _DEFAULT else cache_dir
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    order = _required(by_key, context, targets)
+
+    # fingerprints in dependency order (context values only when used)
+    fps: Dict[str, str] = {}
+    for key in order:
+        needs = by_key[key].get("needs", [])
+        for n in needs:
+            if n not in fps and n not in by_key:
+                fps[n] = value_fingerprint(context[n])
+        fps[key] = job_fingerprint(by_key[key], [fps[n] for n in needs])
+
+    values: Dict[str, Any] = {}
+    pending: List[str] = []
+    for key in order:
+        fp = fps[key]
+        if fp in _MEMO:
+            values[key] = _MEMO[fp]
+            continue
+        path = _cache_path(cache_dir, key, fp) if cache_dir is not None else None
+        if path is not None and path.exists():
+            try:
+                values[key] = _MEMO[fp] = _load(path)
+                continue
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                pass  # unreadable entry -> recompute
+        pending.append(key)
+
+    def inputs_of(key: str) -> Dict[str, Any]:
+        return {n: values[n] if n in by_key else context[n] for n in by_key[key].get("needs", [])}
+
+    def finish(key: str, value: Any) -> None:
+        values[key] = _MEMO[fps[key]] = value
+        if cache_dir is not None:
+            _store(_cache_path(cache_dir, key, fps[key]), value)
+
+    if workers == 1:
+        for key in pending:
+            finish(key, _call(by_key[key], inputs_of(key)))
+    else:
+        waiting = list(pending)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while waiting or running:
+                ready = [k for k in waiting if all(n in values for n in by_key[k].get("needs", []) if n in by_key)]
+                for key in ready:
+                    waiting.remove(key)
+                    running[pool.submit(_call, by_key[key], inputs_of(key))] = key
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    finish(running.pop(fut), fut.result())
+
+    return {t: values[t] for t in targets}
@@ -0,0 +1,180 @@
+# likert_codes.py
+"""
+Numeric Likert codebook: ordinal int8 codes per (question, item), driven by the spec.
+
+Ordinal questions are marked "ordinal": true in question_spec.json (type likert: by
+default). Their scale is the spec order (options_order; matrix: answer_order, else
+options_order) without NON_ORDINAL_ANSWERS, so the k-th answer of the scale has code k:
+  - 1..k            ordinal value
+  - KEINE_ANTWORT   "Keine Antwort" (NON_ORDINAL_ANSWERS)
+  - MISSING         no answer, not asked, or an answer outside the scale
+Top box: the spec "strong_answers" of the question (else the two highest values).
+
+Built from the answer matrix (answer_matrix.py) with one lookup table per column, no
+Series.map over df_tidy. Means, medians, distributions and top-box shares are
+reductions of one count array
+    counts[segment, column, slot]   slot 0 = KEINE_ANTWORT, slot v = value v
+(ordinal_counts / ordinal_stats), for all items and segments at once.
+
+Built by prepare_data(likert_codes=True) and attached to the TidyStore
+(df_tidy.likert); likert_codes_of() returns it (or builds one from a catalog).
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from answer_matrix import AnswerMatrix, ColumnKey, _spec_order, answer_matrix_of
+from tidy_access import TidyLike, TidyStore
+
+KEINE_ANTWORT = -1
+MISSING = 0
+NON_ORDINAL_ANSWERS = ("Keine Antwort",)
+
+TOP_BOX = 2  # top-box width without spec "strong_answers"
+
+
+def is_ordinal(q: Dict[str, Any]) -> bool:
+    return bool(q.get("ordinal", str(q.get("type") or "").lower() == "likert"))
+
+
+def ordinal_scale(q: Optional[Dict[str, Any]]) -> List[str]:
+    """answer labels of code 1..k (empty for non-ordinal questions)"""
+    if not q or not is_ordinal(q):
+        return []
+    return [str(a) for a in _spec_order(q) if a not in NON_ORDINAL_ANSWERS]
+
+
+@dataclass
+class LikertCodes:
+    respondents: np.ndarray          # respondent_id per row (order of the answer matrix)
+    columns: List[ColumnKey]         # (question_text, item) of the ordinal questions
+    scales: Dict[str, List[str]]     # answer labels of code 1..k per question
+    top: Dict[str, np.ndarray]       # top-box codes per question
+    codes: np.ndarray                # respondents x columns, int8
+    _q_cols: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._q_cols = {}
+        for j, (q, _) in enumerate(self.columns):
+            self._q_cols.setdefault(q, []).append(j)
+
+    @property
+    def questions(self) -> List[str]:
+        return list(self._q_cols)
+
+    def question_columns(self, question_text: str) -> List[int]:
+        return list(self._q_cols.get(question_text, []))
+
+    def items(self, question_text: str) -> List[Optional[str]]:
+        return [self.columns[j][1] for j in self.question_columns(question_text)]
+
+    def codes_of(self, question_text: str) -> np.ndarray:
+        """respondents x items of one question (empty if not ordinal)"""
+        return self.codes[:, self.question_columns(question_text)]
+
+
+def build_likert_codes(am: AnswerMatrix, catalog: Sequence[Dict[str, Any]]) -> LikertCodes:
+    """ordinal codes of every ordinal catalog question, from the answer codes of am"""
+    specs = {q["question_text"]: q for q in catalog}
+    columns: List[ColumnKey] = []
+    blocks: List[np.ndarray] = []
+    scales: Dict[str, List[str]] = {}
+    top: Dict[str, np.ndarray] = {}
+
+    for j, (q, item) in enumerate(am.columns):
+        if am.multi[j]:
+            continue
+        scale = scales.get(q)
+        if scale is None:
+            scale = scales[q] = ordinal_scale(specs.get(q))
+            strong = [scale.index(a) + 1 for a in specs.get(q, {}).get("strong_answers") or [] if a in scale]
+            top[q] = np.array(strong or range(max(1, len(scale) - TOP_BOX + 1), len(scale) + 1), dtype=np.intp)
+        if not scale:
+            continue
+        # codebook position -> ordinal code; last slot: NO_ROW / NA_ANSWER
+        lut = np.full(len(am.codebooks[j]) + 1, MISSING, dtype=np.int8)
+        for k, a in enumerate(am.codebooks[j]):
+            if a in scale:
+                lut[k] = scale.index(a) + 1
+            elif a in NON_ORDINAL_ANSWERS:
+                lut[k] = KEINE_ANTWORT
+        c = am.codes[:, j].astype(np.intp)
+        blocks.append(lut[np.where(c >= 0, c, len(lut) - 1)])
+        columns.append((q, item))
+
+    scales = {q: s for q, s in scales.items() if s}
+    codes = np.column_stack(blocks) if blocks else np.zeros((am.n_respondents, 0), dtype=np.int8)
+    return LikertCodes(
+        respondents=am.respondents,
+        columns=columns,
+        scales=scales,
+        top={q: t for q, t in top.items() if q in scales},
+        codes=codes,
+    )
+
+
+def likert_codes_of(df_tidy: TidyLike, catalog: Optional[Sequence[Dict[str, Any]]] = None) -> LikertCodes:
+    """
+    The Likert codes of df_tidy: the ones attached by prepare_data(likert_codes=True),
+    else built here from catalog (cached on a TidyStore). Without either, no question
+    is ordinal (warning).
+    """
+    if isinstance(df_tidy, TidyStore) and df_tidy.likert is not None:
+        return df_tidy.likert
+    if catalog is None:
+        warnings.warn("Likert codes: no catalog (prepare_data(likert_codes=True)), no ordinal questions")
+    lc = build_likert_codes(answer_matrix_of(df_tidy), catalog or [])
+    if isinstance(df_tidy, TidyStore) and catalog is not None:
+        df_tidy.likert = lc
+    return lc
+
+
+#---------------------
+#REDUCTIONS
+#---------------------
+
+def ordinal_counts(
+    codes: np.ndarray,
+    k: int,
+    member: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    segments x columns x (k + 1) counts of codes (respondents x columns) per segment
+    (member: respondents x segments); slot 0 = KEINE_ANTWORT, slot v = value v.
+    weights: per respondent -> sums of weights
+    """
+    slot = np.where(codes == KEINE_ANTWORT, 0, codes).astype(np.intp)
+    onehot = (slot[:, :, None] == np.arange(k + 1)) & (codes != MISSING)[:, :, None]
+    m = member.astype(np.float64)
+    if weights is not None:
+        m = m * weights[:, None]
+    return np.einsum("rg,rcv->gcv", m, onehot.astype(np.float64))
+
+
+def ordinal_stats(counts: np.ndarray, top: Sequence[int]) -> Dict[str, np.ndarray]:
+    """
+    n_valid, n_keine_antwort, mean, median (lower median of the values),
+    top_box_pct (share of the top codes) per cell of counts (see ordinal_counts)
+    """
+    dist = counts[..., 1:]
+    k = dist.shape[-1]
+    n_valid = dist.sum(axis=-1)
+    cum = dist.cumsum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ok = n_valid > 0
+        mean = np.where(ok, dist @ np.arange(1, k + 1, dtype=np.float64) / n_valid, np.nan)
+        median = np.where(ok, (cum < n_valid[..., None] / 2).sum(axis=-1) + 1.0, np.nan)
+        top_box = np.where(ok, dist[..., np.asarray(top, dtype=np.intp) - 1].sum(axis=-1) / n_valid * 100.0, np.nan)
+    return {
+        "n_valid": n_valid,
+        "n_keine_antwort": counts[..., 0],
+        "mean": mean,
+        "median": median,
+        "top_box_pct": top_box,
+    }
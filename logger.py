@@ -1,15 +1,67 @@
 from datetime import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
 import traceback
-from typing import List, Any
+from contextlib import contextmanager
+from typing import List, Any, Optional, Dict, Iterator
 from pathlib import Path
 import pandas as pd
 
+try:
+    import resource  # peak RSS (not on Windows)
+except ImportError:
+    resource = None
+
+# ------------------------------------------------------------
+# Stage spans: wall time, CPU time (calling thread) and memory per stage / figure.
+#   with logger.span("build_tidy"): ...       on a logger
+#   with span("read_excel"): ...              on the active logger (modules without one)
+# One JSON line per span in <log stem>_spans.jsonl next to run_log.txt:
+#   stage | t_start_s | wall_s | cpu_s | rss_peak_mb | rss_growth_mb
+#   [| py_alloc_mb | py_peak_mb] | thread | status | extra fields (figure=..., job=...)
+# rss_*: process high-water mark (resource.getrusage) at the end / its growth during
+# the span; py_*: tracemalloc net / peak allocations above the start (only with
+# trace_memory=True, it slows Python allocations down). Spans measured elsewhere
+# (render worker processes) are added with record_span. close() writes the top-N
+# slowest stages and figures to run_log.txt.
+# ------------------------------------------------------------
+
+_ACTIVE: Optional["TinyLogger"] = None
+
+_RSS_UNIT = 1 / 1024 if sys.platform == "darwin" else 1  # ru_maxrss: bytes on macOS, KB else
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT / 1024
+
+
 class TinyLogger:
-    def __init__(self, log_path: Path):
+    def __init__(self, log_path: Path, spans: bool = True, top_n: int = 10, trace_memory: bool = False):
+        global _ACTIVE
         self.log_path = log_path
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
         self.fp = open(self.log_path, "w", encoding="utf-8")
 
+        self.spans: List[Dict[str, Any]] = []
+        self.top_n = top_n
+        self.spans_path = self.log_path.with_name(f"{self.log_path.stem}_spans.jsonl") if spans else None
+        self._spans_fp = open(self.spans_path, "w", encoding="utf-8") if spans else None
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()  # forked render workers inherit _ACTIVE: not recorded there
+        self._lock = threading.Lock()
+        self._open: List[Dict[str, Any]] = []  # spans in progress (tracemalloc peaks)
+        self._trace = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if spans:
+            _ACTIVE = self
+
         self.write(f"Run started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.write(f"Log file: {self.log_path.resolve()}")
         self.write("-" * 90)
@@ -19,11 +71,136 @@ class TinyLogger:
         self.fp.write(msg + "\n")
         self.fp.flush()
 
-    def write_traceback(self):
-        self.fp.write(traceback.format_exc() + "\n")
+    def write_traceback(self, tb: Optional[str] = None):
+        """tb: traceback text captured elsewhere (e.g. in a worker); default: current exception"""
+        self.fp.write((tb if tb is not None else traceback.format_exc()) + "\n")
         self.fp.flush()
 
+    #---------------------
+    #SPANS
+    #---------------------
+
+    def _bump_peaks(self) -> None:
+        """tracemalloc peak since the last reset -> every open span, then reset (caller holds the lock)"""
+        peak = tracemalloc.get_traced_memory()[1]
+        for rec in self._open:
+            rec["_peak"] = max(rec["_peak"], peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """times the with-block as one span; the yielded dict takes extra fields"""
+        extra: Dict[str, Any] = dict(fields)
+        trace = self._trace and tracemalloc.is_tracing()
+        rec: Dict[str, Any] = {}
+        if trace:
+            with self._lock:
+                self._bump_peaks()
+                rec["_mem0"] = rec["_peak"] = tracemalloc.get_traced_memory()[0]
+                self._open.append(rec)
+        rss0 = _max_rss_mb()
+        t_start = time.perf_counter()
+        c_start = time.thread_time()
+        status = "ok"
+        try:
+            yield extra
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            wall = time.perf_counter() - t_start
+            cpu = time.thread_time() - c_start
+            rss1 = _max_rss_mb()
+            mem: Dict[str, Any] = {}
+            if trace:
+                with self._lock:
+                    self._bump_peaks()
+                    self._open.remove(rec)
+                    current = tracemalloc.get_traced_memory()[0]
+                mem = {
+                    "py_alloc_mb": (current - rec["_mem0"]) / 1024 ** 2,
+                    "py_peak_mb": (rec["_peak"] - rec["_mem0"]) / 1024 ** 2,
+                }
+            self.record_span(
+                stage,
+                wall_s=wall,
+                cpu_s=cpu,
+                t_start_s=t_start - self._t0,
+                rss_peak_mb=rss1,
+                rss_growth_mb=None if rss0 is None else rss1 - rss0,
+                **mem,
+                status=status,
+                **extra,
+            )
+
+    def record_span(self, stage: str, wall_s: float, cpu_s: Optional[float] = None, **fields: Any) -> None:
+        """adds one span measured elsewhere (e.g. in a render worker process)"""
+        rec = {"stage": stage, "wall_s": wall_s, "cpu_s": cpu_s, "thread": threading.current_thread().name}
+        rec.update(fields)
+        with self._lock:
+            self.spans.append(rec)
+            if self._spans_fp is not None:
+                self._spans_fp.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+                self._spans_fp.flush()
+
+    def span_summary(self, top_n: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """top-N slowest stages (all spans of a stage together) and figures ("figure" spans)"""
+        top_n = self.top_n if top_n is None else top_n
+        d = pd.DataFrame(self.spans)
+        for col in ("rss_growth_mb", "figure"):
+            if col not in d:
+                d[col] = None
+        d[["wall_s", "cpu_s", "rss_growth_mb"]] = d[["wall_s", "cpu_s", "rss_growth_mb"]].astype(float)
+        stages = (
+            d.groupby("stage", sort=False)
+            .agg(n=("wall_s", "size"), wall_s=("wall_s", "sum"), max_wall_s=("wall_s", "max"),
+                 cpu_s=("cpu_s", "sum"), rss_growth_mb=("rss_growth_mb", "max"))
+            .sort_values("wall_s", ascending=False)
+            .head(top_n)
+            .reset_index()
+        )
+        figures = (
+            d[(d["stage"] == "figure") & d["figure"].notna()][["figure", "wall_s", "cpu_s"]]
+            .sort_values("wall_s", ascending=False)
+            .head(top_n)
+            .reset_index(drop=True)
+        )
+        return {"stages": stages, "figures": figures}
+
+    def _write_span_summary(self) -> None:
+        if not self.spans:
+            return
+        summary = self.span_summary()
+        num = lambda spec: (lambda v: "-" if pd.isna(v) else format(v, spec))
+        fmt = {"wall_s": num(".3f"), "max_wall_s": num(".3f"), "cpu_s": num(".3f"), "rss_growth_mb": num(".1f")}
+        self.write("")
+        self.write(f"=== TIMING (top {self.top_n}, all spans: {self.spans_path.name}) ===")
+        self.write("Slowest stages:")
+        self.write(summary["stages"].to_string(index=False, formatters=fmt))
+        if len(summary["figures"]):
+            self.write("Slowest figures:")
+            self.write(summary["figures"].to_string(index=False, formatters=fmt))
+
     def close(self):
+        global _ACTIVE
+        if self._spans_fp is not None:
+            self._write_span_summary()
+            self._spans_fp.close()
+            self._spans_fp = None
+        if _ACTIVE is self:
+            _ACTIVE = None
         self.write("-" * 90)
         self.write(f"Run finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.fp.close()
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """TinyLogger.span on the active logger (none: the block runs unrecorded)"""
+    logger = _ACTIVE
+    if logger is None or logger._pid != os.getpid():
+        yield dict(fields)
+        return
+    with logger.span(stage, **fields) as extra:
+        yield extra
+
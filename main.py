@@ -7,32 +7,49 @@ What it does:
    - df_raw (full table)
    - df_q (question-only wide table + respondent_id)
    - catalog (question definitions + inferred types)
-   - df_tidy (long/tidy table)
+   - df_tidy (long/tidy table; TidyStore when TIDY_STORE is set)
    - base_map (denominators per question; skip-logic aware)
+   - respondent weights (raking to QUESTION_LIST.WEIGHTING_TARGETS) when WEIGHTING is set
 3) Applies a uniform plotting style
-4) Loops through all questions and saves plotting_function_jg_analyse to the output folder
-5) Plots hypotheses (once)
+4) Aggregates all questions once (PlotData, saved as plot_data.npz), then loops through them and saves plotting_function_jg_analyse to the output folder
+5) Plots hypotheses (once), incl. the exploratory association scan (association_scan.csv + heatmap)
 6) Runs JG analysis (GU/KMU) and saves plotting_function_jg_analyse
 
+Every full run also saves the plot-ready aggregates of all figures (cfg.AGGREGATE_DIR).
+Restyle mode (python main.py --restyle) re-renders all figures from these files only:
+no Excel loading, preprocessing, GU/KMU classification or analysis jobs. Use it when only
+plotting_config (fonts, sizes, colors, ...) or plotting code changed.
+
+run_log.txt ends with the slowest stages and figures; all stage / figure spans (wall and
+CPU time, memory) are in run_log_spans.jsonl next to it (logger.py, SPAN_* config).
+
 How to run:
 - Set EXCEL_PATH and FIRST_QUESTION_TEXT below
 - Run: python main.py
+- Restyle only: python main.py --restyle
 """
 
 from __future__ import annotations
 
-from typing import Any, List
+import argparse
+import json
+from typing import Any, Dict, List, Tuple
 from preprocessing import prepare_data
+from tidy_access import as_frame, decode_categoricals
+from plot_data import aggregate_questions, save_plot_data, load_plot_data, save_frames, load_frames
 from logger import TinyLogger
+from bootstrap import bootstrap_settings
+from weighting import weighting_settings, rake_weights, weighted_base_map, describe_weights
+from significance import attach_significance
 
 import src.plotting.plotting_config as cfg
-from plotting_function import plot_question_and_save
+import QUESTION_LIST as const
+from render_pool import make_job, render_questions
 
-from Hypotheses.preprocessing_hypotheses import get_df_hypotheses
+from Hypotheses.preprocessing_hypotheses import get_df_hypotheses, strong_answer_sets
 from Hypotheses import df_hypotheses_dict
 from Hypotheses.plotting_function_hypotheses import plot_hypotheses_and_save
 
-from Umfrage_JG_Analyse.preprocessing_jg_analyse.gu_kmu_classification import gu_kmu_classification
 from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import get_df_jg
 from Umfrage_JG_Analyse.plotting_function_jg_analyse.plot_jg_and_save import plot_jg_and_save
 from Umfrage_JG_Analyse.preprocessing_jg_analyse import df_jg_dict
@@ -56,66 +73,250 @@ def should_skip_question(qtext: str) -> bool:
     return False
 
 
-def main() -> None:
+def save_plot_entries(entries: List[Tuple[str, dict, Any]]) -> None:
+    """question plan (kind, catalog entry, Abbildung number) for restyle runs"""
+    cfg.PLOT_ENTRIES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    cfg.PLOT_ENTRIES_PATH.write_text(
+        json.dumps([{"kind": k, "q": q, "plot_i": i} for k, q, i in entries], ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+
+def load_plot_entries() -> List[Tuple[str, dict, Any]]:
+    rows = json.loads(cfg.PLOT_ENTRIES_PATH.read_text(encoding="utf-8"))
+    return [(r["kind"], r["q"], r["plot_i"]) for r in rows]
+
+
+def main(restyle: bool = False) -> None:
 
 
     cfg.apply_style()
 
+    if restyle:
+        run_restyle()
+        return
+
+    # logger first: the preprocessing stages are recorded as spans (logger.py)
+    logger = make_logger()
+
     # -------------------------
     # 1) LOAD + PREPROCESS
     # -------------------------
-    df_raw, df_q, catalog, df_tidy, base_map = prepare_data(
-        excel_path=cfg.EXCEL_PATH,
-        first_question_text=cfg.FIRST_QUESTION_TEXT,
-        sheet_name=0,
-        spec_path=cfg.SPEC_PATH,
-    )
-
-    # gu_kmu für JG Analyse (GU/KMU classification)
-    gu_kmu = gu_kmu_classification(df_tidy=df_tidy)
+    with logger.span("prepare_data"):
+        df_raw, df_q, catalog, df_tidy, base_map = prepare_data(
+            excel_path=cfg.EXCEL_PATH,
+            first_question_text=cfg.FIRST_QUESTION_TEXT,
+            sheet_name=0,
+            spec_path=cfg.SPEC_PATH,
+            cache_dir=cfg.CACHE_DIR,
+            cache_format=cfg.CACHE_FORMAT,
+            cache_max_bytes=cfg.CACHE_MAX_BYTES,
+            chunksize=cfg.STREAM_CHUNKSIZE,
+            categorical=cfg.TIDY_CATEGORICAL,
+            tidy_store=cfg.TIDY_STORE,
+            answer_matrix=cfg.TIDY_ANSWER_MATRIX,
+            respondent_index=cfg.TIDY_RESPONDENT_INDEX,
+            likert_codes=cfg.TIDY_LIKERT_CODES,
+        )
 
     # -------------------------
-    # 2) LOGGER + DEBUG EXPORTS
+    # 2) RUN INFO + WEIGHTS
     # -------------------------
-    logger = TinyLogger(cfg.OUTPUT_DIR / "run_log.txt")
     logger.write(f"Excel: {cfg.EXCEL_PATH.resolve()}")
     logger.write(f"Spec:  {cfg.SPEC_PATH.resolve()}")
     logger.write(f"Output:{cfg.OUTPUT_DIR.resolve()}")
     logger.write(f"Catalog entries: {len(catalog)}")
+
+    # respondent weights (None = unweighted); every counting path below takes them
+    weights = None
+    weighting = weighting_settings(cfg)
+    if weighting is not None:
+        with logger.span("weighting"):
+            weights = rake_weights(df_tidy, const.WEIGHTING_TARGETS, **weighting)
+            base_map = weighted_base_map(df_tidy, catalog, weights)
+        w = describe_weights(weights)
+        logger.write(
+            f"Weights: {len(const.WEIGHTING_TARGETS)} target question(s) | min={w['min']:.3f} | "
+            f"max={w['max']:.3f} | n={w['n']:.0f} | n_effective={w['n_effective']:.1f}"
+        )
+    logger.write("")
+
+    # -------------------------
+    # 3) NORMAL QUESTION PLOTS
+    # -------------------------
+    entries = plan_question_entries(catalog)
+
+    # aggregation once for all plotted questions; rendering only draws these
+    with logger.span("aggregate_questions"):
+        plot_data = aggregate_questions([q for kind, q, _ in entries if kind == "plot"], df_tidy, base_map, weights=weights)
+    with logger.span("save_plot_data"):
+        save_plot_data(cfg.PLOT_DATA_PATH, plot_data)
+        save_plot_entries(entries)
+
+    with logger.span("plot_questions"):
+        counts = plot_questions(entries, plot_data, logger)
+
+    # -------------------------
+    # 4) HYPOTHESES (RUN ONCE!)
+    # -------------------------
+    with logger.span("hypotheses_jobs"):
+        df_hypotheses = get_df_hypotheses(
+            df_tidy, df_hypotheses_dict,
+            bootstrap=bootstrap_settings(cfg), weights=weights,
+            strong_sets=strong_answer_sets(catalog),
+        )
+
+    # -------------------------
+    # 5) JG ANALYSE (GU/KMU PLOTS)
+    # -------------------------
+    # gu_kmu (GU/KMU classification) + segmentation cube are jobs of df_jg_dict, run on demand
+    context = {
+        "df_tidy": df_tidy,
+        "bootstrap": bootstrap_settings(cfg),
+        "weights": weights,
+    }
+
+
+    with logger.span("jg_jobs"):
+        results = get_df_jg(df_jg_dict, context) #df_jg_dict ist eine Dict von verchiedene Plot Funktion
+
+    # -------------------------
+    # 6) SIGNIFICANCE TESTS (all crosstabs + GU/KMU Likert comparisons, one corrected batch)
+    # -------------------------
+    if cfg.SIGNIFICANCE_TESTS:
+        with logger.span("significance"):
+            cube = get_df_jg(df_jg_dict, context, targets=["cube"])["cube"]  # memoized job result
+            df_hypotheses, results = attach_significance(
+                [df_hypotheses, results], cube, correction=cfg.SIGNIFICANCE_CORRECTION, weights=weights,
+            )
+
+    with logger.span("save_results"):
+        save_frames(cfg.HYPOTHESES_DATA_PATH, df_hypotheses)
+        if "association_scan" in df_hypotheses:
+            # ranked Cramér's V table of all question pairs (candidates for new hypotheses)
+            df_hypotheses["association_scan"].to_csv(
+                cfg.OUTPUT_DIR / "association_scan.csv", index=False, encoding="utf-8-sig"
+            )
+        if "strong_answers" in df_hypotheses:
+            # strong-answer counts / shares / ranks of all matrix items, overall + per segment
+            df_hypotheses["strong_answers"].to_csv(
+                cfg.OUTPUT_DIR / "strong_answers.csv", index=False, encoding="utf-8-sig"
+            )
+        save_frames(cfg.JG_DATA_PATH, results)
+
+    with logger.span("plot_hypotheses"):
+        plot_hypotheses(df_hypotheses, logger)
+    with logger.span("plot_jg"):
+        plot_jg(results)
+
+    #SAVE df_tidy (before the summary: write_summary closes the logger)
+    with logger.span("export_tidy"):
+        decode_categoricals(as_frame(df_tidy).copy()).to_csv(cfg.OUTPUT_DIR / "df_tidy.csv", index=False, encoding="utf-8-sig")
+        if weights is not None:
+            weights.to_csv(cfg.OUTPUT_DIR / "weights.csv", encoding="utf-8-sig")
+
+    write_summary(counts, logger)
+
+
+def make_logger() -> TinyLogger:
+    """run_log.txt (+ run_log_spans.jsonl with the stage / figure spans, SPAN_* config)"""
+    return TinyLogger(
+        cfg.OUTPUT_DIR / "run_log.txt",
+        spans=cfg.SPAN_LOG,
+        top_n=cfg.SPAN_TOP_N,
+        trace_memory=cfg.SPAN_TRACEMALLOC,
+    )
+
+
+def run_restyle() -> None:
+    """re-render every figure from the saved aggregates (no data loading / preprocessing)"""
+    logger = make_logger()
+    with logger.span("load_aggregates"):
+        entries = load_plot_entries()
+        plot_data = load_plot_data(cfg.PLOT_DATA_PATH)
+        df_hypotheses = load_frames(cfg.HYPOTHESES_DATA_PATH)
+        results = load_frames(cfg.JG_DATA_PATH)
+
+    logger.write(f"Restyle from: {cfg.AGGREGATE_DIR.resolve()}")
+    logger.write(f"Output:{cfg.OUTPUT_DIR.resolve()}")
+    logger.write(f"Catalog entries: {len(entries)}")
     logger.write("")
 
+    with logger.span("plot_questions"):
+        counts = plot_questions(entries, plot_data, logger)
+    with logger.span("plot_hypotheses"):
+        plot_hypotheses(df_hypotheses, logger)
+    with logger.span("plot_jg"):
+        plot_jg(results)
+    write_summary(counts, logger)
+
+
+def plan_question_entries(catalog: List[dict]) -> List[Tuple[str, dict, Any]]:
+    """
+    (kind, q, Abbildung number) per catalog entry, kind = "filter" | "text" | "plot".
+    Numbering + skips are decided here (serially, in catalog order).
+    """
+    entries: List[Any] = []
+    plot_i = 0
+
+    for q in catalog:
+        qtext = (q.get("question_text") or "").strip()
+        qtype = str(q.get("type") or "").strip().lower()
+
+        # filters
+        if should_skip_question(qtext):
+            entries.append(("filter", q, None))
+            continue
+
+        # explicitly skip text questions but keep numbering consistent
+        plot_i += 1
+        if qtype == "text":
+            entries.append(("text", q, plot_i))
+            continue
+
+        # Abbildung index is incremented regardless of success to keep consistent numbering
+        entries.append(("plot", q, plot_i))
+
+    return entries
+
+
+def plot_questions(
+    entries: List[Tuple[str, dict, Any]],
+    plot_data: Dict[str, Any],
+    logger: TinyLogger,
+) -> Dict[str, Any]:
+    """renders the question figures (only the rendering may run in worker processes)"""
+
 
     # state collectors
     saved: List[Any] = []
     list_of_figures: List[str] = []
-    plot_i = 0
 
     ok_count = 0
     skip_count = 0
     fail_count = 0
 
-    # -------------------------
-    # 3) NORMAL QUESTION PLOTS
-    # -------------------------
     logger.write("=== PLOTTING QUESTIONS ===")
 
-    for q in catalog:
+    jobs = [
+        make_job(q, plot_data[q["question_text"]], plot_i if PREFIX_WITH_INDEX else None)
+        for kind, q, plot_i in entries if kind == "plot"
+    ]
+
+    results = render_questions(jobs, out_dir=cfg.PLOTS_Q_DIR, workers=cfg.RENDER_WORKERS)
+
+    for kind, q, plot_i in entries:
         qtext = (q.get("question_text") or "").strip()
         qtype = str(q.get("type") or "").strip().lower()
         ptype = str(q.get("plot_type") or "").strip().lower()
+        caption_text = (q.get("caption") or qtext).strip()
 
-        # filters
-        if should_skip_question(qtext):
+        if kind == "filter":
             logger.write(f"[SKIP filter] | type={qtype} | plot={ptype} | {qtext}")
             skip_count += 1
             continue
 
-
-        # explicitly skip text questions but keep numbering consistent
-        if qtype == "text":
-            plot_i += 1
-            caption_text = (q.get("caption") or qtext).strip()
-
+        if kind == "text":
             logger.write(f"[SKIP text]   | Abbildung {plot_i} | {qtext}")
             if PREFIX_WITH_INDEX:
                 list_of_figures.append(f"Abbildung {plot_i}: {caption_text}")
@@ -125,63 +326,63 @@ def main() -> None:
             skip_count += 1
             continue
 
-        # increment Abbildung index (regardless of success to keep consistent numbering)
-        plot_i += 1
-        caption_text = (q.get("caption") or qtext).strip()
+        res = next(results)
+        if "timing" in res:
+            # render time of the figure, measured where it ran (worker process or here)
+            name = res["out_paths"][0].name if res["out_paths"] else f"Abbildung {plot_i}"
+            logger.record_span("figure", figure=name, status=res["status"], **res["timing"])
 
-        try:
-            out_paths = plot_question_and_save(
-                q=q,
-                df_tidy=df_tidy,
-                base_map=base_map,
-                out_dir= cfg.PLOTS_Q_DIR,
-                prefix_index=plot_i if PREFIX_WITH_INDEX else None,
+        if res["status"] == "fail":
+            fail_count += 1
+            logger.write(
+                f"[FAIL]        | Abbildung {plot_i} | type={qtype} | plot={ptype} | {qtext}"
             )
+            logger.write(f"               error={res['error']}")
+            logger.write("               traceback:")
+            logger.write_traceback(res["traceback"])
+            continue
 
-            # If plot_question_and_save returns [] (e.g. internal skip), treat as skip
-            if not out_paths:
-                logger.write(
-                    f"[SKIP none]   | Abbildung {plot_i} | type={qtype} | plot={ptype} | {qtext}"
-                )
-                if PREFIX_WITH_INDEX:
-                    list_of_figures.append(f"Abbildung {plot_i}: {caption_text}")
-                else:
-                    list_of_figures.append(f"Abbildung: {caption_text}")
-                skip_count += 1
-                continue
-
-            saved.extend(out_paths)
-            ok_count += 1
+        out_paths = res["out_paths"]
 
+        # If plot_question_and_save returns [] (e.g. internal skip), treat as skip
+        if res["status"] == "none":
+            logger.write(
+                f"[SKIP none]   | Abbildung {plot_i} | type={qtype} | plot={ptype} | {qtext}"
+            )
             if PREFIX_WITH_INDEX:
                 list_of_figures.append(f"Abbildung {plot_i}: {caption_text}")
-                logger.write(
-                    f"[OK]          | Abbildung {plot_i} | type={qtype} | plot={ptype} | "
-                    f"saved={len(out_paths)} | {out_paths[0].name}"
-                )
             else:
                 list_of_figures.append(f"Abbildung: {caption_text}")
-                logger.write(
-                    f"[OK]          | type={qtype} | plot={ptype} | saved={len(out_paths)} | {out_paths[0].name}"
-                )
+            skip_count += 1
+            continue
 
-        except Exception as e:
-            fail_count += 1
+        saved.extend(out_paths)
+        ok_count += 1
+
+        if PREFIX_WITH_INDEX:
+            list_of_figures.append(f"Abbildung {plot_i}: {caption_text}")
             logger.write(
-                f"[FAIL]        | Abbildung {plot_i} | type={qtype} | plot={ptype} | {qtext}"
+                f"[OK]          | Abbildung {plot_i} | type={qtype} | plot={ptype} | "
+                f"saved={len(out_paths)} | {out_paths[0].name}"
+            )
+        else:
+            list_of_figures.append(f"Abbildung: {caption_text}")
+            logger.write(
+                f"[OK]          | type={qtype} | plot={ptype} | saved={len(out_paths)} | {out_paths[0].name}"
             )
-            logger.write(f"               error={repr(e)}")
-            logger.write("               traceback:")
-            logger.write_traceback()
 
-    # -------------------------
-    # 4) HYPOTHESES (RUN ONCE!)
-    # -------------------------
-    logger.write("")
-    logger.write("=== PLOTTING HYPOTHESES ===")
+    return {
+        "saved": saved,
+        "list_of_figures": list_of_figures,
+        "ok": ok_count,
+        "skip": skip_count,
+        "fail": fail_count,
+    }
 
 
-    df_hypotheses = get_df_hypotheses(df_tidy,df_hypotheses_dict)
+def plot_hypotheses(df_hypotheses: Dict[str, Any], logger: TinyLogger) -> None:
+    logger.write("")
+    logger.write("=== PLOTTING HYPOTHESES ===")
 
     out_paths, captions = plot_hypotheses_and_save(df_hypotheses,out_dir=cfg.PLOTS_H_DIR)
 
@@ -190,23 +391,18 @@ def main() -> None:
         print("-", p)
 
 
-    # -------------------------
-    # 5) JG ANALYSE (GU/KMU PLOTS)
-    # -------------------------
-    context = {
-        "df_tidy": df_tidy,
-        "gu_kmu": gu_kmu,
-    }
-
-
-    results = get_df_jg(df_jg_dict, context) #df_jg_dict ist eine Dict von verchiedene Plot Funktion
-
+def plot_jg(results: Dict[str, Any]) -> None:
     out_paths, captions = plot_jg_and_save(results, out_dir=cfg.PLOTS_JG_DIR)
 
     print("Saved figures:")
     for p in out_paths:
         print("-", p)
 
+
+def write_summary(counts: Dict[str, Any], logger: TinyLogger) -> None:
+    saved = counts["saved"]
+    list_of_figures = counts["list_of_figures"]
+
     # -------------------------
     # 6) WRITE LIST OF FIGURES
     # -------------------------
@@ -223,9 +419,9 @@ def main() -> None:
     # -------------------------
     logger.write("")
     logger.write("=== SUMMARY ===")
-    logger.write(f"Questions OK:      {ok_count}")
-    logger.write(f"Questions skipped: {skip_count}")
-    logger.write(f"Questions failed:  {fail_count}")
+    logger.write(f"Questions OK:      {counts['ok']}")
+    logger.write(f"Questions skipped: {counts['skip']}")
+    logger.write(f"Questions failed:  {counts['fail']}")
     logger.write(f"Saved plot files:  {len(saved)}")
     logger.write(f"Output folder:     {cfg.OUTPUT_DIR.resolve()}")
 
@@ -237,14 +433,12 @@ def main() -> None:
         for p in saved[:5]:
             print(" -", p)
 
-    #SAVE df_tidy
-    df_tidy.to_csv(cfg.OUTPUT_DIR / "df_tidy.csv", index=False, encoding="utf-8-sig")
 
 if __name__ == "__main__":
-    main()
-
-
-
-
-
-
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--restyle", action="store_true",
+        help="re-render all figures from the saved aggregates (no Excel / preprocessing)",
+    )
+    args = parser.parse_args()
+    main(restyle=args.restyle)
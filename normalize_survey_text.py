@@ -1,7 +1,9 @@
 import re
 import unicodedata
+import numpy as np
 import pandas as pd
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict
 
 LIKERT_HINTS = re.compile(
     r"(Wirkung|Hemmnis|Zustimmung|Mehrwert|entscheidend|Kenntnisse|Erfassung|Auswertung|Antwort|Nichtentscheidend|KeineAntwort)",
@@ -9,7 +11,7 @@ LIKERT_HINTS = re.compile(
 )
 
 #Normalize spec question
-ORDER_KEYS = ("options_order", "answer_order", "items_order")
+ORDER_KEYS = ("options_order", "answer_order", "items_order", "strong_answers")
 
 # Core direct mappings (most important)
 CANON_MAP = {
@@ -56,60 +58,50 @@ CANON_MAP = {
 }
 
 
-def normalize_by_canon_map(x, canon_map: Dict[str, str]):
-    """
-    Combined normalizer:
-    - robust Unicode cleanup (spaces, dashes, quotes) to make matching stable
-    - apply CANON_MAP only when a match exists (direct / comma-normalized / nospace)
-    - if no match, return cleaned original (NOT aggressively changed beyond cleanup)
-
-    Cleanup covers:
-    - NBSP and other unicode spaces -> normal space
-    - remove zero-width chars
-    - normalize en/em dash/minus -> "-"
-    - collapse whitespace
-    - standardize hyphen spacing: "50-250" / "50 – 250" -> "50 - 250"
-    """
-
-    if pd.isna(x):
-        return x
-
-    s = str(x)
+# ---------- unicode cleanup as ONE translate table ----------
+# (NFKC runs first; these are the characters NFKC leaves alone or maps to something else)
+UNICODE_TRANSLATION = str.maketrans({
+    # unicode spaces -> normal space
+    "\u00A0": " ",   # NBSP
+    "\u2007": " ",   # figure space
+    "\u202F": " ",   # narrow NBSP
+    "\u2009": " ",   # thin space
+    "\u200A": " ",   # hair space
+    # zero-width chars -> removed
+    "\u200B": None,  # zero-width space
+    "\uFEFF": None,  # BOM / zero-width no-break space
+    # dash variants -> hyphen
+    "\u2013": "-",   # en dash
+    "\u2014": "-",   # em dash
+    "\u2212": "-",   # minus sign
+    # quotes (optional but helps matching)
+    "„": '"', "“": '"', "”": '"',
+    "‚": "'", "‘": "'", "’": "'",
+})
+
+_WS_RE = re.compile(r"\s+")
+_HYPHEN_RE = re.compile(r"\s*-\s*")
+_COMMA_RE = re.compile(r"\s*,\s*")
+
+# max number of distinct strings remembered per canon map
+CANON_CACHE_SIZE = 65536
+
+
+def _canonicalize(s: str, canon_map: Dict[str, str]) -> str:
+    """cleanup + CANON_MAP lookup for one (non-NA) string"""
 
     # ---------- A) robust cleanup ----------
-    s = unicodedata.normalize("NFKC", s)
-
-    # normalize unicode spaces
-    s = (
-        s.replace("\u00A0", " ")  # NBSP
-         .replace("\u2007", " ")  # figure space
-         .replace("\u202F", " ")  # narrow NBSP
-         .replace("\u2009", " ")  # thin space
-         .replace("\u200A", " ")  # hair space
-         .replace("\u200B", "")   # zero-width space
-         .replace("\uFEFF", "")   # BOM / zero-width no-break space
-    )
-
-    # normalize dash variants to hyphen
-    s = (
-        s.replace("\u2013", "-")  # en dash
-         .replace("\u2014", "-")  # em dash
-         .replace("\u2212", "-")  # minus sign
-    )
-
-    # normalize quotes (optional but helps matching)
-    s = (s.replace("„", '"').replace("“", '"').replace("”", '"')
-           .replace("‚", "'").replace("‘", "'").replace("’", "'"))
+    s = unicodedata.normalize("NFKC", s).translate(UNICODE_TRANSLATION)
 
     # collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
 
     if not s:
         return s
 
     # standardize hyphen spacing (ranges etc.)
-    s = re.sub(r"\s*-\s*", " - ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _HYPHEN_RE.sub(" - ", s)
+    s = _WS_RE.sub(" ", s).strip()
 
     # ---------- B) CANON MAP matching (your logic) ----------
     # 1) direct hit
@@ -117,7 +109,7 @@ def normalize_by_canon_map(x, canon_map: Dict[str, str]):
         return canon_map[s]
 
     # 2) normalize commas (remove spaces around comma)
-    s_commas = re.sub(r"\s*,\s*", ",", s)
+    s_commas = _COMMA_RE.sub(",", s)
     if s_commas in canon_map:
         return canon_map[s_commas]
 
@@ -128,3 +120,103 @@ def normalize_by_canon_map(x, canon_map: Dict[str, str]):
 
     # If no match, return cleaned original
     return s
+
+
+class CanonEngine:
+    """
+    Memoized canonicalization for one canon map.
+
+    Survey columns contain a few hundred distinct strings repeated over
+    thousands of rows, so every distinct value is normalized once and kept
+    in a bounded LRU cache that is shared by all calls (see get_canon_engine).
+    """
+
+    def __init__(self, canon_map: Dict[str, str], maxsize: int = CANON_CACHE_SIZE):
+        self.canon_map = canon_map
+        self._lookup = lru_cache(maxsize=maxsize)(self._canonicalize_str)
+
+    def _canonicalize_str(self, s: str) -> str:
+        return _canonicalize(s, self.canon_map)
+
+    def normalize(self, x):
+        if pd.isna(x):
+            return x
+        return self._lookup(str(x))
+
+    def normalize_series(self, values: pd.Series) -> pd.Series:
+        """factorize -> normalize each distinct value once -> broadcast back"""
+        return map_unique(values.astype(object), self.normalize)
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+    def cache_clear(self) -> None:
+        self._lookup.cache_clear()
+
+
+_ENGINES: Dict[int, CanonEngine] = {}
+
+
+def get_canon_engine(canon_map: Dict[str, str]) -> CanonEngine:
+    """
+    One engine (and cache) per canon map object.
+    If a canon map is changed at runtime, call clear_canon_cache() afterwards.
+    """
+    engine = _ENGINES.get(id(canon_map))
+    if engine is None or engine.canon_map is not canon_map:
+        engine = CanonEngine(canon_map)
+        _ENGINES[id(canon_map)] = engine
+    return engine
+
+
+def clear_canon_cache() -> None:
+    _ENGINES.clear()
+
+
+def normalize_by_canon_map(x, canon_map: Dict[str, str]):
+    """
+    Combined normalizer:
+    - robust Unicode cleanup (spaces, dashes, quotes) to make matching stable
+    - apply CANON_MAP only when a match exists (direct / comma-normalized / nospace)
+    - if no match, return cleaned original (NOT aggressively changed beyond cleanup)
+
+    Cleanup covers:
+    - NBSP and other unicode spaces -> normal space
+    - remove zero-width chars
+    - normalize en/em dash/minus -> "-"
+    - collapse whitespace
+    - standardize hyphen spacing: "50-250" / "50 – 250" -> "50 - 250"
+
+    Results are memoized per canon map (see CanonEngine).
+    """
+    return get_canon_engine(canon_map).normalize(x)
+
+
+def normalize_series_by_canon_map(values: pd.Series, canon_map: Dict[str, str]) -> pd.Series:
+    """Same as values.map(lambda v: normalize_by_canon_map(v, canon_map)), once per distinct value."""
+    return get_canon_engine(canon_map).normalize_series(values)
+
+
+def map_unique(values: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """
+    Same result as values.map(func) for a func that passes NA values through unchanged,
+    but func is called once per distinct non-NA value instead of once per cell.
+
+    (survey columns have a handful of distinct answers repeated over all respondents)
+    """
+    if values.dtype != object:
+        # only str cells are changed by the survey normalizers
+        return values.copy()
+
+    arr = values.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(arr)
+
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [func(u) for u in uniques]
+
+    out = arr.copy()
+    has_value = codes >= 0
+    out[has_value] = mapped[codes[has_value]]
+
+    # same dtype inference as Series.map (e.g. all-NaN column -> float64)
+    return pd.Series(out, index=values.index, name=values.name).infer_objects()
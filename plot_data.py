@@ -0,0 +1,442 @@
+# plot_data.py
+"""
+Aggregation layer for the question plots (plotting_function.py).
+
+Every question is reduced to a small PlotData object before anything is drawn:
+  - labels  answer categories (bar / donut segments, matrix columns)
+  - counts  absolute counts (1D; matrix: items x labels)
+  - pcts    percentages the figure shows (same shape as counts)
+  - base_n  denominator / number of answering respondents
+  - items   matrix rows (None for single / checkbox / donut)
+The draw_* functions in plotting_function.py only consume PlotData, so aggregates
+can be computed once for all questions (aggregate_questions), hashed for the render
+cache, shipped to render workers and persisted next to the figures (save_plot_data).
+
+Aggregation results per plot kind:
+  - "bar"          single / likert percent bar      (pcts = counts / base_n)
+  - "checkbox"     checkbox percent bar             (pcts = counts / base_n respondents)
+  - "donut"        single donut                     (pcts = counts / base_n)
+  - "matrix"       100% stacked matrix              (pcts = row percent per item)
+  - "donut_split"  one "donut" PlotData per matrix item -> List[(item, PlotData)]
+
+weights (weighting.py, per respondent; None = unweighted): counts and base_n are sums
+of respondent weights (float) instead of row / respondent counts.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from tidy_access import TidyLike, select_question
+from weighting import weighted_nunique, weighted_value_counts, weights_for
+
+
+@dataclass
+class PlotData:
+    question_text: str
+    kind: str
+    labels: List[str]
+    counts: np.ndarray
+    pcts: np.ndarray
+    base_n: float  # int unless weighted
+    items: Optional[List[str]] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.base_n == 0 and self.counts.size == 0
+
+
+# single PlotData, or one per item for split donuts
+QuestionPlotData = Union[PlotData, List[Tuple[str, PlotData]]]
+
+
+#---------------------
+#AGGREGATION PER PLOT KIND
+#---------------------
+
+def _answer_counts(d: pd.DataFrame, order: Optional[List[str]], dropna: bool, weights: Optional[pd.Series] = None) -> pd.Series:
+    counts = weighted_value_counts(d, weights, dropna=dropna)
+    if order:
+        counts = counts.reindex(order, fill_value=0)
+    return counts
+
+
+def _pcts(counts: np.ndarray, base_n: float) -> np.ndarray:
+    return (counts / base_n * 100) if base_n > 0 else np.zeros(len(counts))
+
+
+def _n(counts: pd.Series, weights: Optional[pd.Series]) -> np.ndarray:
+    return counts.to_numpy(dtype=np.int64 if weights is None else np.float64)
+
+
+def _base(base_n: float, weights: Optional[pd.Series]) -> float:
+    return int(base_n) if weights is None else float(base_n)
+
+
+def aggregate_single(
+    d: pd.DataFrame,
+    question_text: str,
+    base_n: Optional[float] = None,
+    order: Optional[List[str]] = None,
+    kind: str = "bar",
+    weights: Optional[pd.Series] = None,
+) -> PlotData:
+    """single / likert (bar or donut): share of answers, base = base_n or all answers"""
+    counts = _answer_counts(d, order, dropna=False, weights=weights)
+    if base_n is None:
+        base_n = counts.sum()
+    n = _n(counts, weights)
+    return PlotData(
+        question_text=question_text,
+        kind=kind,
+        labels=[str(x) for x in counts.index.tolist()],
+        counts=n,
+        pcts=_pcts(n, base_n),
+        base_n=_base(base_n, weights),
+    )
+
+
+def aggregate_checkbox(
+    d: pd.DataFrame,
+    question_text: str,
+    base_n: Optional[float] = None,
+    order: Optional[List[str]] = None,
+    weights: Optional[pd.Series] = None,
+) -> PlotData:
+    """checkbox: share of respondents selecting each option, base = base_n or unique respondents"""
+    counts = _answer_counts(d, order, dropna=True, weights=weights)
+    if base_n is None:
+        base_n = weighted_nunique(d, weights)
+    n = _n(counts, weights)
+    return PlotData(
+        question_text=question_text,
+        kind="checkbox",
+        labels=[str(x) for x in counts.index.tolist()],
+        counts=n,
+        pcts=_pcts(n, base_n),
+        base_n=_base(base_n, weights),
+    )
+
+
+def aggregate_matrix(
+    d: pd.DataFrame,
+    question_text: str,
+    items_order: Optional[List[str]] = None,
+    answer_order: Optional[List[str]] = None,
+    weights: Optional[pd.Series] = None,
+) -> PlotData:
+    """matrix: counts per (item, answer) + percent within item"""
+    if d.empty:
+        return PlotData(question_text, "matrix", [], np.zeros((0, 0)), np.zeros((0, 0)), 0, items=[])
+
+    # count (sum of weights) per (item, answer)
+    if weights is None:
+        tab = d.groupby(["item", "answer"]).size().reset_index(name="n")
+    else:
+        tab = (
+            d.assign(n=weights_for(weights, d["respondent_id"]))
+            .groupby(["item", "answer"])["n"].sum()
+            .reset_index()
+        )
+
+    # enforce item order (show missing rows as 0)
+    if items_order:
+        all_items = list(items_order)
+    else:
+        all_items = tab["item"].dropna().astype(str).unique().tolist()
+
+    # enforce answer order (Ja/Nein/Keine Antwort) if given; else natural
+    if answer_order:
+        all_answers = list(answer_order)
+    else:
+        all_answers = tab["answer"].dropna().astype(str).unique().tolist()
+
+    # build pivot table with zeros
+    pivot_n = (
+        tab.pivot(index="item", columns="answer", values="n")
+        .reindex(index=all_items, columns=all_answers)
+        .fillna(0.0)
+    )
+
+    # convert to percent per item
+    row_sum = pivot_n.sum(axis=1).replace(0, np.nan)
+    pivot_pct = (pivot_n.div(row_sum, axis=0) * 100).fillna(0.0)
+
+    return PlotData(
+        question_text=question_text,
+        kind="matrix",
+        labels=[str(a) for a in pivot_pct.columns],
+        counts=pivot_n.to_numpy(dtype=float),
+        pcts=pivot_pct.to_numpy(dtype=float),
+        base_n=_base(weighted_nunique(d, weights), weights),
+        items=pivot_pct.index.astype(str).tolist(),
+    )
+
+
+def aggregate_donut_split(
+    d: pd.DataFrame,
+    question_text: str,
+    items_order: Optional[List[str]] = None,
+    answer_order: Optional[List[str]] = None,
+    base_n: Optional[float] = None,
+    max_plots: Optional[int] = None,
+    skip_empty: bool = True,
+    weights: Optional[pd.Series] = None,
+) -> List[Tuple[str, PlotData]]:
+    """matrix as one donut per item: answers of (question, item) like a single question"""
+    if d.empty:
+        return []
+
+    # decide item iteration order
+    if items_order:
+        items = list(items_order)
+    else:
+        items = d["item"].dropna().astype(str).unique().tolist()
+
+    if max_plots is not None:
+        items = items[:max_plots]
+
+    item_str = d["item"].astype(str)
+    out = []
+    for it in items:
+        di = d[item_str == str(it)]
+        if di.empty and skip_empty:
+            continue
+        out.append((it, aggregate_single(di, question_text, base_n=base_n, order=answer_order, kind="donut", weights=weights)))
+    return out
+
+
+#---------------------
+#ROUTER (mirrors plotting_function.plot_question)
+#---------------------
+
+def aggregate_question(
+    q: Dict[str, Any],
+    df_tidy: TidyLike,
+    base_map: Dict[str, float],
+    weights: Optional[pd.Series] = None,
+) -> QuestionPlotData:
+    """
+    PlotData of one catalog entry. weights: respondent weights (weighting.py); pass the
+    matching weighted base_map (weighting.weighted_base_map) with them.
+    """
+    qtext = q["question_text"]
+    qtype = q["type"]
+    plot_type = (q.get("plot_type") or "").lower()
+    base_n = base_map.get(qtext)
+
+    # spec-driven ordering
+    options_order = q.get("options_order") or None
+    answer_order = q.get("answer_order") or None
+    items_order = q.get("items_order") or None
+
+    d = select_question(df_tidy, qtext)
+
+    if qtype in {"single", "likert"}:
+        kind = "donut" if plot_type == "donut" else "bar"
+        return aggregate_single(d, qtext, base_n=base_n, order=options_order, kind=kind, weights=weights)
+
+    if qtype == "checkbox":
+        return aggregate_checkbox(d, qtext, base_n=base_n, order=options_order, weights=weights)
+
+    if qtype in {"matrix"}:
+        if plot_type == "donut":
+            return aggregate_donut_split(
+                d, qtext,
+                items_order=items_order,
+                answer_order=options_order or answer_order,
+                base_n=base_n,
+                weights=weights,
+            )
+        return aggregate_matrix(d, qtext, items_order=items_order, answer_order=answer_order, weights=weights)
+
+    if qtype == "matrix_multi" and plot_type == "donut":
+        return aggregate_donut_split(
+            d, qtext,
+            items_order=items_order,
+            answer_order=options_order or answer_order,  # usually options_order for matrix answers
+            weights=weights,
+        )
+
+    # fallback
+    if len(q.get("cols", [])) == 1:
+        return aggregate_single(d, qtext, base_n=base_n, order=options_order, weights=weights)
+    return aggregate_matrix(d, qtext, items_order=items_order, answer_order=answer_order, weights=weights)
+
+
+def aggregate_questions(
+    catalog: Sequence[Dict[str, Any]],
+    df_tidy: TidyLike,
+    base_map: Dict[str, float],
+    weights: Optional[pd.Series] = None,
+) -> Dict[str, QuestionPlotData]:
+    """all question aggregates at once (text questions are skipped)"""
+    out: Dict[str, QuestionPlotData] = {}
+    for q in catalog:
+        if str(q.get("type", "")).strip().lower() == "text":
+            continue
+        out[q["question_text"]] = aggregate_question(q, df_tidy, base_map, weights=weights)
+    return out
+
+
+#---------------------
+#PERSISTENCE
+#---------------------
+
+def _flatten(data: Dict[str, QuestionPlotData]) -> List[Tuple[str, Optional[str], PlotData]]:
+    rows = []
+    for key, v in data.items():
+        if isinstance(v, PlotData):
+            rows.append((key, None, v))
+        else:
+            rows += [(key, it, pdata) for it, pdata in v]
+            if not v:
+                rows.append((key, "", None))  # empty split (keeps the key)
+    return rows
+
+
+def save_plot_data(path: str | Path, data: Dict[str, QuestionPlotData]) -> Path:
+    """
+    Compact binary store (.npz, no pickle): numeric arrays as they are,
+    texts / scalars in one JSON header.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    header = []
+    arrays: Dict[str, np.ndarray] = {}
+    for i, (key, item, pdata) in enumerate(_flatten(data)):
+        if pdata is None:
+            header.append({"key": key, "split": True, "empty": True})
+            continue
+        header.append({
+            "key": key,
+            "split": item is not None,
+            "item": item,
+            "question_text": pdata.question_text,
+            "kind": pdata.kind,
+            "labels": pdata.labels,
+            "base_n": pdata.base_n,
+            "items": pdata.items,
+        })
+        arrays[f"{i}_counts"] = pdata.counts
+        arrays[f"{i}_pcts"] = pdata.pcts
+
+    arrays["__header__"] = np.array(json.dumps(header, ensure_ascii=False))
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def load_plot_data(path: str | Path) -> Dict[str, QuestionPlotData]:
+    out: Dict[str, QuestionPlotData] = {}
+    with np.load(Path(path), allow_pickle=False) as z:
+        header = json.loads(str(z["__header__"]))
+        for i, h in enumerate(header):
+            if h.get("empty"):
+                out.setdefault(h["key"], [])
+                continue
+            pdata = PlotData(
+                question_text=h["question_text"],
+                kind=h["kind"],
+                labels=h["labels"],
+                counts=z[f"{i}_counts"],
+                pcts=z[f"{i}_pcts"],
+                base_n=h["base_n"],
+                items=h["items"],
+            )
+            if h["split"]:
+                out.setdefault(h["key"], []).append((h["item"], pdata))
+            else:
+                out[h["key"]] = pdata
+    return out
+
+
+#---------------------
+#RESULT FRAMES (hypotheses / JG results)
+#---------------------
+
+def _column_arrays(prefix: str, values: pd.Index | pd.Series, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """one column (or index) -> typed array(s); returns its header entry"""
+    arr = values.to_numpy()
+    if arr.dtype != object:
+        arrays[prefix] = arr
+        return {"dtype": arr.dtype.str}
+    # text column: fixed-width unicode + null masks (None kept apart from NaN)
+    na = pd.isna(arr)
+    arrays[prefix] = np.where(na, "", arr).astype(str)
+    if na.any():
+        arrays[f"{prefix}_na"] = na
+        none = np.equal(arr, None)
+        if none.any():
+            arrays[f"{prefix}_none"] = none
+    return {"dtype": "object"}
+
+
+def _column_values(prefix: str, meta: Dict[str, Any], z) -> np.ndarray:
+    arr = z[prefix]
+    if meta["dtype"] != "object":
+        return arr
+    out = arr.astype(object)
+    if f"{prefix}_na" in z.files:
+        out[z[f"{prefix}_na"]] = np.nan
+    if f"{prefix}_none" in z.files:
+        out[z[f"{prefix}_none"]] = None
+    return out
+
+
+def save_frames(path: str | Path, frames: Dict[str, pd.DataFrame | pd.Series]) -> Path:
+    """
+    Analysis results (get_df_hypotheses / get_df_jg) as .npz, no pickle:
+    one array per column + index, names / dtypes in a JSON header.
+    Flat frames and series only (what the result dicts contain).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    header = []
+    arrays: Dict[str, np.ndarray] = {}
+    for i, (key, obj) in enumerate(frames.items()):
+        is_series = isinstance(obj, pd.Series)
+        df = obj.to_frame() if is_series else obj
+        idx = df.index
+        entry: Dict[str, Any] = {
+            "key": key,
+            "series": is_series,
+            "name": obj.name if is_series else None,
+            "columns": [str(c) for c in df.columns],
+            "index_name": idx.name,
+            "range_index": isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1,
+        }
+        if not entry["range_index"]:
+            entry["index"] = _column_arrays(f"{i}_index", idx, arrays)
+        entry["dtypes"] = [_column_arrays(f"{i}_c{j}", df.iloc[:, j], arrays) for j in range(df.shape[1])]
+        entry["n_rows"] = len(df)
+        header.append(entry)
+
+    arrays["__header__"] = np.array(json.dumps(header, ensure_ascii=False))
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def load_frames(path: str | Path) -> Dict[str, pd.DataFrame | pd.Series]:
+    out: Dict[str, pd.DataFrame | pd.Series] = {}
+    with np.load(Path(path), allow_pickle=False) as z:
+        header = json.loads(str(z["__header__"]))
+        for i, h in enumerate(header):
+            if h["range_index"]:
+                index = pd.RangeIndex(h["n_rows"], name=h["index_name"])
+            else:
+                index = pd.Index(_column_values(f"{i}_index", h["index"], z), name=h["index_name"])
+            data = {
+                c: _column_values(f"{i}_c{j}", meta, z)
+                for j, (c, meta) in enumerate(zip(h["columns"], h["dtypes"]))
+            }
+            df = pd.DataFrame(data, index=index, columns=h["columns"])
+            out[h["key"]] = df.iloc[:, 0].rename(h["name"]) if h["series"] else df
+    return out
@@ -12,34 +12,24 @@ import src.plotting.plotting_config as cfg
 import src.plotting.plotting_helper as helper
 import string
 
+from tidy_access import select_question
+from plot_data import (
+    PlotData, QuestionPlotData, aggregate_question,
+    aggregate_single, aggregate_checkbox, aggregate_matrix, aggregate_donut_split,
+)
+from render_cache import RenderManifest, fingerprint, config_fingerprint, source_fingerprint
+
 
 # -----------------------------
-# Plot types
+# Plot types (drawing only; data comes from plot_data.py)
 # -----------------------------
 
-def plot_single_percent_bar(
-    df_tidy: pd.DataFrame,
-    question_text: str,
-    base_n: Optional[int] = None,
-    order: Optional[List[str]] = None,
+def draw_single_percent_bar(
+    data: PlotData,
     horizontal_threshold: int = 4,
 ) -> plt.Figure:
-    d = df_tidy[df_tidy["question_text"] == question_text].copy()
-
-    counts = d["answer"].value_counts(dropna=False)
-    if order:
-        counts = counts.reindex(order, fill_value=0)
-
-    vc = counts.reset_index()
-    vc.columns = ["answer", "n"]
-
-    if base_n is None:
-        base_n = int(vc["n"].sum())
-
-    vc["pct"] = (vc["n"] / base_n * 100) if base_n > 0 else 0.0
-
-    labels = vc["answer"].astype(str).tolist()
-    pcts = vc["pct"].values
+    labels = data.labels
+    pcts = data.pcts
     use_horizontal = len(labels) > horizontal_threshold
 
     fig = plt.figure(figsize=cfg.FIGSIZE)
@@ -94,36 +84,16 @@ def plot_single_percent_bar(
     return fig
 
 
-def plot_checkbox_percent_bar(
-    df_tidy: pd.DataFrame,
-    question_text: str,
-    base_n: Optional[int] = None,
-
-    order: Optional[List[str]] = None,
+def draw_checkbox_percent_bar(
+    data: PlotData,
     horizontal_threshold: int = 4,
 ) -> plt.Figure:
     """
-    Checkbox: percent of respondents that selected each option.
-    denominator = base_n (respondents who saw the question) if provided,
-    else unique respondents in tidy for this question.
+    Checkbox: percent of respondents that selected each option
+    (denominator see plot_data.aggregate_checkbox).
     """
-    d = df_tidy[df_tidy["question_text"] == question_text].copy()
-
-    counts = d["answer"].value_counts()
-
-    if order:
-        counts = counts.reindex(order, fill_value=0)
-
-    vc = counts.reset_index()
-    vc.columns = ["answer", "n"]
-
-    if base_n is None:
-        base_n = int(d["respondent_id"].nunique())
-
-    vc["pct"] = (vc["n"] / base_n * 100) if base_n > 0 else 0.0
-
-    labels = vc["answer"].astype(str).tolist()
-    pcts = vc["pct"].values
+    labels = data.labels
+    pcts = data.pcts
 
     use_horizontal = len(labels) > horizontal_threshold
 
@@ -175,11 +145,8 @@ def plot_checkbox_percent_bar(
 
     return fig
 
-def plot_matrix_stacked_percent(
-    df_tidy: pd.DataFrame,
-    question_text: str,
-    items_order=None,
-    answer_order=None,
+def draw_matrix_stacked_percent(
+    data: PlotData,
     label_min_pct: float = 6.0,   # omit inside-label if segment < this
     ) -> plt.Figure:
 
@@ -196,53 +163,25 @@ def plot_matrix_stacked_percent(
       - text color
       """
 
-    d = df_tidy[df_tidy["question_text"] == question_text].copy()
-
     # empty guard
-    if d.empty:
+    if data.is_empty:
         fig = plt.figure(figsize=cfg.FIGSIZE)
         ax = fig.add_axes([cfg.AX_BOX_LEFT, cfg.AX_BOX_BOTTOM, cfg.AX_BOX_WIDTH, cfg.AX_BOX_HEIGHT])
         ax.axis("off")
         return fig
 
-    # count per (item, answer)
-    tab = d.groupby(["item", "answer"]).size().reset_index(name="n")
-
-    # enforce item order (show missing rows as 0)
-    if items_order:
-        all_items = list(items_order)
-    else:
-        all_items = tab["item"].dropna().astype(str).unique().tolist()
-
-    # enforce answer order (Ja/Nein/Keine Antwort) if given; else natural
-    if answer_order:
-        all_answers = list(answer_order)
-    else:
-        all_answers = tab["answer"].dropna().astype(str).unique().tolist()
-
-    # build pivot table with zeros
-    pivot_n = (
-        tab.pivot(index="item", columns="answer", values="n")
-        .reindex(index=all_items, columns=all_answers)
-        .fillna(0.0)
-    )
-
-    # convert to percent per item
-    row_sum = pivot_n.sum(axis=1).replace(0, np.nan)
-    pivot_pct = (pivot_n.div(row_sum, axis=0) * 100).fillna(0.0)
-
     # figure + fixed uniform axes box
     fig = plt.figure(figsize=cfg.FIGSIZE)
     ax = fig.add_axes([cfg.AX_BOX_LEFT, cfg.AX_BOX_BOTTOM, cfg.AX_BOX_WIDTH, cfg.AX_BOX_HEIGHT])
 
     # plot stacked bars
-    y = np.arange(len(pivot_pct.index))
-    left = np.zeros(len(pivot_pct.index))
+    y = np.arange(len(data.items))
+    left = np.zeros(len(data.items))
 
     legend_farbe = [cfg.PALETTE[1],cfg.PALETTE[2],cfg.PALETTE[3]] #green for ja, orange for no, light blue for no answer
 
-    for i, ans in enumerate(pivot_pct.columns):
-        vals = pivot_pct[ans].values
+    for i, ans in enumerate(data.labels):
+        vals = data.pcts[:, i]
         ax.barh(
             y,
             vals,
@@ -269,8 +208,7 @@ def plot_matrix_stacked_percent(
 
 
     # y labels (wrapped)
-    labels = pivot_pct.index.astype(str).tolist()
-    wrapped = helper._wrap_labels(labels)
+    wrapped = helper._wrap_labels(data.items)
 
     ax.set_yticks(y)
     ax.set_yticklabels(wrapped)
@@ -289,106 +227,38 @@ def plot_matrix_stacked_percent(
 
     return fig
 
-def plot_donut_single(
-    df_tidy: pd.DataFrame,
-    question_text: str,
-    base_n: Optional[int] = None,
-    order: Optional[List[str]] = None,
+def draw_donut_single(
+    data: PlotData,
     figsize: Tuple[float, float] = (8.0, 5.5),
 ) -> plt.Figure:
 
-    d = df_tidy[df_tidy["question_text"] == question_text].copy()
-    counts = d["answer"].value_counts(dropna=False)
-
-    if order:
-        counts = counts.reindex(order, fill_value=0)
-
-    if base_n is None:
-        base_n = int(counts.sum())
-
-    pcts = (counts.values / base_n * 100) if base_n > 0 else np.zeros(len(counts))
-    labels = [str(x) for x in counts.index.tolist()]
-
     # ✅ use passed figsize
     fig = plt.figure(figsize=figsize)
 
     # ✅ add_axes controls layout; subplots_adjust is not needed
     ax = fig.add_axes([cfg.AX_BOX_LEFT_DONUT, cfg.AX_BOX_BOTTOM, cfg.AX_BOX_WIDTH, cfg.AX_BOX_HEIGHT])
-    helper._donut_one(ax, labels=helper._wrap_labels(labels), pcts=pcts)
+    helper._donut_one(ax, labels=helper._wrap_labels(data.labels), pcts=data.pcts)
 
     return fig
 
-def plot_donut_matrix_split(
-    df_tidy: pd.DataFrame,
-    question_text: str,
-    items_order: Optional[List[str]] = None,
-    answer_order: Optional[List[str]] = None,
-    base_n: Optional[int] = None,
+def draw_donut_matrix_split(
+    split: List[Tuple[str, PlotData]],
     figsize=None,
-    max_plots: Optional[int] = None,
-    skip_empty: bool = True,
     title_fmt: str = "{item}",
     plot_note: Optional[str] = None,
 ):
     """
-    Create one donut per matrix item by reusing plot_donut_single().
-
-    Input df_tidy schema:
-      respondent_id | question_text | item | answer
-
-    For each item:
-      - filter rows of (question_text,item)
-      - make a 'single-like' tidy (item=None) with answer categories
-      - call plot_donut_single on that subset
+    One donut per matrix item (plot_data.aggregate_donut_split), drawn with draw_donut_single().
 
     Returns: list[(item, fig)]
     """
 
-    d = df_tidy[df_tidy["question_text"] == question_text].copy()
-    if d.empty:
-        return []
-
-    # decide item iteration order
-    if items_order:
-        items = list(items_order)
-    else:
-        items = d["item"].dropna().astype(str).unique().tolist()
-
-    if max_plots is not None:
-        items = items[:max_plots]
-
     figs = []
 
-    for it in items:
-        di = d[d["item"].astype(str) == str(it)].copy()
-
-        if di.empty:
-            if skip_empty:
-                continue
-            # create empty fig via plot_donut_single (will handle empty guard if you have one)
-            di = pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
-
-        # Build "single-like" view:
-        # - keep answers
-        # - set item=None so plot_donut_single treats it as single question
-        single_like = di[["respondent_id", "answer"]].copy()
-        single_like["question_text"] = question_text
-        single_like["item"] = None
-
-        # Enforce answer ordering (important: avoid NaN from reindex in plot)
-        order = answer_order
-
-        # Call your existing single donut
-        fig = plot_donut_single(
-            single_like,
-            question_text,
-            base_n=base_n,
-            order=order,
-            figsize=figsize,
-        )
+    for it, data in split:
+        fig = draw_donut_single(data, figsize=figsize)
 
         # Put item title / note onto figure (optional)
-        # If plot_donut_single sets a title already, you can append or overwrite
         if title_fmt:
             fig.suptitle(title_fmt.format(item=it), y=0.98, fontsize=12)
 
@@ -404,88 +274,157 @@ def plot_donut_matrix_split(
     return figs
 
 
+# -----------------------------
+# Aggregate + draw (df_tidy in, figure out)
+# -----------------------------
+
+def plot_single_percent_bar(
+    df_tidy: pd.DataFrame,
+    question_text: str,
+    base_n: Optional[int] = None,
+    order: Optional[List[str]] = None,
+    horizontal_threshold: int = 4,
+) -> plt.Figure:
+    d = select_question(df_tidy, question_text)
+    data = aggregate_single(d, question_text, base_n=base_n, order=order)
+    return draw_single_percent_bar(data, horizontal_threshold=horizontal_threshold)
+
+
+def plot_checkbox_percent_bar(
+    df_tidy: pd.DataFrame,
+    question_text: str,
+    base_n: Optional[int] = None,
+
+    order: Optional[List[str]] = None,
+    horizontal_threshold: int = 4,
+) -> plt.Figure:
+    """
+    Checkbox: percent of respondents that selected each option.
+    denominator = base_n (respondents who saw the question) if provided,
+    else unique respondents in tidy for this question.
+    """
+    d = select_question(df_tidy, question_text)
+    data = aggregate_checkbox(d, question_text, base_n=base_n, order=order)
+    return draw_checkbox_percent_bar(data, horizontal_threshold=horizontal_threshold)
+
+
+def plot_matrix_stacked_percent(
+    df_tidy: pd.DataFrame,
+    question_text: str,
+    items_order=None,
+    answer_order=None,
+    label_min_pct: float = 6.0,   # omit inside-label if segment < this
+    ) -> plt.Figure:
+    d = select_question(df_tidy, question_text)
+    data = aggregate_matrix(d, question_text, items_order=items_order, answer_order=answer_order)
+    return draw_matrix_stacked_percent(data, label_min_pct=label_min_pct)
+
+
+def plot_donut_single(
+    df_tidy: pd.DataFrame,
+    question_text: str,
+    base_n: Optional[int] = None,
+    order: Optional[List[str]] = None,
+    figsize: Tuple[float, float] = (8.0, 5.5),
+) -> plt.Figure:
+    d = select_question(df_tidy, question_text)
+    data = aggregate_single(d, question_text, base_n=base_n, order=order, kind="donut")
+    return draw_donut_single(data, figsize=figsize)
+
+
+def plot_donut_matrix_split(
+    df_tidy: pd.DataFrame,
+    question_text: str,
+    items_order: Optional[List[str]] = None,
+    answer_order: Optional[List[str]] = None,
+    base_n: Optional[int] = None,
+    figsize=None,
+    max_plots: Optional[int] = None,
+    skip_empty: bool = True,
+    title_fmt: str = "{item}",
+    plot_note: Optional[str] = None,
+):
+    """
+    Create one donut per matrix item.
+
+    Input df_tidy schema:
+      respondent_id | question_text | item | answer
+
+    Returns: list[(item, fig)]
+    """
+    d = select_question(df_tidy, question_text)
+    split = aggregate_donut_split(
+        d, question_text,
+        items_order=items_order,
+        answer_order=answer_order,
+        base_n=base_n,
+        max_plots=max_plots,
+        skip_empty=skip_empty,
+    )
+    return draw_donut_matrix_split(split, figsize=figsize, title_fmt=title_fmt, plot_note=plot_note)
+
+
 
 # -----------------------------
 # Router (select plot function by q["type"])
 # -----------------------------
-def plot_question(
+def draw_question(
     q: Dict[str, Any],
-    df_tidy: pd.DataFrame,
-    base_map: Dict[str, int],
+    data: QuestionPlotData,
 ) -> Union[plt.Figure, List[Tuple[str, plt.Figure]]]:
+    """draws the aggregate of plot_data.aggregate_question (same routing)"""
 
-    qtext = q["question_text"]
     qtype = q["type"]
     plot_type = (q.get("plot_type") or "").lower()
-    base_n = base_map.get(qtext)
-
-    # spec-driven ordering
-    options_order = q.get("options_order") or None
-    answer_order = q.get("answer_order") or None
-    items_order = q.get("items_order") or None
 
     if qtype in {"single", "likert"}:
         if plot_type == "donut":
-            base_n = base_map.get(qtext)
-            return plot_donut_single(
-                df_tidy, qtext,
-                base_n=base_n,
-                order=options_order,
-                figsize=cfg.FIGSIZE_DONUT,
-            )
+            return draw_donut_single(data, figsize=cfg.FIGSIZE_DONUT)
         else:
-            return plot_single_percent_bar(
-                df_tidy, qtext,
-                base_n=base_n,
-                order=options_order,
-                horizontal_threshold=cfg.HORIZONTAL_THRESHOLD,
-            )
+            return draw_single_percent_bar(data, horizontal_threshold=cfg.HORIZONTAL_THRESHOLD)
 
     if qtype == "checkbox":
-        return plot_checkbox_percent_bar(df_tidy, qtext, base_n=base_n, order=options_order)
+        return draw_checkbox_percent_bar(data)
 
     if qtype in {"matrix"}:
         if plot_type == "donut":
-            return plot_donut_matrix_split(
-                df_tidy, qtext,
-                items_order=items_order,
-                answer_order=options_order or answer_order,
-                base_n=base_n,
+            return draw_donut_matrix_split(
+                data,
                 figsize=cfg.FIGSIZE_DONUT,
                 plot_note=q.get("plot_note"),  # optional aus spec
                 title_fmt="{}".format("{item}"),
             )
         else:
-            return plot_matrix_stacked_percent(
-                df_tidy=df_tidy,
-                question_text=qtext,
-                items_order=items_order,
-                answer_order=answer_order,
-            )
+            return draw_matrix_stacked_percent(data)
 
     if qtype == "matrix_multi" and plot_type == "donut":
-        return plot_donut_matrix_split(
-                df_tidy, qtext,
-                items_order=items_order,
-                answer_order=options_order or answer_order,  # usually options_order for matrix answers
-                figsize=cfg.FIGSIZE_DONUT,
-            )
+        return draw_donut_matrix_split(data, figsize=cfg.FIGSIZE_DONUT)
 
     # fallback
     if len(q.get("cols", [])) == 1:
-        return plot_single_percent_bar(df_tidy, qtext, base_n=base_n, order=options_order)
-    return plot_matrix_stacked_percent(df_tidy, qtext, items_order=items_order, answer_order=answer_order)
+        return draw_single_percent_bar(data)
+    return draw_matrix_stacked_percent(data)
 
-def plot_question_and_save(
+
+def plot_question(
     q: Dict[str, Any],
     df_tidy: pd.DataFrame,
     base_map: Dict[str, int],
+) -> Union[plt.Figure, List[Tuple[str, plt.Figure]]]:
+    return draw_question(q, aggregate_question(q, df_tidy, base_map))
+
+def plot_question_and_save(
+    q: Dict[str, Any],
+    df_tidy: Optional[pd.DataFrame],
+    base_map: Dict[str, int],
     out_dir: Path,
     prefix_index: Optional[int] = None,
+    plot_data: Optional[QuestionPlotData] = None,
 ) -> List[Path]:
 
     """
     Create plot(s) for one question, add caption(s), save, return output path(s).
+    plot_data: precomputed aggregate (plot_data.aggregate_question); computed from df_tidy if None.
 
     Special rule:
     - type == "text" -> skip (no plot saved)
@@ -502,7 +441,38 @@ def plot_question_and_save(
             print(f"SKIP (text): {qtext}")
         return []
 
-    result = plot_question(q, df_tidy, base_map)
+    if plot_data is None:
+        plot_data = aggregate_question(q, df_tidy, base_map)
+
+    # --- incremental render: same inputs and files still on disk -> nothing to draw ---
+    manifest = RenderManifest(out_dir)
+    safe = helper._make_filename_safe(q["question_text"])
+    render_key = f"{prefix_index:02d}_{safe}" if prefix_index is not None else safe
+    digest = fingerprint(
+        q,
+        plot_data,
+        prefix_index,
+        config_fingerprint(),
+        source_fingerprint(draw_question),
+    )
+    cached = manifest.lookup(render_key, digest)
+    if cached is not None:
+        return cached
+
+    out_paths = _render_question_figures(q, plot_data, out_dir, prefix_index)
+    manifest.record(render_key, digest, out_paths)
+    return out_paths
+
+
+def _render_question_figures(
+    q: Dict[str, Any],
+    plot_data: QuestionPlotData,
+    out_dir: Path,
+    prefix_index: Optional[int],
+) -> List[Path]:
+    """draw + caption + save the figure(s) of one question"""
+
+    result = draw_question(q, plot_data)
 
     out_paths: List[Path] = []
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -3,28 +3,33 @@ from __future__ import annotations
 
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Sequence
 
 import numpy as np
 import pandas as pd
-from normalize_survey_text import normalize_by_canon_map,CANON_MAP,ORDER_KEYS
+from normalize_survey_text import (
+    normalize_by_canon_map, normalize_series_by_canon_map, CANON_MAP, ORDER_KEYS, map_unique,
+)
+import survey_cache
+from tidy_access import NA_CATEGORY, select_questions, TidyStore, TidyLike
+from answer_matrix import build_answer_matrix
+from respondent_index import RespondentIndex
+from likert_codes import build_likert_codes
+from logger import span
 
 HEADER_RE = re.compile(r"^(.*?)(?:\s*\[(.+?)\])?\s*$")
 
-#-------
-Q1_TEXT = "Welche der nachfolgenden Industrie 4.0-Technologien generieren für Sie einen Mehrwert bei der Umsetzung zirkulärer Wertschöpfungsprozesse?"
-Q2_TEXT = "In welchen Lebenszyklusphasen bzw. Elementen des zirkulären Wertschöpfungsprozesses erwarten Sie den größten Mehrwert durch Industrie 4.0-Technologien? (Mehrfachauswahl möglich)"
-Q1_ITEMS_ORDER = [
-        "Traceability-Technologien(z. B. RFID, Barcode, QR-Code)",
-        "Sensorik in Produkten(z.B. Druck, Drehzahl, Temperatur, …)",
-        "Sensorik in Maschinen(z.B. Strom- oder Druckluftverbrauch, …)",
-        "Standards zum Datenaustausch (z.B. OPC UA)",
-        "Datenplattformen, Ökosysteme und Dateninfrastrukturen (z. B. Digitaler Produktpass)",
-        "Künstliche Intelligenz und Datenanalyse (z.B. Zustandsüberwachung, datengetriebene Entscheidungsfindung, …)",
-        "Simulationen (z.B. Materialflusssimulation)",
-        "Verwaltungsschale (Asset Administration Shell, AAS)"
-      ]
+# default [item] / [item][answer] header patterns of the matrix tidiers (see col_parse in the spec)
+MATRIX_SINGLE_PATTERN = r"\[(?P<item>[^\]]+)\]\s*$"
+MATRIX_MULTI_PATTERN = r"\[(?P<item>[^\]]+)\]\[(?P<answer>[^\]]+)\]\s*$"
+
+HEADER_CACHE_SIZE = 65536
+
+# spec key for conditional virtual questions (see build_conditional_virtual_questions)
+CONDITIONAL_SPEC_KEY = "__conditional__"
+
 #---------------------
 
 #---------------------
@@ -42,12 +47,43 @@ def _norm_list_values(lst, canon_map):
         return lst
     return [normalize_by_canon_map(v, canon_map) for v in lst]
 
+@lru_cache(maxsize=None)
+def _header_regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=HEADER_CACHE_SIZE)
+def parse_header(colname: str, pattern: str = HEADER_RE.pattern, normalize: bool = False) -> Optional[Tuple[Optional[str], ...]]:
+    """
+    Regex groups of one column header (None if the pattern does not match).
+    Headers only depend on the column name, so every (column, pattern) is parsed once
+    per process; split_header / build_catalog and the matrix tidiers share this cache.
+    normalize: collapse NBSP / whitespace first (_norm_key), as the matrix tidiers do.
+    """
+    s = _norm_key(colname) if normalize else str(colname)
+    m = _header_regex(pattern).search(s)
+    return m.groups() if m else None
+
+
+def header_group(colname: str, pattern: str, name: str, normalize: bool = True) -> Optional[str]:
+    """one named group of parse_header (stripped), None if missing"""
+    groups = parse_header(colname, pattern, normalize)
+    if groups is None:
+        return None
+    v = groups[_header_regex(pattern).groupindex[name] - 1]
+    return v.strip() if v is not None else None
+
+
+def clear_header_cache() -> None:
+    parse_header.cache_clear()
+
+
 def split_header(colname: str) -> Tuple[str, Optional[str]]:
-    m = HEADER_RE.match(str(colname))
-    if not m:
+    groups = parse_header(str(colname))
+    if groups is None:
         return str(colname).strip(), None
-    q = (m.group(1) or "").strip()
-    item = (m.group(2) or "").strip() if m.group(2) else None
+    q = (groups[0] or "").strip()
+    item = groups[1].strip() if groups[1] else None
     return q, item
 
 
@@ -72,6 +108,53 @@ def normalize_yes_no(x: Any) -> Any:
     return s
 
 
+def normalize_cell(x: Any) -> Any:
+    """normalize_str + normalize_yes_no for one cell"""
+    return normalize_yes_no(normalize_str(x))
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column-wise equivalent of df.map(normalize_str).map(normalize_yes_no):
+    each distinct value of a column is normalized once and broadcast back.
+    """
+    cols = [map_unique(df.iloc[:, i], normalize_cell) for i in range(df.shape[1])]
+    if not cols:
+        return df.copy()
+    out = pd.concat(cols, axis=1)
+    out.columns = df.columns
+    return out
+
+
+def is_selected(v: Any) -> bool:
+    """checkbox cell -> selected? (numeric 1, True, "1"/"x"/"ja"/"true")"""
+    if pd.isna(v):
+        return False
+    if isinstance(v, bool):
+        return v
+    try:
+        return float(v) == 1.0
+    except Exception:
+        return str(v).strip().lower() in {"1", "x", "ja", "true"}
+
+
+def selected_mask(block: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized is_selected over a block of checkbox columns -> bool array (rows x cols).
+    Numeric / bool blocks compare against 1 directly; text blocks evaluate
+    is_selected once per distinct cell value and broadcast the result.
+    """
+    if all(pd.api.types.is_numeric_dtype(dt) for dt in block.dtypes):
+        return block.to_numpy(dtype=float, na_value=np.nan) == 1.0
+
+    values = block.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values.ravel())
+    hits = np.fromiter((is_selected(u) for u in uniques), dtype=bool, count=len(uniques))
+    # code -1 = missing -> not selected
+    hits = np.append(hits, False)
+    return hits[codes].reshape(values.shape)
+
+
 def load_spec(spec_path: Optional[str | Path]) -> Dict[str, Any]:
     if spec_path is None:
         return {}
@@ -112,7 +195,7 @@ def build_catalog(
 
     # --- normalize spec keys once ---
     defaults = spec.get("__defaults__", {})
-    spec_norm = {_norm_key(k): v for k, v in spec.items() if k != "__defaults__"}
+    spec_norm = {_norm_key(k): v for k, v in spec.items() if not k.startswith("__")}
 
     q_to_cols: Dict[str, List[str]] = {}
     q_to_items: Dict[str, set] = {}
@@ -236,23 +319,17 @@ def tidy_matrix_single(df_q: pd.DataFrame, q: Dict[str, Any]) -> pd.DataFrame:
         id_vars="respondent_id", var_name="col", value_name="answer"
     )
 
-    # 3) normalize column text (NBSP etc.)
-    col_norm = (
-        melted["col"]
-        .astype(str)
-        .str.replace("\u00A0", " ", regex=False)
-        .str.replace(r"\s+", " ", regex=True)
-        .str.strip()
-    )
-
-    # 4) parse single bracket item at end: [... ]
-    pattern = (q.get("col_parse") or {}).get("pattern") or r"\[(?P<item>[^\]]+)\]\s*$"
-    extracted = col_norm.str.extract(pattern)
+    # 3) parse single bracket item at end: [... ] once per column (normalized header
+    #    as fallback), then join to the melted rows by column code
+    pattern = (q.get("col_parse") or {}).get("pattern") or MATRIX_SINGLE_PATTERN
+    col_item = np.array([header_group(c, pattern, "item") for c in qcols], dtype=object)
+    col_item = np.where(pd.isna(col_item), [_norm_key(c) for c in qcols], col_item)
+    col_codes = pd.Index(qcols).get_indexer(melted["col"])
 
     melted["question_text"] = q["question_text"]
-    melted["item"] = extracted["item"].fillna(col_norm).astype(str).str.strip()
+    melted["item"] = col_item[col_codes]
 
-    # 5) keep only answered
+    # 4) keep only answered
     melted = melted.dropna(subset=["answer"])
 
     return melted[["respondent_id", "question_text", "item", "answer"]]
@@ -281,54 +358,126 @@ def tidy_matrix_multi(df_q: pd.DataFrame, q: Dict[str, Any]) -> pd.DataFrame:
     if not qcols:
         return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
 
-    # 2) melt (IMPORTANT: value column must NOT be named "answer")
-    melted = df_q[["respondent_id"] + qcols].melt(
-        id_vars="respondent_id",
-        var_name="col",
-        value_name="value",
-    )
+    # 2) selected cells on the wide block (no melt of unselected cells)
+    mask = selected_mask(df_q[qcols])
 
-    # 3) keep only selected checkboxes
-    def _is_selected(v: Any) -> bool:
-        if pd.isna(v):
-            return False
-        if isinstance(v, bool):
-            return v
-        try:
-            return float(v) == 1.0
-        except Exception:
-            return str(v).strip().lower() in {"1", "x", "ja", "true"}
-
-    melted = melted[melted["value"].map(_is_selected)]
-    if melted.empty:
-        return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
+    # 3) parse [item][answer] once per column header (cached per column + pattern)
+    pattern = (q.get("col_parse") or {}).get("pattern") or MATRIX_MULTI_PATTERN
+    col_item = np.array([header_group(c, pattern, "item") for c in qcols], dtype=object)
+    col_answer = np.array([header_group(c, pattern, "answer") for c in qcols], dtype=object)
 
-    # 4) normalize column string
-    col_norm = (
-        melted["col"]
-        .astype(str)
-        .str.replace("\u00A0", " ", regex=False)
-        .str.replace(r"\s+", " ", regex=True)
-        .str.strip()
-    )
+    # drop parse failures (whole columns)
+    mask[:, pd.isna(col_item) | pd.isna(col_answer)] = False
 
-    # 5) parse [item][answer] from end of column name
-    pattern = (q.get("col_parse") or {}).get("pattern") or r"\[(?P<item>[^\]]+)\]\[(?P<answer>[^\]]+)\]\s*$"
-    extracted = col_norm.str.extract(pattern)
+    # 4) broadcast to the selected cells, column by column (same order as melt)
+    col_idx, row_idx = np.nonzero(mask.T)
+    if len(col_idx) == 0:
+        return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
 
-    # 6) assign parsed item/answer (CRITICAL)
-    melted["item"] = extracted["item"].astype(str).str.strip()
-    melted["answer"] = extracted["answer"].astype(str).str.strip()
-    melted["question_text"] = q["question_text"]
+    out = pd.DataFrame(
+        {
+            "respondent_id": df_q["respondent_id"].to_numpy()[row_idx],
+            "question_text": q["question_text"],
+            "item": col_item[col_idx],
+            "answer": col_answer[col_idx],
+        },
+        index=col_idx * len(df_q) + row_idx,
+    )
+    return out
 
-    # 7) drop parse failures
-    melted = melted[melted["item"].ne("nan") & melted["answer"].ne("nan")]
 
-    return melted[["respondent_id", "question_text", "item", "answer"]]
+def build_conditional_virtual_questions(
+    df_tidy: TidyLike,
+    conditionals: Sequence[Dict[str, Any]],
+) -> pd.DataFrame:
+    """
+    Virtual questions "target question, only respondents who gave one of the condition
+    answers to the condition question for the SAME item", for any number of pairs.
+
+    Each conditional (spec: "__conditional__" list):
+      - condition_question, condition_answers
+      - target_question
+      - target_answers   (optional) keep only these target answers
+      - items_order      (optional) items + order; default: items of both questions, sorted
+      - question_prefix  virtual question text = "<prefix> | <item>"
+
+    All pairs are evaluated together: the rows of every involved question are selected
+    once, condition hits are respondent bitsets per (condition question, item, answers)
+    (respondent_index.py), stacked into one matrix, and all target rows are tested
+    against the bitset of their (pair, item) in one lookup - no join over respondents.
+
+    Output rows schema matches df_tidy (item=None -> single-like):
+      respondent_id | question_text | item | answer
+    """
+    out_cols = ["respondent_id", "question_text", "item", "answer"]
+    empty = pd.DataFrame(columns=out_cols)
+    if not conditionals:
+        return empty
+
+    # --- declared pairs as lookup tables
+    cond_q, target_q, target_keep, restricted, prefixes = [], [], [], set(), []
+    for pair, c in enumerate(conditionals):
+        cond_q.append(c["condition_question"])
+        target_q.append((pair, c["target_question"]))
+        if c.get("target_answers") is not None:
+            restricted.add(pair)
+            target_keep += [(pair, str(a)) for a in c["target_answers"]]
+        prefixes.append(c["question_prefix"])
+    target_q = pd.DataFrame(target_q, columns=["pair", "question_text"])
+
+    # --- one selection for all involved questions
+    questions = list(dict.fromkeys(cond_q + target_q["question_text"].tolist()))
+    d = select_questions(df_tidy, questions, columns=out_cols)
+    d = d[d["item"].notna()]
+    d["item"] = d["item"].astype(str)
+    d["answer"] = d["answer"].astype(str)
+    d["_row"] = np.arange(len(d))
+
+    # target rows per pair; keep those whose respondent gave a condition answer for the same item
+    idx = RespondentIndex(d)
+    sel = d.merge(target_q, on="question_text")[["pair", "_row", "respondent_id", "item", "answer"]]
+    group = sel.groupby(["pair", "item"], sort=False).ngroup().to_numpy()
+    keys = sel[["pair", "item"]].drop_duplicates()  # ngroup order (first appearance)
+    cond_answers = [[str(a) for a in c["condition_answers"]] for c in conditionals]
+    bits = np.stack(
+        [idx.bits(conditionals[p]["condition_question"], item=it, answers=cond_answers[p])
+         for p, it in zip(keys["pair"], keys["item"])]
+    ) if len(keys) else np.zeros((0, len(idx.empty())), dtype=np.uint8)
+    sel = sel[idx.member_of(sel["respondent_id"].to_numpy(), group, bits)]
+
+    # optional target answer filter (only for pairs that declare one; an empty list keeps nothing)
+    if restricted:
+        keep = pd.MultiIndex.from_tuples(target_keep, names=["pair", "answer"])
+        ok = pd.MultiIndex.from_arrays([sel["pair"], sel["answer"]]).isin(keep)
+        sel = sel[ok | ~sel["pair"].isin(restricted)]
+
+    # items per pair (declared order or sorted intersection) -> rank
+    item_rank = []
+    for pair, c in enumerate(conditionals):
+        items = c.get("items_order")
+        if not items:
+            in_cond = set(d.loc[d["question_text"] == c["condition_question"], "item"])
+            in_target = set(d.loc[d["question_text"] == c["target_question"], "item"])
+            items = sorted(in_cond & in_target)
+        item_rank += [(pair, it, rank) for rank, it in enumerate(dict.fromkeys(items))]
+    item_rank = pd.DataFrame(item_rank, columns=["pair", "item", "rank"])
+    sel = sel.merge(item_rank, on=["pair", "item"])
+
+    if sel.empty:
+        return empty
+
+    sel = sel.sort_values(["pair", "rank", "_row"], kind="stable")
+    out = pd.DataFrame({
+        "respondent_id": sel["respondent_id"].to_numpy(),
+        "question_text": np.asarray(prefixes, dtype=object)[sel["pair"].to_numpy()] + " | " + sel["item"].to_numpy(dtype=object),
+        "item": None,  # makes it single-like
+        "answer": sel["answer"].to_numpy(),
+    })
+    return out[out_cols]
 
 
 def build_q2_conditional_virtual_questions(
-    df_tidy: pd.DataFrame,
+    df_tidy: TidyLike,
     q1_text: str,
     q2_text: str,
     items_order: Optional[List[str]] = None,
@@ -337,95 +486,62 @@ def build_q2_conditional_virtual_questions(
     q2_virtual_prefix: str = "Q2 (filtered by Q1 high value)",
 ) -> pd.DataFrame:
     """
-    Creates virtual questions for Q2 conditioned on Q1 high answers per technology item.
-
-    Output rows schema matches df_tidy:
-      respondent_id | question_text | item | answer
-
-    For each technology item t:
-      - Filter respondents who answered Q1(t) in q1_high_answers
-      - Take their Q2 selections for the SAME item t
-      - Emit a virtual question where item=None and answer=phase
+    Creates virtual questions for Q2 conditioned on Q1 high answers per technology item
+    (single pair of build_conditional_virtual_questions).
     """
+    return build_conditional_virtual_questions(df_tidy, [{
+        "condition_question": q1_text,
+        "condition_answers": list(q1_high_answers),
+        "target_question": q2_text,
+        "target_answers": q2_answer_keep,
+        "items_order": items_order,
+        "question_prefix": q2_virtual_prefix,
+    }])
 
-    # --- Q1 subset
-    d1 = df_tidy[df_tidy["question_text"] == q1_text].copy()
-    d1["item"] = d1["item"].astype(str)
-    d1["answer"] = d1["answer"].astype(str)
-
-    # --- Q2 subset
-    d2 = df_tidy[df_tidy["question_text"] == q2_text].copy()
-    d2["item"] = d2["item"].astype(str)
-    d2["answer"] = d2["answer"].astype(str)
-
-    if items_order:
-        items = list(items_order)
-    else:
-        # intersection of items appearing in either Q1 or Q2
-        items = sorted(set(d1["item"].dropna().unique()).intersection(set(d2["item"].dropna().unique())))
-
-    out_rows = []
-
-    for it in items:
-        # respondents with high value for this technology in Q1
-        keep_ids = d1.loc[
-            (d1["item"] == it) & (d1["answer"].isin(q1_high_answers)),
-            "respondent_id"
-        ].unique()
 
-        if len(keep_ids) == 0:
-            continue
+# tidy types that melt several source columns (see build_tidy(source_order=True))
+TIDY_MULTI_COLUMN_TYPES = {"checkbox", "matrix", "matrix_single", "matrix_multi"}
 
-        # their Q2 selections for the same item
-        sel = d2.loc[(d2["item"] == it) & (d2["respondent_id"].isin(keep_ids)), ["respondent_id", "answer"]].copy()
 
-        if q2_answer_keep is not None:
-            sel = sel[sel["answer"].isin(set(map(str, q2_answer_keep)))]
-
-        if sel.empty:
-            # still create nothing; or you can create a dummy "Keine Antwort" row if you prefer
-            continue
-
-        v_qtext = f"{q2_virtual_prefix} | {it}"
-        sel["question_text"] = v_qtext
-        sel["item"] = None  # makes it single-like
-        out_rows.append(sel[["respondent_id", "question_text", "item", "answer"]])
-
-    if not out_rows:
-        return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
-
-    return pd.concat(out_rows, ignore_index=True)
-
-
-def build_tidy(df_q: pd.DataFrame, catalog: List[Dict[str, Any]]) -> pd.DataFrame:
+def build_tidy(df_q: pd.DataFrame, catalog: List[Dict[str, Any]], source_order: bool = False) -> pd.DataFrame:
+    """
+    source_order: add _q (catalog position) and _col (position of the source column
+    within the question) per row; (_q, _col, respondent row) is the row order of
+    df_tidy, so chunked builds can be put back into the in-memory order.
+    """
     frames: List[pd.DataFrame] = []
-    for q in catalog:
+    for k, q in enumerate(catalog):
         t = q["type"]
         if t in {"single", "likert"}:
-            frames.append(tidy_single_like(df_q, q))
+            f = tidy_single_like(df_q, q)
         elif t == "text":
-            frames.append(tidy_text(df_q, q))
+            f = tidy_text(df_q, q)
         elif t == "checkbox":
-            frames.append(tidy_checkbox(df_q, q))
+            f = tidy_checkbox(df_q, q)
         elif t == "matrix":
-            frames.append(tidy_matrix(df_q, q))
+            f = tidy_matrix(df_q, q)
         elif t == "matrix_single":
-            frames.append(tidy_matrix_single(df_q,q))
+            f = tidy_matrix_single(df_q,q)
         elif t == "matrix_multi":
-            frames.append(tidy_matrix_multi(df_q,q))
+            f = tidy_matrix_multi(df_q,q)
         else:
             # fallback
             if len(q["cols"]) == 1:
-                frames.append(tidy_single_like(df_q, q))
+                f = tidy_single_like(df_q, q)
             else:
-                frames.append(tidy_matrix(df_q, q))
+                f = tidy_matrix(df_q, q)
+        if source_order:
+            # one column: index = df_q labels; melted / wide blocks: index = col * rows + row
+            one_col = t in {"single", "likert", "text"} or (t not in TIDY_MULTI_COLUMN_TYPES and len(q["cols"]) == 1)
+            f = f.assign(_q=k, _col=0 if one_col else np.asarray(f.index, dtype=np.int64) // max(len(df_q), 1))
+        frames.append(f)
 
     if not frames:
         return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
 
     df_tidy = pd.concat(frames, ignore_index=True)
     df_tidy["question_text"] = df_tidy["question_text"].astype(str).str.strip()
-    df_tidy["answer"] = df_tidy["answer"].apply(normalize_str)
+    df_tidy["answer"] = map_unique(df_tidy["answer"], normalize_str)
 
     #Handling Sonstiges answer, make a new column to keep the sonstiges information
 
@@ -458,46 +574,134 @@ def compute_base_map(df_q: pd.DataFrame, catalog: list[dict]) -> dict[str, int]:
 
 
 
-def prepare_data(
+#---------------------
+#EXCEL INGESTION
+#---------------------
+
+# pandas' default na_values (read_csv / read_excel docs)
+EXCEL_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+def _excel_cell_to_str(v: Any) -> Any:
+    """Same result as pd.read_excel(..., dtype=str) for one openpyxl value."""
+    if v is None:
+        return np.nan
+    if isinstance(v, float) and not isinstance(v, bool):
+        v = int(v) if v == int(v) else v
+    s = str(v)
+    return np.nan if s in EXCEL_NA_VALUES else s
+
+
+def _excel_header(row: Sequence[Any]) -> List[str]:
+    """Header names like pd.read_excel: empty -> 'Unnamed: i', duplicates -> 'name.1', 'name.2', ..."""
+    names = []
+    for i, v in enumerate(row):
+        s = "" if v is None else str(v)
+        names.append(s if s else f"Unnamed: {i}")
+
+    # trailing empty header cells are dropped by pandas as well
+    while names and names[-1].startswith("Unnamed: ") and row[len(names) - 1] is None:
+        names.pop()
+
+    counts: Dict[str, int] = {}
+    for i, col in enumerate(names):
+        cur = counts.get(col, 0)
+        while cur > 0:
+            counts[col] = cur + 1
+            col = f"{col}.{cur}"
+            cur = counts.get(col, 0)
+        names[i] = col
+        counts[col] = cur + 1
+    return names
+
+
+def iter_excel_chunks(
     excel_path: str | Path,
-    first_question_text: str,
     sheet_name: int | str = 0,
-    spec_path: Optional[str | Path] = "question_spec.json",
-) -> Tuple[pd.DataFrame, pd.DataFrame, List[Dict[str, Any]], pd.DataFrame, Dict[str, int]]:
-
+    chunksize: int = 5000,
+):
     """
-    Spec-driven preprocessing:
-    - Loads question_spec.json (if exists)
-    - Applies Sonstiges merge when configured
+    Streams a sheet in row chunks (openpyxl read-only mode, values only).
+
+    Yields DataFrames with the header as columns and all values as str/NaN,
+    i.e. the same cells pd.read_excel(..., dtype=str) would produce,
+    but only `chunksize` rows are held in memory at a time.
     """
+    import openpyxl
 
-    excel_path = Path(excel_path)
-    df_raw = pd.read_excel(excel_path, sheet_name=sheet_name,dtype=str)
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _excel_header(header)
+        width = len(columns)
+
+        buf: List[List[Any]] = []
+        n_blank = 0  # blank rows are kept by pandas, except at the end of the sheet
+
+        for row in rows:
+            values = [_excel_cell_to_str(v) for v in row[:width]]
+            values += [np.nan] * (width - len(values))
+
+            if all(isinstance(v, float) for v in values):
+                n_blank += 1
+                continue
+
+            buf.extend([[np.nan] * width for _ in range(n_blank)])
+            n_blank = 0
+            buf.append(values)
+
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=columns, dtype=object)
+                buf = []
+
+        if buf:
+            yield pd.DataFrame(buf, columns=columns, dtype=object)
+    finally:
+        wb.close()
+
+
+def _clean_columns(df_raw: pd.DataFrame) -> pd.DataFrame:
     df_raw.columns = df_raw.columns.astype(str).str.strip().str.replace("\n", " ", regex=False)
+    return df_raw
+
 
+def _question_start(df_raw: pd.DataFrame, first_question_text: str) -> int:
     if first_question_text not in df_raw.columns:
         raise ValueError(
             f"first_question_text not found.\nExpected: {first_question_text}\n"
             f"First 20 columns: {list(df_raw.columns[:20])}"
         )
+    return df_raw.columns.get_loc(first_question_text)
 
-    start_idx = df_raw.columns.get_loc(first_question_text)
-    df_q = df_raw.iloc[:, start_idx:].copy()
+
+def _prepare_df_q(df_q: pd.DataFrame, spec: Dict[str, Any], id_offset: int = 0) -> pd.DataFrame:
+    """
+    Question-only slice of df_raw -> normalized df_q with respondent_id
+    and Sonstiges texts merged into their main column.
+    id_offset: number of respondents in earlier chunks (streaming mode)
+    """
 
     # normalize values
-    df_q = df_q.map(normalize_str)
-    df_q = df_q.map(normalize_yes_no)
+    df_q = normalize_frame(df_q)
 
     # respondent id
-    df_q["respondent_id"] = np.arange(1, len(df_q) + 1)
-
-    # load spec
-    spec = load_spec(spec_path)
+    df_q["respondent_id"] = np.arange(id_offset + 1, id_offset + len(df_q) + 1)
 
     # Apply Sonstiges merge according to spec (if provided)
     # and drop the other text columns afterwards
     drop_cols = []
     for qtext, sp in spec.items():
+        if qtext.startswith("__"):
+            continue
         other_col = sp.get("other_text_col")
         main_col = sp.get("main_col") or qtext  # default: main col equals qtext
         if other_col and main_col in df_q.columns and other_col in df_q.columns:
@@ -513,35 +717,260 @@ def prepare_data(
     if drop_cols:
         df_q = df_q.drop(columns=[c for c in drop_cols if c in df_q.columns])
 
-    # build catalog using spec types/order
-    catalog = build_catalog(df_q, spec=spec, exclude_cols=["respondent_id"])
+    return df_q
 
-    # tidy
-    df_tidy = build_tidy(df_q, catalog)
 
-    #base
-    df_tidy_base = df_tidy
-
-    #normalize
-    df_tidy["question_text"] = df_tidy["question_text"].map(lambda v: normalize_by_canon_map(v, CANON_MAP))
-    df_tidy["answer"] = df_tidy["answer"].map(lambda v: normalize_by_canon_map(v, CANON_MAP))
+def _normalize_tidy(df_tidy: pd.DataFrame) -> pd.DataFrame:
+    """canonicalize question_text / answer / item (in place)"""
+    df_tidy["question_text"] = normalize_series_by_canon_map(df_tidy["question_text"], CANON_MAP)
+    df_tidy["answer"] = normalize_series_by_canon_map(df_tidy["answer"], CANON_MAP)
     if "item" in df_tidy.columns:
-        df_tidy["item"] = df_tidy["item"].map(lambda v: normalize_by_canon_map(v, CANON_MAP))
-
-    #
-    df_tidy_virtual = build_q2_conditional_virtual_questions(
-        df_tidy=df_tidy_base,
-        q1_text=Q1_TEXT,
-        q2_text=Q2_TEXT,
-        items_order=Q1_ITEMS_ORDER,  # your 8 technologies
-        q1_high_answers=("Hoher Mehrwert", "Sehr hoher Mehrwert"),
-        q2_answer_keep=[str(i) for i in range(1, 11)] + ["Keine Antwort"],
-        q2_virtual_prefix="Q2 – Erwarteter Mehrwert nach Lebenszyklusphase (nur Hoher/Sehr hoher Mehrwert in Q1)",
-    )
+        df_tidy["item"] = normalize_series_by_canon_map(df_tidy["item"], CANON_MAP)
+    return df_tidy
+
+
+def _conditionals_from_spec(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """spec "__conditional__" entries, normalized like the df_tidy texts they are matched against"""
+    conditionals = []
+    for c in spec.get(CONDITIONAL_SPEC_KEY, []):
+        c = dict(c)  # do not mutate global dict
+        for k in ("condition_question", "target_question"):
+            c[k] = normalize_by_canon_map(c[k], CANON_MAP)
+        for k in ("condition_answers", "target_answers", "items_order"):
+            c[k] = _norm_list_values(c.get(k), CANON_MAP)
+        conditionals.append(c)
+    return conditionals
+
 
-    df_tidy = pd.concat([df_tidy_base, df_tidy_virtual], ignore_index=True)
+def _add_virtual_questions(df_tidy_base: pd.DataFrame, spec: Dict[str, Any]) -> pd.DataFrame:
+    df_tidy_virtual = build_conditional_virtual_questions(df_tidy_base, _conditionals_from_spec(spec))
+
+    return pd.concat([df_tidy_base, df_tidy_virtual], ignore_index=True)
+
+
+def _build_outputs(
+    df_q: pd.DataFrame,
+    spec: Dict[str, Any],
+    catalog: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[List[Dict[str, Any]], pd.DataFrame, Dict[str, int]]:
+    """
+    df_q (normalized, Sonstiges merged) -> catalog, df_tidy, base_map.
+    catalog can be passed in when it is already known (cache hit).
+    """
+
+    # build catalog using spec types/order
+    if catalog is None:
+        catalog = build_catalog(df_q, spec=spec, exclude_cols=["respondent_id"])
+
+    # tidy + normalize
+    with span("build_tidy"):
+        df_tidy = _normalize_tidy(build_tidy(df_q, catalog))
+        df_tidy = _add_virtual_questions(df_tidy, spec)
 
     # base map
     base_map = compute_base_map(df_q, catalog)
 
-    return df_raw, df_q, catalog, df_tidy, base_map
+    return catalog, df_tidy, base_map
+
+
+# columns of df_tidy that repeat a few distinct values over many rows
+TIDY_CATEGORICAL_COLS = ("question_text", "item", "answer")
+
+
+def encode_tidy(df_tidy: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dictionary-encoded df_tidy:
+    - question_text / item / answer -> category (int codes + one copy of each string)
+    - respondent_id -> smallest unsigned int dtype
+    pd.NA cells become the NA_CATEGORY category (NaN stays NaN), so the two
+    missing-value kinds stay apart.
+    Consumers read it through tidy_access.select_question(s), which decodes the slices.
+    """
+    df_tidy = df_tidy.copy()
+    for c in TIDY_CATEGORICAL_COLS:
+        col = df_tidy[c].astype(object)
+        null = np.flatnonzero(col.isna().to_numpy())
+        pd_na = null[[col.iat[i] is pd.NA for i in null]] if len(null) else null
+        if len(pd_na):
+            col.iloc[pd_na] = NA_CATEGORY
+        df_tidy[c] = col.astype("category")
+    df_tidy["respondent_id"] = pd.to_numeric(df_tidy["respondent_id"], downcast="unsigned")
+    return df_tidy
+
+
+def _finish_tidy(
+    df_tidy: pd.DataFrame,
+    categorical: bool,
+    tidy_store: bool,
+    catalog: Optional[List[Dict[str, Any]]] = None,
+    answer_matrix: bool = False,
+    respondent_index: bool = False,
+    likert_codes: bool = False,
+):
+    """output layout of df_tidy (applied after the cache, which stores the plain frame)"""
+    if categorical:
+        df_tidy = encode_tidy(df_tidy)
+    if tidy_store or answer_matrix or respondent_index or likert_codes:
+        store = TidyStore(df_tidy, by_item=True)
+        if answer_matrix or likert_codes:
+            store.answers = build_answer_matrix(store, catalog)
+        if likert_codes:
+            store.likert = build_likert_codes(store.answers, catalog or [])
+        if respondent_index:
+            store.respondent_index = RespondentIndex(store)
+        return store
+    return df_tidy
+
+
+def _prepare_streaming(
+    excel_path: Path,
+    first_question_text: str,
+    sheet_name: int | str,
+    spec: Dict[str, Any],
+    chunksize: int,
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[Dict[str, Any]], pd.DataFrame, Dict[str, int]]:
+    """
+    Row-chunked variant of the load -> df_q -> tidy steps.
+    Every chunk is normalized and fed straight into build_tidy, so only one chunk
+    of the wide table is in memory at a time. df_raw / df_q are returned header-only.
+    df_tidy holds the same rows in the same order as the in-memory path (the chunks
+    are stably sorted back by question, source column and respondent).
+    """
+    catalog: Optional[List[Dict[str, Any]]] = None
+    tidy_parts: List[pd.DataFrame] = []
+    base_map: Dict[str, int] = {}
+    df_raw_head = df_q_head = None
+    n_seen = 0
+
+    for chunk in iter_excel_chunks(excel_path, sheet_name=sheet_name, chunksize=chunksize):
+        chunk = _clean_columns(chunk)
+        start_idx = _question_start(chunk, first_question_text)
+
+        df_q = _prepare_df_q(chunk.iloc[:, start_idx:], spec, id_offset=n_seen)
+        n_seen += len(df_q)
+
+        if catalog is None:
+            # catalog only depends on the columns -> build once
+            catalog = build_catalog(df_q, spec=spec, exclude_cols=["respondent_id"])
+            df_raw_head, df_q_head = chunk.iloc[:0].copy(), df_q.iloc[:0].copy()
+
+        with span("build_tidy", chunk=len(tidy_parts)):
+            tidy_parts.append(_normalize_tidy(build_tidy(df_q, catalog, source_order=True)))
+
+        for qtext, n in compute_base_map(df_q, catalog).items():
+            base_map[qtext] = base_map.get(qtext, 0) + n
+
+    if catalog is None:
+        raise ValueError(f"No rows found in sheet {sheet_name!r} of {excel_path}")
+
+    # back to the in-memory row order: question, source column, respondent
+    df_tidy = (
+        pd.concat(tidy_parts, ignore_index=True)
+        .sort_values(["_q", "_col", "respondent_id"], kind="stable")
+        .drop(columns=["_q", "_col"])
+        .reset_index(drop=True)
+    )
+    if "other_text" in df_tidy.columns:
+        df_tidy["other_text"] = df_tidy["other_text"].astype("string")
+    df_tidy = _add_virtual_questions(df_tidy, spec)
+
+    return df_raw_head, df_q_head, catalog, df_tidy, base_map
+
+
+def prepare_data(
+    excel_path: str | Path,
+    first_question_text: str,
+    sheet_name: int | str = 0,
+    spec_path: Optional[str | Path] = "question_spec.json",
+    cache_dir: Optional[str | Path] = None,
+    cache_tidy: bool = True,
+    cache_format: str = "pickle",
+    cache_max_bytes: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    categorical: bool = False,
+    tidy_store: bool = False,
+    answer_matrix: bool = False,
+    respondent_index: bool = False,
+    likert_codes: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[Dict[str, Any]], TidyLike, Dict[str, int]]:
+
+    """
+    Spec-driven preprocessing:
+    - Loads question_spec.json (if exists)
+    - Applies Sonstiges merge when configured
+
+    Cache (optional, see survey_cache.py):
+    - cache_dir: folder for parsed exports; None disables the cache
+    - cache_tidy: also store df_tidy (otherwise it is rebuilt from the cached df_q)
+    - cache_format: "pickle" | "parquet" | "feather"
+    - cache_max_bytes: size limit of cache_dir (least recently used entries are evicted)
+
+    Streaming (optional):
+    - chunksize: read the sheet in row chunks of this size and tidy chunk by chunk
+      (bounded memory for very large exports). df_raw / df_q are then returned
+      with their columns only (no rows).
+
+    Encoding (optional):
+    - categorical: return df_tidy dictionary-encoded (see encode_tidy). The cache
+      always stores the plain frame, encoding is applied on the way out.
+    - tidy_store: return df_tidy as a TidyStore (question-partitioned index, see
+      tidy_access.py) instead of a DataFrame; plots and analysis jobs accept both.
+    - answer_matrix: also build the dense respondent x question answer-code matrix
+      (answer_matrix.py, codebooks in spec order) as df_tidy.answers; implies tidy_store.
+    - respondent_index: also build the bitmap index (question, item, answer) -> respondents
+      (respondent_index.py) as df_tidy.respondent_index; implies tidy_store.
+    - likert_codes: also build the ordinal int8 Likert codes of the "ordinal" spec questions
+      (likert_codes.py) as df_tidy.likert; implies answer_matrix.
+    """
+
+    excel_path = Path(excel_path)
+
+    # load spec
+    spec = load_spec(spec_path)
+
+    # --- cache lookup ---
+    cache_key = cache_source = None
+    if cache_dir is not None:
+        cache_key, cache_source = survey_cache.make_cache_key(
+            excel_path, sheet_name, spec_path,
+            first_question_text=first_question_text,
+            streaming=chunksize is not None,
+        )
+        hit = survey_cache.load_entry(cache_dir, cache_key)
+        if hit is not None:
+            frames, meta = hit["frames"], hit["meta"]
+            df_raw, df_q = frames["df_raw"], frames["df_q"]
+            if "df_tidy" in frames:
+                df_tidy = _finish_tidy(frames["df_tidy"], categorical, tidy_store, meta["catalog"], answer_matrix, respondent_index, likert_codes)
+                return df_raw, df_q, meta["catalog"], df_tidy, meta["base_map"]
+            if chunksize is None:
+                catalog, df_tidy, base_map = _build_outputs(df_q, spec, catalog=meta["catalog"])
+                return df_raw, df_q, catalog, _finish_tidy(df_tidy, categorical, tidy_store, catalog, answer_matrix, respondent_index, likert_codes), base_map
+
+    if chunksize is not None:
+        with span("read_excel", streaming=True):  # incl. build_tidy per chunk
+            df_raw, df_q, catalog, df_tidy, base_map = _prepare_streaming(
+                excel_path, first_question_text, sheet_name, spec, chunksize
+            )
+    else:
+        with span("read_excel"):
+            df_raw = _clean_columns(pd.read_excel(excel_path, sheet_name=sheet_name, dtype=str))
+        start_idx = _question_start(df_raw, first_question_text)
+        df_q = _prepare_df_q(df_raw.iloc[:, start_idx:].copy(), spec)
+
+        catalog, df_tidy, base_map = _build_outputs(df_q, spec)
+
+    # --- cache store ---
+    if cache_key is not None:
+        frames = {"df_raw": df_raw, "df_q": df_q}
+        if cache_tidy or chunksize is not None:
+            frames["df_tidy"] = df_tidy
+        survey_cache.store_entry(
+            cache_dir, cache_key,
+            frames=frames,
+            meta={"source": cache_source, "catalog": catalog, "base_map": base_map},
+            fmt=cache_format,
+            max_bytes=cache_max_bytes,
+        )
+
+    return df_raw, df_q, catalog, _finish_tidy(df_tidy, categorical, tidy_store, catalog, answer_matrix, respondent_index, likert_codes), base_map
@@ -0,0 +1,162 @@
+# render_cache.py
+"""
+Incremental rendering: skip figures whose inputs did not change.
+
+For every output figure a manifest entry records one hash over
+  - the input aggregate (PlotData of a question, hypothesis / JG result frame)
+  - the catalog entry / caption / file name
+  - the plotting_config constants (sizes, colors, style, DPI, ...)
+  - the source of the plotting modules that draw it
+If the hash is unchanged and every output file still exists, the figure is not
+drawn again. Changing one caption in question_spec.json therefore re-renders one
+figure, not all of them.
+
+Layout (one small JSON per figure, so parallel workers never write the same file):
+  <out_dir>/.render_manifest/<sha1(key)>.json    {"key": ..., "hash": ..., "files": [...]}
+
+Switch off with plotting_config.RENDER_CACHE = False.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import src.plotting.plotting_config as cfg
+import src.plotting.plotting_helper as helper
+
+MANIFEST_DIR = ".render_manifest"
+
+# plotting_config constants that do not change how a figure looks
+CONFIG_IGNORE_PREFIXES = ("RENDER_", "CACHE_", "STREAM_", "TIDY_", "JOB_", "BOOTSTRAP_", "SIGNIFICANCE_", "WEIGHTING",
+                          "ASSOCIATION_SCAN", "ASSOCIATION_MAX_", "ASSOCIATION_MIN_", "ASSOCIATION_WORKERS", "SPAN_")
+
+
+#---------------------
+#HASHING
+#---------------------
+
+def _is_binary(obj: Any) -> bool:
+    """values that must not go through json / repr (arrays, dataclasses, nested lists of them)"""
+    if isinstance(obj, np.ndarray) or (dataclasses.is_dataclass(obj) and not isinstance(obj, type)):
+        return True
+    return isinstance(obj, (list, tuple)) and any(_is_binary(x) for x in obj)
+
+
+def _update(h: "hashlib._Hash", obj: Any) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(repr(list(obj.dtypes.astype(str)) if isinstance(obj, pd.DataFrame) else str(obj.dtype)).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:
+            # unhashable cells (lists, dicts, ...)
+            h.update(pickle.dumps(obj))
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray{obj.dtype.str}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else pickle.dumps(obj))
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # e.g. plot_data.PlotData: field by field (arrays hashed in full, not via repr)
+        h.update(type(obj).__name__.encode())
+        for f in dataclasses.fields(obj):
+            h.update(f.name.encode())
+            _update(h, getattr(obj, f.name))
+    elif isinstance(obj, (list, tuple)) and any(_is_binary(x) for x in obj):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for x in obj:
+            _update(h, x)
+    elif isinstance(obj, (dict, list, tuple)):
+        h.update(json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode())
+    elif isinstance(obj, bytes):
+        h.update(obj)
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*parts: Any) -> str:
+    """sha256 over any mix of frames / series / json-like values / strings"""
+    h = hashlib.sha256()
+    for p in parts:
+        _update(h, p)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _module_source_hash(module: ModuleType) -> str:
+    try:
+        src = inspect.getsource(module)
+    except (OSError, TypeError):
+        src = module.__name__
+    return hashlib.sha256(src.encode("utf-8")).hexdigest()
+
+
+def source_fingerprint(*objs: Any) -> str:
+    """hash of the source of the modules defining objs (functions or modules) + plotting_helper"""
+    modules = {helper.__name__: helper}
+    for o in objs:
+        m = o if isinstance(o, ModuleType) else inspect.getmodule(o)
+        if m is not None:
+            modules[m.__name__] = m
+    return fingerprint(*[_module_source_hash(modules[k]) for k in sorted(modules)])
+
+
+def config_fingerprint() -> str:
+    """hash of the plotting_config constants (UPPER_CASE; paths and run options excluded)"""
+    consts = {
+        k: v for k, v in vars(cfg).items()
+        if k.isupper() and not isinstance(v, Path) and not k.startswith(CONFIG_IGNORE_PREFIXES)
+    }
+    return fingerprint(consts)
+
+
+#---------------------
+#MANIFEST
+#---------------------
+
+class RenderManifest:
+    """Per output folder: key -> (hash, files) of the last render."""
+
+    def __init__(self, out_dir: Path):
+        self.dir = Path(out_dir) / MANIFEST_DIR
+
+    def _path(self, key: str) -> Path:
+        # keys are output file names (can be long) -> fixed-length entry file names
+        return self.dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def lookup(self, key: str, digest: str) -> Optional[List[Path]]:
+        """recorded output files if the hash matches and all files exist, else None"""
+        if not cfg.RENDER_CACHE:
+            return None
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("hash") != digest:
+            return None
+        files = [Path(f) for f in entry.get("files", [])]
+        if not files or not all(f.exists() for f in files):
+            return None
+        return files
+
+    def record(self, key: str, digest: str, files: Sequence[Path]) -> None:
+        if not cfg.RENDER_CACHE or not files:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp")
+        entry = {"key": key, "hash": digest, "files": [str(f) for f in files]}
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
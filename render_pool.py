@@ -0,0 +1,93 @@
+# render_pool.py
+"""
+Rendering of the per-question figures (main.py step 3), serial or in a process pool.
+
+Every job carries what a worker needs and nothing more:
+  - q             catalog entry
+  - plot_data     precomputed aggregate of that question (plot_data.aggregate_question)
+  - prefix_index  Abbildung number, assigned by main BEFORE rendering
+
+Results come back in job order (not in completion order), so Abbildung numbering,
+list_of_figures.txt and run_log.txt are identical to a serial run.
+A failing figure (exception or crashed worker) becomes a "fail" result for that job only.
+Every result carries the wall / CPU time of its rendering ("timing"), measured where it
+ran (worker process or not), for the figure spans of run_log_spans.jsonl (logger.py).
+"""
+
+from __future__ import annotations
+
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import matplotlib
+
+import src.plotting.plotting_config as cfg
+from plot_data import QuestionPlotData
+from plotting_function import plot_question_and_save
+
+
+def make_job(
+    q: Dict[str, Any],
+    plot_data: QuestionPlotData,
+    prefix_index: Optional[int],
+) -> Dict[str, Any]:
+    return {
+        "q": q,
+        "plot_data": plot_data,
+        "prefix_index": prefix_index,
+    }
+
+
+def init_worker() -> None:
+    """process pool initializer: headless backend + plot style, once per worker"""
+    matplotlib.use("Agg")
+    cfg.apply_style()
+
+
+def render_question(job: Dict[str, Any], out_dir: Path) -> Dict[str, Any]:
+    """
+    Renders + saves one question. Never raises.
+    status: "ok" (figures saved) | "none" (nothing to plot) | "fail"
+    """
+    t0, c0 = time.perf_counter(), time.process_time()
+    timing = lambda: {"wall_s": time.perf_counter() - t0, "cpu_s": time.process_time() - c0}
+    try:
+        out_paths = plot_question_and_save(
+            q=job["q"],
+            df_tidy=None,
+            base_map={},
+            out_dir=out_dir,
+            prefix_index=job["prefix_index"],
+            plot_data=job["plot_data"],
+        )
+    except Exception as e:
+        return {"status": "fail", "out_paths": [], "error": repr(e), "traceback": traceback.format_exc(), "timing": timing()}
+
+    return {"status": "ok" if out_paths else "none", "out_paths": out_paths, "timing": timing()}
+
+
+def render_questions(
+    jobs: List[Dict[str, Any]],
+    out_dir: Path,
+    workers: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields one result per job, in job order.
+    workers <= 1: serial in this process; otherwise a process pool with `workers` processes.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield render_question(job, out_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = [pool.submit(render_question, job, out_dir) for job in jobs]
+        for fut in futures:
+            try:
+                yield fut.result()
+            except Exception as e:
+                # worker died (BrokenProcessPool, unpicklable result, ...)
+                yield {"status": "fail", "out_paths": [], "error": repr(e), "traceback": traceback.format_exc()}
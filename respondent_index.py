@@ -0,0 +1,163 @@
+# respondent_index.py
+"""
+Bitmap respondent index: (question, item, answer) -> set of respondents.
+
+Every indexed key holds a packed bitset over all respondents (one bit per
+respondent, np.packbits layout), so sub-populations are bitwise operations
+instead of scans over df_tidy:
+
+    idx = respondent_index_of(df_tidy)
+    producing = idx.bits(Q1, answers=["Produzierendes Unternehmen"])
+    large = idx.bits(Q2, answers=["> 250"])
+    ids = idx.ids(producing & large)           # AND
+    either = producing | idx.bits(Q3, answers=["> 250 Mio. EUR"])   # OR
+    rest = idx.all() & ~producing              # NOT (within all respondents)
+
+Lookups:
+  - bits(question, item=None, answers=None)
+      item None     -> any item of the question (single questions have no item)
+      answers None  -> any (non-empty) answer
+  - other_bits(question, texts)   free-text "Sonstiges: ..." values (other_text column)
+Rows without an answer (NaN) are not indexed.
+
+Built once per df_tidy: prepare_data(respondent_index=True) attaches it to the
+TidyStore (df_tidy.respondent_index); respondent_index_of() returns it or builds one.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tidy_access import TidyLike, TidyStore, as_frame, decode_column
+
+COL_ID = "respondent_id"
+
+Key = Tuple[str, Optional[str], str]
+
+
+def _pack(rows: np.ndarray, resp: np.ndarray, n_rows: int, n_resp: int) -> np.ndarray:
+    """packed bitsets (n_rows x ceil(n_resp / 8)) with bit (row, resp) set"""
+    bits = np.zeros((n_rows, (n_resp + 7) // 8), dtype=np.uint8)
+    np.bitwise_or.at(bits, (rows, resp >> 3), (128 >> (resp & 7)).astype(np.uint8))
+    return bits
+
+
+class RespondentIndex:
+    def __init__(self, df_tidy: TidyLike):
+        df = as_frame(df_tidy)
+        resp, self.respondents = pd.factorize(df[COL_ID], sort=False)
+        self.respondents = np.asarray(self.respondents)
+        self.n = len(self.respondents)
+        self._row_of = pd.Index(self.respondents)
+
+        qtext = decode_column(df["question_text"]).to_numpy()
+        item = decode_column(df["item"]).to_numpy()
+        answer = decode_column(df["answer"]).to_numpy()
+
+        # (question, item, answer) keys
+        ok = pd.notna(answer)
+        keys = pd.DataFrame({"q": qtext[ok], "i": item[ok], "a": answer[ok]})
+        key_codes = keys.groupby(["q", "i", "a"], sort=False, dropna=False).ngroup().to_numpy()
+        first = keys.assign(c=key_codes).drop_duplicates("c").sort_values("c")
+        self._keys: Dict[Key, int] = {
+            (q, None if pd.isna(i) else i, a): int(c) for q, i, a, c in zip(first["q"], first["i"], first["a"], first["c"])
+        }
+        self._bits = _pack(key_codes, resp[ok], len(self._keys), self.n)
+        self._answer_of = [a for (_, _, a) in self._keys]  # keys are in code order
+
+        self._by_question: Dict[str, List[int]] = {}
+        self._by_item: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        for (q, i, _), c in self._keys.items():
+            self._by_question.setdefault(q, []).append(c)
+            self._by_item.setdefault((q, i), []).append(c)
+
+        # free-text other_text per question
+        self._other: Dict[Tuple[str, str], int] = {}
+        self._other_bits = np.zeros((0, (self.n + 7) // 8), dtype=np.uint8)
+        if "other_text" in df.columns:
+            other = decode_column(df["other_text"]).to_numpy()
+            ok = pd.notna(other)
+            if ok.any():
+                pairs = pd.DataFrame({"q": qtext[ok], "t": other[ok]})
+                codes = pairs.groupby(["q", "t"], sort=False).ngroup().to_numpy()
+                first = pairs.assign(c=codes).drop_duplicates("c").sort_values("c")
+                self._other = {(q, t): int(c) for q, t, c in zip(first["q"], first["t"], first["c"])}
+                self._other_bits = _pack(codes, resp[ok], len(self._other), self.n)
+
+    # --- bitsets
+
+    def empty(self) -> np.ndarray:
+        return np.zeros((self.n + 7) // 8, dtype=np.uint8)
+
+    def all(self) -> np.ndarray:
+        """every respondent in df_tidy (use `idx.all() & ~bits` for NOT)"""
+        return np.packbits(np.ones(self.n, dtype=bool))
+
+    def _union(self, matrix: np.ndarray, rows: Sequence[int]) -> np.ndarray:
+        if not len(rows):
+            return self.empty()
+        return np.bitwise_or.reduce(matrix[list(rows)], axis=0)
+
+    def bits(
+        self,
+        question: str,
+        item: Optional[str] = None,
+        answers: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """respondents with (one of) the answers to question [/ item]"""
+        if answers is None:
+            rows = self._by_question.get(question, []) if item is None else self._by_item.get((question, item), [])
+        elif item is None:
+            wanted = set(answers)
+            rows = [c for c in self._by_question.get(question, []) if self._answer_of[c] in wanted]
+        else:
+            rows = [self._keys[(question, item, a)] for a in answers if (question, item, a) in self._keys]
+        return self._union(self._bits, rows)
+
+    def other_bits(self, question: str, texts: Sequence[str]) -> np.ndarray:
+        """respondents whose free text (other_text) to question is one of texts"""
+        rows = [self._other[(question, t)] for t in texts if (question, t) in self._other]
+        return self._union(self._other_bits, rows)
+
+    # --- bitsets -> respondents
+
+    def mask(self, bits: np.ndarray) -> np.ndarray:
+        """bool per respondent (order of .respondents)"""
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+    def ids(self, bits: np.ndarray) -> np.ndarray:
+        """respondent ids in the bitset (order of .respondents)"""
+        return self.respondents[self.mask(bits)]
+
+    def count(self, bits: np.ndarray) -> int:
+        return int(np.unpackbits(bits, count=self.n).sum())
+
+    def member(self, respondent_ids, bits: np.ndarray) -> np.ndarray:
+        """bool per given respondent id: in the bitset (unknown ids -> False)"""
+        rows = self._row_of.get_indexer(pd.Index(respondent_ids))
+        return (rows >= 0) & self.mask(bits)[np.maximum(rows, 0)]
+
+    def member_of(self, respondent_ids, which: np.ndarray, bits: np.ndarray) -> np.ndarray:
+        """
+        bool per given respondent id: in its own bitset bits[which[k]]
+        (bits: stacked bitsets, one lookup for all ids; unknown ids -> False)
+        """
+        rows = self._row_of.get_indexer(pd.Index(respondent_ids))
+        r = np.maximum(rows, 0)
+        byte = bits[np.asarray(which, dtype=np.intp), r >> 3]
+        return (rows >= 0) & ((byte & (128 >> (r & 7)).astype(np.uint8)) != 0)
+
+
+def respondent_index_of(df_tidy: TidyLike) -> RespondentIndex:
+    """
+    The respondent index of df_tidy: the one attached by prepare_data(respondent_index=True),
+    else built here (cached on a TidyStore).
+    """
+    if isinstance(df_tidy, TidyStore):
+        if df_tidy.respondent_index is None:
+            df_tidy.respondent_index = RespondentIndex(df_tidy)
+        return df_tidy.respondent_index
+    return RespondentIndex(df_tidy)
@@ -0,0 +1,399 @@
+# significance.py
+"""
+Batch significance tests for the analysis results (NumPy only).
+
+One batch covers every contingency table the analyses produce and every
+GU/KMU Likert comparison:
+  - hypotheses H1-H3          group x (yes_n, no_n); overlapping groups (checkbox
+                              grouping question, rest_yes_n / rest_no_n present):
+                              one 2x2 per group, (group, rest) x (yes, no)
+  - crosstab frames           segment x answer per target_item   (finalize_crosstab_output)
+  - matrix frames             class x (answers, rest) per item    (finalize_matrix_output;
+                              rest = respondents of the class with none of the answers)
+  - Likert means              rank test of the ordinal codes (likert_codes.py)
+                              between the two classes, per item (counts from the cube)
+
+Test choice per contingency table (empty rows / columns dropped):
+  - 2x2 with an expected count < FISHER_MIN_EXPECTED    Fisher exact (two-sided)
+  - otherwise                                            Pearson chi-square
+                                                         (Yates correction for 2x2)
+  - Likert                                               Mann-Whitney U (normal approximation,
+                                                         tie + continuity correction)
+Tables of one kind are padded into one array and tested together.
+
+Weighted results (weighting.py): the counts are sums of mean-1 weights, so the
+nominal n overstates the information. With the weights passed, every table and
+Likert count is rescaled to the Kish effective sample size (n_eff / sum of weights)
+before testing; Fisher rounds the counts to integers.
+
+All p-values of the batch form one family for the multiple-testing correction
+("fdr_bh", "holm", "bonferroni" or None). Every row of a tested table gets
+  test | statistic | p_value | p_adj
+(tables that cannot be tested: test None, p NaN).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from weighting import describe_weights
+
+FISHER_MIN_EXPECTED = 5.0
+
+TEST_COLS = ["test", "statistic", "p_value", "p_adj"]
+
+_lgamma = np.vectorize(math.lgamma, otypes=[float])
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+#---------------------
+#DISTRIBUTIONS
+#---------------------
+
+def _gammaincc(a: np.ndarray, x: np.ndarray, iterations: int = 300) -> np.ndarray:
+    """regularized upper incomplete gamma Q(a, x) (series for x < a + 1, continued fraction else)"""
+    a = np.asarray(a, dtype=float)
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore", under="ignore"):
+        log_pref = -x + a * np.log(np.where(x > 0, x, 1.0)) - _lgamma(a)
+
+        # series: P(a, x)
+        term = 1.0 / a
+        total = term.copy()
+        for n in range(1, iterations):
+            term = term * x / (a + n)
+            total = total + term
+        q_series = 1.0 - total * np.exp(log_pref)
+
+        # continued fraction (modified Lentz): Q(a, x)
+        tiny = 1e-300
+        b = x + 1.0 - a
+        c = np.full_like(x, 1.0 / tiny)
+        d = 1.0 / np.where(b == 0, tiny, b)
+        h = d.copy()
+        for i in range(1, iterations):
+            an = -i * (i - a)
+            b = b + 2.0
+            d = an * d + b
+            d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+            c = b + an / np.where(np.abs(c) < tiny, tiny, c)
+            h = h * d * c
+        q_cf = np.exp(log_pref) * h
+
+    q = np.where(x < a + 1.0, q_series, q_cf)
+    q = np.where(x <= 0, 1.0, q)
+    return np.clip(q, 0.0, 1.0)
+
+
+def chi2_sf(stat: np.ndarray, dof: np.ndarray) -> np.ndarray:
+    """P(X >= stat) for X ~ chi2(dof)"""
+    dof = np.asarray(dof, dtype=float)
+    p = _gammaincc(np.where(dof > 0, dof, 1.0) / 2.0, np.asarray(stat, dtype=float) / 2.0)
+    return np.where(dof > 0, p, np.nan)
+
+
+def _log_comb(n: np.ndarray, k: np.ndarray) -> np.ndarray:
+    return _lgamma(n + 1) - _lgamma(k + 1) - _lgamma(n - k + 1)
+
+
+#---------------------
+#TESTS (vectorized over tables)
+#---------------------
+
+def chi2_contingency(tables: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pearson chi-square for K zero-padded tables (K x R x C); rows / columns with
+    sum 0 do not count. Returns (statistic, dof, p) per table.
+    """
+    t = np.asarray(tables, dtype=float)
+    rows = t.sum(axis=2)
+    cols = t.sum(axis=1)
+    n = rows.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = rows[:, :, None] * cols[:, None, :] / n[:, None, None]
+        dof = ((rows > 0).sum(axis=1) - 1) * ((cols > 0).sum(axis=1) - 1)
+        diff = np.abs(t - expected)
+        # Yates continuity correction for 1 degree of freedom
+        diff = np.where((dof == 1)[:, None, None], diff - np.minimum(0.5, diff), diff)
+        stat = np.where(expected > 0, diff ** 2 / expected, 0.0).sum(axis=(1, 2))
+    return stat, dof, chi2_sf(stat, dof)
+
+
+def fisher_exact_2x2(tables: np.ndarray) -> np.ndarray:
+    """two-sided Fisher exact p for K 2x2 tables (K x 2 x 2)"""
+    t = np.rint(np.asarray(tables, dtype=float)).astype(np.int64)
+    if len(t) == 0:
+        return np.zeros(0)
+    a = t[:, 0, 0]
+    r1 = t[:, 0].sum(axis=1)
+    c1 = t[:, :, 0].sum(axis=1)
+    n = t.sum(axis=(1, 2))
+
+    # hypergeometric probabilities of every possible top-left cell, per table
+    x = np.arange(int(n.max()) + 1)[None, :]
+    lo = np.maximum(0, c1 + r1 - n)[:, None]
+    hi = np.minimum(r1, c1)[:, None]
+    valid = (x >= lo) & (x <= hi)
+    xs = np.where(valid, x, lo)
+    log_p = (_log_comb(r1[:, None], xs) + _log_comb((n - r1)[:, None], c1[:, None] - xs)
+             - _log_comb(n, c1)[:, None])
+    p = np.where(valid, np.exp(log_p), 0.0)
+    p_obs = p[np.arange(len(t)), a]
+    return np.clip((p * (p <= p_obs[:, None] * (1 + 1e-7))).sum(axis=1), 0.0, 1.0)
+
+
+def mann_whitney_from_counts(c1: np.ndarray, c2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mann-Whitney U from category counts of two groups (K x L, categories in ordinal
+    order; ties = same category). Returns (U of group 1, two-sided p) per row.
+    """
+    c1 = np.asarray(c1, dtype=float)
+    c2 = np.asarray(c2, dtype=float)
+    t = c1 + c2
+    n1 = c1.sum(axis=1)
+    n2 = c2.sum(axis=1)
+    N = n1 + n2
+    midrank = np.cumsum(t, axis=1) - (t - 1.0) / 2.0
+    u1 = (c1 * midrank).sum(axis=1) - n1 * (n1 + 1.0) / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ties = (t ** 3 - t).sum(axis=1) / (N * (N - 1.0))
+        sigma = np.sqrt(n1 * n2 / 12.0 * ((N + 1.0) - ties))
+        z = np.maximum(np.abs(u1 - n1 * n2 / 2.0) - 0.5, 0.0) / sigma
+    p = np.where((n1 > 0) & (n2 > 0) & (sigma > 0), _erfc(np.nan_to_num(z) / math.sqrt(2.0)), np.nan)
+    return u1, np.clip(p, 0.0, 1.0)
+
+
+def p_adjust(p: np.ndarray, method: Optional[str] = "fdr_bh") -> np.ndarray:
+    """multiple-testing correction over all finite p-values (NaN stays NaN)"""
+    p = np.asarray(p, dtype=float)
+    out = np.full_like(p, np.nan)
+    ok = np.isfinite(p)
+    m = int(ok.sum())
+    if m == 0:
+        return out
+    pv = p[ok]
+    if method is None:
+        adj = pv
+    elif method == "bonferroni":
+        adj = pv * m
+    elif method == "holm":
+        order = np.argsort(pv, kind="stable")
+        adj_sorted = np.maximum.accumulate(pv[order] * (m - np.arange(m)))
+        adj = np.empty(m)
+        adj[order] = adj_sorted
+    elif method == "fdr_bh":
+        order = np.argsort(pv, kind="stable")
+        ranked = pv[order] * m / np.arange(1, m + 1)
+        adj_sorted = np.minimum.accumulate(ranked[::-1])[::-1]
+        adj = np.empty(m)
+        adj[order] = adj_sorted
+    else:
+        raise ValueError(f"Unknown correction: {method}")
+    out[ok] = np.minimum(adj, 1.0)
+    return out
+
+
+def test_tables(tables: Sequence[np.ndarray]) -> Tuple[List[Optional[str]], np.ndarray, np.ndarray]:
+    """
+    Right test per contingency table (see module doc), all tables of one kind at once.
+    Returns (test names, statistics, p-values).
+    """
+    k = len(tables)
+    tests: List[Optional[str]] = [None] * k
+    stat = np.full(k, np.nan)
+    p = np.full(k, np.nan)
+
+    # drop empty rows / columns, pad to one array
+    clean = []
+    for t in tables:
+        t = np.asarray(t, dtype=float)
+        t = t[t.sum(axis=1) > 0][:, t.sum(axis=0) > 0] if t.size else t.reshape(0, 0)
+        clean.append(t)
+    testable = [i for i, t in enumerate(clean) if t.ndim == 2 and t.shape[0] >= 2 and t.shape[1] >= 2]
+    if not testable:
+        return tests, stat, p
+
+    r = max(clean[i].shape[0] for i in testable)
+    c = max(clean[i].shape[1] for i in testable)
+    padded = np.zeros((len(testable), r, c))
+    for j, i in enumerate(testable):
+        padded[j, :clean[i].shape[0], :clean[i].shape[1]] = clean[i]
+
+    chi_stat, dof, chi_p = chi2_contingency(padded)
+    rows = padded.sum(axis=2)
+    cols = padded.sum(axis=1)
+    n = rows.sum(axis=1)
+    is_2x2 = np.array([clean[i].shape == (2, 2) for i in testable])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        min_expected = (rows[:, :2, None] * cols[:, None, :2] / n[:, None, None]).reshape(len(testable), -1).min(axis=1)
+    use_fisher = is_2x2 & (min_expected < FISHER_MIN_EXPECTED)
+
+    fisher_p = fisher_exact_2x2(padded[use_fisher][:, :2, :2])
+    idx = np.array(testable)
+    stat[idx] = chi_stat
+    p[idx] = chi_p
+    stat[idx[use_fisher]] = np.nan
+    p[idx[use_fisher]] = fisher_p
+    for j, i in enumerate(testable):
+        tests[i] = "fisher_exact" if use_fisher[j] else "chi2"
+    return tests, stat, p
+
+
+#---------------------
+#TABLES OF THE RESULT FRAMES
+#---------------------
+
+def _frame_kind(obj: Any) -> Optional[str]:
+    if not isinstance(obj, pd.DataFrame):
+        return None
+    cols = set(obj.columns)
+    if {"initial_question_label", "yes_n", "no_n"} <= cols:
+        return "hypothesis"
+    if {"segment_question", "segment", "target_item", "answer", "n"} <= cols:
+        return "crosstab"
+    if {"item", "company_size_class", "answer", "n", "total"} <= cols:
+        return "matrix"
+    if {"question_text", "item", "company_size_class", "value"} <= cols:
+        return "likert"
+    return None
+
+
+def _group_rows(df: pd.DataFrame, keys: List[str]) -> List[np.ndarray]:
+    """row positions per table (keys in order of appearance)"""
+    if not keys:
+        return [np.arange(len(df))]
+    codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    return [np.flatnonzero(codes == g) for g in range(codes.max() + 1)] if len(codes) else []
+
+
+def _tables_of(df: pd.DataFrame, kind: str) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """(row positions, contingency table) per table of a frame"""
+    out = []
+    if kind == "hypothesis":
+        if {"rest_yes_n", "rest_no_n"} <= set(df.columns):
+            # overlapping groups: each group against the respondents outside it
+            inside = df[["yes_n", "no_n"]].to_numpy(float)
+            rest = df[["rest_yes_n", "rest_no_n"]].to_numpy(float)
+            out += [(np.array([r]), np.vstack([inside[r], rest[r]])) for r in range(len(df))]
+        else:
+            out.append((np.arange(len(df)), df[["yes_n", "no_n"]].to_numpy(float)))
+    elif kind == "crosstab":
+        for rows in _group_rows(df, ["target_item"]):
+            d = df.iloc[rows]
+            tab = d.pivot_table(index="segment", columns="answer", values="n", aggfunc="sum", fill_value=0)
+            out.append((rows, tab.to_numpy(float)))
+    elif kind == "matrix":
+        for rows in _group_rows(df, ["item"]):
+            d = df.iloc[rows]
+            tab = d.pivot_table(index="company_size_class", columns="answer", values="n", aggfunc="sum", fill_value=0)
+            total = d.groupby("company_size_class")["total"].max().reindex(tab.index).fillna(0).to_numpy(float)
+            rest = np.maximum(total - tab.to_numpy(float).sum(axis=1), 0.0)
+            out.append((rows, np.column_stack([tab.to_numpy(float), rest])))
+    return out
+
+
+def _likert_tests(
+    df: pd.DataFrame, cube, segmentation: str, scale: float = 1.0,
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """Mann-Whitney per (question, item) between the two classes of the frame (counts * scale)"""
+    groups = _group_rows(df, ["question_text", "item"])
+    c1, c2, keep = [], [], []
+    ordinal = {}  # question -> (items, segment labels, ordinal counts) of the cube
+    for g, rows in enumerate(groups):
+        d = df.iloc[rows]
+        q = d["question_text"].iloc[0]
+        classes = d["company_size_class"].dropna().unique()
+        if cube is None or len(classes) != 2:
+            continue
+        if q not in ordinal:
+            ordinal[q] = cube.likert_counts(segmentation, q)
+        items, labels, counts = ordinal[q]
+        item = str(d["item"].iloc[0])
+        pos = [str(i) for i in items]
+        if item not in pos or any(c not in labels for c in classes):
+            continue
+        # value counts 1..k ("Keine Antwort" slot 0 dropped)
+        cell = counts[:, pos.index(item), 1:]
+        c1.append(cell[labels.index(classes[0])].astype(float) * scale)
+        c2.append(cell[labels.index(classes[1])].astype(float) * scale)
+        keep.append(g)
+
+    stat = np.full(len(groups), np.nan)
+    p = np.full(len(groups), np.nan)
+    if keep:
+        width = max(len(x) for x in c1)
+        pad = lambda xs: np.array([np.pad(x, (0, width - len(x))) for x in xs])
+        u, pv = mann_whitney_from_counts(pad(c1), pad(c2))
+        stat[keep] = u
+        p[keep] = pv
+    return groups, stat, p
+
+
+#---------------------
+#BATCH
+#---------------------
+
+def attach_significance(
+    result_dicts: Sequence[Dict[str, Any]],
+    cube=None,
+    correction: Optional[str] = "fdr_bh",
+    segmentation: str = "company_size",
+    weights: Optional[pd.Series] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Tests every table of every result frame (get_df_hypotheses / get_df_jg dicts) in
+    one batch, corrects all p-values together and returns copies of the dicts with
+    test | statistic | p_value | p_adj on the tested frames (other values unchanged).
+    cube: segmentation cube (Likert rank tests need the answer counts per class).
+    weights: respondent weights the results were computed with -> counts rescaled
+    to the Kish effective sample size
+    """
+    scale = 1.0
+    if weights is not None and len(weights) and weights.sum() > 0:
+        scale = describe_weights(weights)["n_effective"] / float(weights.sum())
+
+    # collect tables: (dict index, key, row positions, test, statistic, p)
+    entries: List[Tuple[int, str, np.ndarray]] = []
+    tables: List[np.ndarray] = []
+    likert: List[Tuple[int, str, np.ndarray, float, float]] = []
+    for i, results in enumerate(result_dicts):
+        for key, obj in results.items():
+            kind = _frame_kind(obj)
+            if kind == "likert":
+                groups, stat, p = _likert_tests(obj, cube, segmentation, scale)
+                likert += [(i, key, rows, s, pv) for rows, s, pv in zip(groups, stat, p)]
+            elif kind is not None:
+                for rows, tab in _tables_of(obj, kind):
+                    entries.append((i, key, rows))
+                    tables.append(tab * scale)
+
+    tests, stat, p = test_tables(tables)
+    tests = tests + ["mann_whitney" if np.isfinite(pv) else None for *_, pv in likert]
+    stat = np.concatenate([stat, [s for *_, s, _ in likert]])
+    p = np.concatenate([p, [pv for *_, pv in likert]])
+    entries = entries + [(i, key, rows) for i, key, rows, _, _ in likert]
+    p_adj = p_adjust(p, correction)
+
+    out = [dict(results) for results in result_dicts]
+    cols: Dict[Tuple[int, str], Dict[str, np.ndarray]] = {}
+    for (i, key, rows), test, s, pv, pa in zip(entries, tests, stat, p, p_adj):
+        if (i, key) not in cols:
+            n = len(out[i][key])
+            cols[(i, key)] = {
+                "test": np.full(n, None, dtype=object),
+                "statistic": np.full(n, np.nan),
+                "p_value": np.full(n, np.nan),
+                "p_adj": np.full(n, np.nan),
+            }
+        c = cols[(i, key)]
+        c["test"][rows] = test
+        c["statistic"][rows] = s
+        c["p_value"][rows] = pv
+        c["p_adj"][rows] = pa
+    for (i, key), c in cols.items():
+        out[i][key] = out[i][key].assign(**c)
+    return out
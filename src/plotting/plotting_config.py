@@ -7,6 +7,7 @@ Call apply_style() once in main.py BEFORE you create any plotting_function_jg_an
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 import matplotlib as mpl
 
@@ -18,6 +19,32 @@ EXCEL_PATH = Path("final_survey_results.xlsx")
 FIRST_QUESTION_TEXT = "Welcher Art von Organisation gehören Sie an?"
 SPEC_PATH = Path("question_spec.json")
 
+# parsed-export cache (see survey_cache.py); set CACHE_DIR = None to always re-read the Excel file
+CACHE_DIR = Path(".survey_cache")
+CACHE_FORMAT = "pickle"  # "pickle" | "parquet" | "feather" (parquet/feather need pyarrow)
+CACHE_MAX_BYTES = 1024 ** 3  # evict least recently used entries above 1 GB
+
+# streaming ingestion for very large exports: rows per chunk (None = load the whole sheet)
+STREAM_CHUNKSIZE = None
+
+# dictionary-encoded df_tidy (categorical question/item/answer, compact respondent_id)
+TIDY_CATEGORICAL = True
+# question-partitioned df_tidy (tidy_access.TidyStore): per-question slices without a full scan
+TIDY_STORE = True
+# dense respondent x question answer codes on df_tidy.answers (answer_matrix.py), used by the analysis jobs
+TIDY_ANSWER_MATRIX = True
+# bitmap respondent index per (question, item, answer) on df_tidy.respondent_index (respondent_index.py)
+TIDY_RESPONDENT_INDEX = True
+# ordinal int8 Likert codes of the "ordinal" spec questions on df_tidy.likert (likert_codes.py)
+TIDY_LIKERT_CODES = True
+
+# stage spans (logger.py): wall / CPU time + memory per stage and figure -> run_log_spans.jsonl
+SPAN_LOG = True
+# slowest stages / figures listed at the end of run_log.txt
+SPAN_TOP_N = 10
+# tracemalloc allocation deltas per span (slows the run down noticeably)
+SPAN_TRACEMALLOC = False
+
 # -----------------------------
 # Output config
 # -----------------------------
@@ -37,6 +64,53 @@ PLOTS_JG_DIR.mkdir(parents=True, exist_ok=True)
 SAVE_FORMAT = "png"
 SAVE_DPI = 300
 
+# question figures: 1 = render serially, N > 1 = process pool with N workers (see render_pool.py)
+RENDER_WORKERS = os.cpu_count() or 1
+
+# analysis jobs (df_jg_dict / df_hypotheses_dict, see job_graph.py): thread pool size
+# (1 = serial) and on-disk memo of job results by input fingerprint (None = in memory only)
+JOB_WORKERS = os.cpu_count() or 1
+JOB_CACHE_DIR = Path(".job_cache")
+
+# bootstrap confidence intervals (see bootstrap.py) for hypothesis / JG percentages and
+# Likert means, drawn as error bars; 0 replicates = off
+BOOTSTRAP_REPLICATES = 0
+BOOTSTRAP_SEED = 42
+BOOTSTRAP_LEVEL = 0.95
+BOOTSTRAP_WORKERS = os.cpu_count() or 1
+
+# survey weights by raking to the population marginals QUESTION_LIST.WEIGHTING_TARGETS
+# (see weighting.py): all percentages / counts of the question plots, hypotheses and JG
+# analysis become weighted; False = unweighted
+WEIGHTING = False
+WEIGHTING_MAX_ITER = 100
+WEIGHTING_TOL = 1e-6
+
+# significance tests over all crosstabs + GU/KMU Likert comparisons (see significance.py):
+# adds test / statistic / p_value / p_adj to the result frames
+SIGNIFICANCE_TESTS = True
+SIGNIFICANCE_CORRECTION = "fdr_bh"  # "fdr_bh" | "holm" | "bonferroni" | None
+
+# exploratory all-pairs association scan (Cramér's V, see association_scan.py), run with the
+# hypotheses; heatmap of the ASSOCIATION_HEATMAP_TOP most associated variables
+ASSOCIATION_SCAN = True
+ASSOCIATION_MAX_CATEGORIES = 15
+ASSOCIATION_MIN_N = 20
+ASSOCIATION_WORKERS = os.cpu_count() or 1
+ASSOCIATION_HEATMAP_TOP = 20
+
+# incremental rendering: skip figures whose data / spec entry / config / plot code did not change
+# (see render_cache.py)
+RENDER_CACHE = True
+
+# plot-ready aggregates of every figure, written by each full run (see plot_data.py);
+# `python main.py --restyle` re-renders all figures from these files only
+AGGREGATE_DIR = OUTPUT_DIR / "aggregates"
+PLOT_DATA_PATH = AGGREGATE_DIR / "questions.npz"         # PlotData per question
+PLOT_ENTRIES_PATH = AGGREGATE_DIR / "questions.json"     # catalog entries + Abbildung numbers
+HYPOTHESES_DATA_PATH = AGGREGATE_DIR / "hypotheses.npz"  # get_df_hypotheses results
+JG_DATA_PATH = AGGREGATE_DIR / "jg_analyse.npz"          # get_df_jg results
+
 
 SAVE_BBOX = None
 SAVE_PAD_INCHES = 0.0
@@ -131,6 +205,11 @@ CAPTION_FONTSIZE = 11
 FONT_LEGEND_SIZE = 8
 
 
+#Error bars (bootstrap CIs)
+CI_COLOR = "#333333"
+CI_LINEWIDTH = 1.0
+CI_CAPSIZE = 3
+
 #Horinzontale Bar config
 
 HBAR_GROUP_GAP = 1      # space between dimensions (increase for more gap)
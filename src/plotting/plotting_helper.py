@@ -13,6 +13,7 @@ import textwrap
 
 
 import src.plotting.plotting_config as cfg
+from logger import span
 
 
 # -----------------------------
@@ -82,10 +83,20 @@ def _save_fig(fig: plt.Figure, out_path: Path) -> None:
         kwargs["bbox_inches"] = cfg.SAVE_BBOX
         kwargs["pad_inches"] = cfg.SAVE_PAD_INCHES
 
-    fig.savefig(out_path, **kwargs)
+    with span("savefig", figure=out_path.name):
+        fig.savefig(out_path, **kwargs)
     plt.close(fig)
 
 
+def _draw_ci(ax, y: np.ndarray, x: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> None:
+    """horizontal error bars [lo, hi] around bar ends x (bootstrap CIs; NaN -> no bar)"""
+    xerr = np.vstack([np.clip(x - lo, 0, None), np.clip(hi - x, 0, None)])
+    ax.errorbar(
+        x, y, xerr=xerr, fmt="none",
+        ecolor=cfg.CI_COLOR, elinewidth=cfg.CI_LINEWIDTH, capsize=cfg.CI_CAPSIZE, zorder=3,
+    )
+
+
 #-----------------
 #HELPER DONUT CHART
 #-----------------
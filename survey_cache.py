@@ -0,0 +1,274 @@
+# survey_cache.py
+"""
+Content-addressed on-disk cache for parsed survey exports.
+
+prepare_data() spends most of its time in pd.read_excel (openpyxl). The parsed
+frames only depend on:
+  - the bytes of the Excel export
+  - the sheet that is read
+  - the bytes of question_spec.json
+  - a few prepare_data options (first question, ...)
+  - the preprocessing code (CODE_FILES)
+so all of them go into the cache key. A repeat run on the same export loads the
+frames from disk and never touches openpyxl.
+
+Layout (one folder per entry):
+  <cache_dir>/<key>/meta.json          catalog, base_map, source info, last access
+  <cache_dir>/<key>/<name>.<ext>       one file per cached DataFrame
+
+Frame format:
+  - "pickle"  (default) pandas pickle, keeps dtypes and NA values exactly
+  - "parquet" / "feather" columnar formats, need pyarrow installed
+
+Invalidation:
+  - keys change automatically when the Excel file, the spec or the preprocessing code changes
+  - invalidate_cache() removes all entries (or all entries of one Excel file)
+  - evict_cache() keeps the cache folder below a size limit (least recently used first)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# bump when the content of a cache entry changes (new frames, new dtypes, ...)
+CACHE_VERSION = 2
+
+# modules that produce the cached frames (df_raw / df_q / df_tidy): their source is part of the key
+CODE_FILES = ("preprocessing.py", "normalize_survey_text.py")
+
+META_FILE = "meta.json"
+
+FRAME_EXT = {
+    "pickle": "pkl",
+    "parquet": "parquet",
+    "feather": "feather",
+}
+
+
+#---------------------
+#HELPER
+#---------------------
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's content (streamed, so large exports do not need to fit in memory)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _read_meta(entry_dir: Path) -> Optional[Dict[str, Any]]:
+    p = entry_dir / META_FILE
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(entry_dir: Path, meta: Dict[str, Any]) -> None:
+    (entry_dir / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+
+def _write_frame(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    if fmt == "pickle":
+        df.to_pickle(path)
+    elif fmt == "parquet":
+        df.to_parquet(path)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Unknown cache format: {fmt}")
+
+
+def _read_frame(path: Path, fmt: str) -> pd.DataFrame:
+    if fmt == "pickle":
+        return pd.read_pickle(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if fmt == "feather":
+        return pd.read_feather(path)
+    raise ValueError(f"Unknown cache format: {fmt}")
+
+
+def _list_entries(cache_dir: Path) -> List[Tuple[Path, Dict[str, Any]]]:
+    if not cache_dir.exists():
+        return []
+    entries = []
+    for d in cache_dir.iterdir():
+        if not d.is_dir() or d.name.startswith("."):
+            continue
+        meta = _read_meta(d)
+        if meta is None:
+            # broken / half written entry -> remove
+            shutil.rmtree(d, ignore_errors=True)
+            continue
+        entries.append((d, meta))
+    return entries
+
+
+#---------------------
+#PUBLIC API
+#---------------------
+
+def code_sha256() -> str:
+    """sha256 over the source files of CODE_FILES (next to this module)"""
+    root = Path(__file__).resolve().parent
+    h = hashlib.sha256()
+    for name in CODE_FILES:
+        p = root / name
+        h.update(name.encode("utf-8"))
+        h.update(file_sha256(p).encode("ascii") if p.exists() else b"-")
+    return h.hexdigest()
+
+
+def make_cache_key(
+    excel_path: str | Path,
+    sheet_name: int | str,
+    spec_path: Optional[str | Path],
+    **options: Any,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Returns (key, source) where source holds the hashes the key was built from.
+    options: any prepare_data argument that changes the parsed result.
+    """
+    spec_sha = None
+    if spec_path is not None and Path(spec_path).exists():
+        spec_sha = file_sha256(spec_path)
+
+    source = {
+        "cache_version": CACHE_VERSION,
+        "excel_path": str(Path(excel_path).resolve()),
+        "excel_sha256": file_sha256(excel_path),
+        "sheet_name": sheet_name,
+        "spec_sha256": spec_sha,
+        "code_sha256": code_sha256(),
+        "options": {k: options[k] for k in sorted(options)},
+    }
+
+    # the path itself is not part of the key (same content under a new name -> hit)
+    key_fields = {k: v for k, v in source.items() if k != "excel_path"}
+    key = hashlib.sha256(json.dumps(key_fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return key[:32], source
+
+
+def load_entry(cache_dir: str | Path, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns {"meta": ..., "frames": {name: DataFrame}} or None on a miss.
+    A hit refreshes the entry's last access time (used by evict_cache).
+    """
+    entry_dir = Path(cache_dir) / key
+    meta = _read_meta(entry_dir)
+    if meta is None:
+        return None
+
+    fmt = meta.get("format", "pickle")
+    frames: Dict[str, pd.DataFrame] = {}
+    try:
+        for name in meta.get("frames", []):
+            frames[name] = _read_frame(entry_dir / f"{name}.{FRAME_EXT[fmt]}", fmt)
+    except Exception:
+        # unreadable entry (e.g. written by another pandas version) -> treat as miss
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return None
+
+    meta["last_access"] = time.time()
+    _write_meta(entry_dir, meta)
+
+    return {"meta": meta, "frames": frames}
+
+
+def store_entry(
+    cache_dir: str | Path,
+    key: str,
+    frames: Dict[str, pd.DataFrame],
+    meta: Dict[str, Any],
+    fmt: str = "pickle",
+    max_bytes: Optional[int] = None,
+) -> Path:
+    """
+    Writes one cache entry (atomically: tmp folder + rename) and evicts old
+    entries afterwards if max_bytes is given.
+    """
+    if fmt not in FRAME_EXT:
+        raise ValueError(f"Unknown cache format: {fmt}")
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    entry_dir = cache_dir / key
+    tmp_dir = cache_dir / f".tmp_{key}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, df in frames.items():
+        _write_frame(df, tmp_dir / f"{name}.{FRAME_EXT[fmt]}", fmt)
+
+    meta = dict(meta)
+    meta["format"] = fmt
+    meta["frames"] = list(frames)
+    meta["created"] = time.time()
+    meta["last_access"] = meta["created"]
+    _write_meta(tmp_dir, meta)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    tmp_dir.rename(entry_dir)
+
+    if max_bytes is not None:
+        evict_cache(cache_dir, max_bytes=max_bytes, keep={key})
+
+    return entry_dir
+
+
+def evict_cache(cache_dir: str | Path, max_bytes: int, keep: Optional[set] = None) -> int:
+    """
+    Removes least recently used entries until the cache folder is <= max_bytes.
+    Entries in `keep` are never removed. Returns number of removed entries.
+    """
+    keep = keep or set()
+    entries = _list_entries(Path(cache_dir))
+    sizes = {d: _dir_size(d) for d, _ in entries}
+    total = sum(sizes.values())
+
+    removed = 0
+    for d, meta in sorted(entries, key=lambda e: e[1].get("last_access", 0.0)):
+        if total <= max_bytes:
+            break
+        if d.name in keep:
+            continue
+        shutil.rmtree(d, ignore_errors=True)
+        total -= sizes[d]
+        removed += 1
+
+    return removed
+
+
+def invalidate_cache(cache_dir: str | Path, excel_path: Optional[str | Path] = None) -> int:
+    """
+    Explicit invalidation.
+    - excel_path=None: remove every entry
+    - excel_path given: remove entries built from that file (any content version)
+    Returns number of removed entries.
+    """
+    target = str(Path(excel_path).resolve()) if excel_path is not None else None
+
+    removed = 0
+    for d, meta in _list_entries(Path(cache_dir)):
+        if target is not None and meta.get("source", {}).get("excel_path") != target:
+            continue
+        shutil.rmtree(d, ignore_errors=True)
+        removed += 1
+    return removed
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(scope="session")
+def survey():
+    """(catalog, df_tidy, base_map) of the real export, in-memory path; skips without it"""
+    import src.plotting.plotting_config as cfg
+    from preprocessing import prepare_data
+
+    if not cfg.EXCEL_PATH.exists():
+        pytest.skip("survey export not available")
+    _, _, catalog, df_tidy, base_map = prepare_data(cfg.EXCEL_PATH, cfg.FIRST_QUESTION_TEXT, spec_path=cfg.SPEC_PATH)
+    return catalog, df_tidy, base_map
+
+
+@pytest.fixture(scope="session")
+def question_jobs(survey):
+    """render jobs of the first plotted questions, numbered as main.plot_questions does"""
+    from main import plan_question_entries
+    from plot_data import aggregate_questions
+    from render_pool import make_job
+
+    catalog, df_tidy, base_map = survey
+    entries = [e for e in plan_question_entries(catalog) if e[0] == "plot"]
+    data = aggregate_questions([q for _, q, _ in entries], df_tidy, base_map)
+    # one entry (the one with fewest items) per question type / plot type keeps the renders short
+    picked, seen = [], set()
+    for _, q, plot_i in sorted(entries, key=lambda e: len(e[1].get("items") or [])):
+        kind = (q.get("type"), q.get("plot_type"))
+        if kind not in seen:
+            seen.add(kind)
+            picked.append(make_job(q, data[q["question_text"]], plot_i))
+    return sorted(picked, key=lambda job: job["prefix_index"])
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from answer_matrix import NO_ROW, build_answer_matrix
+
+COLS = ["respondent_id", "question_text", "item", "answer"]
+SINGLE, MATRIX = "Branche?", "Bewertung?"
+
+
+def _tidy(rows):
+    return pd.DataFrame(rows, columns=COLS)
+
+
+def test_duplicate_single_rows_become_option_columns():
+    # respondent 1 has two rows for a question the catalog calls single
+    df = _tidy([(1, SINGLE, None, "IT"), (1, SINGLE, None, "Bau"), (2, SINGLE, None, "IT"), (3, SINGLE, None, "Bau")])
+    catalog = [{"question_text": SINGLE, "type": "single", "options_order": ["Bau", "IT"]}]
+    for cat in (catalog, None):
+        am = build_answer_matrix(df, cat)
+        assert am.multi.all()
+        assert [k for _, k in am.columns] == (["Bau", "IT"] if cat else ["IT", "Bau"])
+        counts, labels, _ = am.answer_counts(SINGLE)
+        # nothing dropped: every row of df_tidy is counted
+        want = df.groupby(["respondent_id", "answer"]).size().unstack(fill_value=0)[labels].to_numpy()
+        assert np.array_equal(counts, want)
+
+
+def test_duplicate_item_rows_raise():
+    df = _tidy([(1, MATRIX, "RFID", "Hoch"), (1, MATRIX, "RFID", "Gering"), (2, MATRIX, "RFID", "Hoch")])
+    for cat in ([{"question_text": MATRIX, "type": "matrix"}], None):
+        with pytest.raises(ValueError, match=MATRIX):
+            build_answer_matrix(df, cat)
+
+
+def test_codes_decode_to_tidy_answers():
+    rng = np.random.default_rng(0)
+    rows = []
+    for rid in range(1, 60):
+        if rng.random() < 0.9:
+            rows.append((rid, SINGLE, None, rng.choice(["IT", "Bau", None])))
+        for it in ["RFID", "KI"]:
+            if rng.random() < 0.7:
+                rows.append((rid, MATRIX, it, rng.choice(["Hoch", "Gering"])))
+    df = _tidy(rows)
+    am = build_answer_matrix(df, [{"question_text": SINGLE, "type": "single"}, {"question_text": MATRIX, "type": "matrix"}])
+    assert not am.multi.any()
+    for j, (q, it) in enumerate(am.columns):
+        d = df[(df["question_text"] == q) & (df["item"].isna() if it is None else df["item"] == it)]
+        want = pd.Series(am.respondents).map(d.set_index("respondent_id")["answer"])
+        got = pd.Series(am.decode(j))
+        assert got.isna().equals(want.isna())
+        assert (got[want.notna()] == want[want.notna()]).all()
+        assert ((am.codes[:, j] == NO_ROW) == ~pd.Series(am.respondents).isin(d["respondent_id"]).to_numpy()).all()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from association_scan import ITEM_SEP, association_scan
+
+MATRIX = "Wie bewerten Sie den Mehrwert?"
+SINGLE = "Unternehmensgröße?"
+SCALE = ["Kein", "Gering", "Hoch", "Sehr hoch"]
+CATALOG = [
+    {"question_text": MATRIX, "type": "matrix", "ordinal": True, "answer_order": SCALE + ["Keine Antwort"]},
+    {"question_text": SINGLE, "type": "single", "options_order": ["KMU", "GU"]},
+]
+
+
+def _tidy() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    rows = []
+    for r in range(1, 61):
+        size = "GU" if r % 2 else "KMU"
+        rows.append((r, SINGLE, None, size))
+        for item in ("Sensorik", "KI"):
+            a = SCALE[3] if size == "GU" and item == "KI" else SCALE[rng.integers(0, 4)]
+            rows.append((r, MATRIX, item, a))
+    return pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+
+
+def test_likert_matrix_items_are_scanned():
+    out = association_scan(_tidy(), min_n=10, workers=1, catalog=CATALOG)
+    names = set(out["question_a"]) | set(out["question_b"])
+    assert f"{MATRIX}{ITEM_SEP}KI" in names
+    assert f"{MATRIX}{ITEM_SEP}Sensorik" in names
+
+    pair = out[out[["question_a", "question_b"]].isin([SINGLE, f"{MATRIX}{ITEM_SEP}KI"]).all(axis=1)]
+    assert len(pair) == 1 and pair["cramers_v"].iloc[0] > 0.5
+
+
+def test_matrix_items_need_ordinal_codes():
+    out = association_scan(_tidy(), min_n=10, workers=1)
+    assert not out["question_a"].str.contains(ITEM_SEP, regex=False).any()
+    assert not out["question_b"].str.contains(ITEM_SEP, regex=False).any()
@@ -0,0 +1,67 @@
+import json
+import re
+import unicodedata
+
+import pandas as pd
+import pytest
+
+import src.plotting.plotting_config as cfg
+from normalize_survey_text import (
+    CANON_MAP, CanonEngine, normalize_by_canon_map, normalize_series_by_canon_map,
+)
+
+
+def _reference(x, canon_map):
+    """normalize_by_canon_map before memoization (one full pass per call)"""
+    if pd.isna(x):
+        return x
+    s = unicodedata.normalize("NFKC", str(x))
+    for a, b in (("\u00A0", " "), ("\u2007", " "), ("\u202F", " "), ("\u2009", " "), ("\u200A", " "),
+                 ("\u200B", ""), ("\uFEFF", ""), ("\u2013", "-"), ("\u2014", "-"), ("\u2212", "-"),
+                 ("\u201E", '"'), ("\u201C", '"'), ("\u201D", '"'), ("\u201A", "'"), ("\u2018", "'"), ("\u2019", "'")):
+        s = s.replace(a, b)
+    s = re.sub(r"\s+", " ", s).strip()
+    if not s:
+        return s
+    s = re.sub(r"\s*-\s*", " - ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    if s in canon_map:
+        return canon_map[s]
+    s_commas = re.sub(r"\s*,\s*", ",", s)
+    if s_commas in canon_map:
+        return canon_map[s_commas]
+    s_nospace = s_commas.replace(" ", "")
+    if s_nospace in canon_map:
+        return canon_map[s_nospace]
+    return s
+
+
+TRICKY = [
+    "KeineAntwort", " Keine  Antwort ", "Sehr hoheWirkung", "50\u2013250", "50 \u2014 250", " Ja\u200B",
+    "Manuelle Erfassung , keine Nutzung", "\u201EZitat\u201C", "", "   ", "\uFEFF", "10 - 49",
+    "10\u00A0-\u202F49", "x-y-z", 42, 1.5,
+]
+
+
+def _strings():
+    values = list(TRICKY) + list(CANON_MAP) + list(CANON_MAP.values())
+    if cfg.EXCEL_PATH.exists():
+        df = pd.read_excel(cfg.EXCEL_PATH, dtype=str)
+        values += list(df.columns) + list(pd.unique(df.to_numpy().ravel()))
+    if cfg.SPEC_PATH.exists():
+        values += re.findall(r'"((?:[^"\\]|\\.)*)"', json.dumps(json.load(open(cfg.SPEC_PATH, encoding="utf-8")), ensure_ascii=False))
+    return values
+
+
+@pytest.mark.parametrize("engine", [CanonEngine(CANON_MAP), None])
+def test_memoized_equals_reference(engine):
+    for v in _strings() * 2:  # second pass: cache hits
+        got = engine.normalize(v) if engine is not None else normalize_by_canon_map(v, CANON_MAP)
+        want = _reference(v, CANON_MAP)
+        assert (pd.isna(got) and pd.isna(want)) or got == want, repr(v)
+
+
+def test_series_equals_map():
+    s = pd.Series(TRICKY * 3 + [None, float("nan")], dtype=object)
+    want = s.map(lambda v: _reference(v, CANON_MAP))
+    pd.testing.assert_series_equal(normalize_series_by_canon_map(s, CANON_MAP), want)
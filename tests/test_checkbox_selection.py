@@ -0,0 +1,77 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import is_selected, selected_mask, tidy_matrix_multi
+
+PREFIX = "In welchen Phasen nutzen Sie die Technologie?"
+
+
+def _is_selected_reference(v: Any) -> bool:
+    """the former per-cell predicate of tidy_matrix_multi"""
+    if pd.isna(v):
+        return False
+    if isinstance(v, bool):
+        return v
+    try:
+        return float(v) == 1.0
+    except Exception:
+        return str(v).strip().lower() in {"1", "x", "ja", "true"}
+
+
+def _reference(df_q: pd.DataFrame, q) -> pd.DataFrame:
+    """the former melt + map implementation"""
+    qcols = [c for c in df_q.columns if str(c).startswith(q["cols_prefix"])]
+    melted = df_q[["respondent_id"] + qcols].melt(id_vars="respondent_id", var_name="col", value_name="value")
+    melted = melted[melted["value"].map(_is_selected_reference)]
+    if melted.empty:
+        return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
+    col_norm = (melted["col"].astype(str).str.replace("\u00A0", " ", regex=False)
+                .str.replace(r"\s+", " ", regex=True).str.strip())
+    pattern = (q.get("col_parse") or {}).get("pattern") or r"\[(?P<item>[^\]]+)\]\[(?P<answer>[^\]]+)\]\s*$"
+    extracted = col_norm.str.extract(pattern)
+    melted["item"] = extracted["item"].astype(str).str.strip()
+    melted["answer"] = extracted["answer"].astype(str).str.strip()
+    melted["question_text"] = q["question_text"]
+    melted = melted[melted["item"].ne("nan") & melted["answer"].ne("nan")]
+    return melted[["respondent_id", "question_text", "item", "answer"]]
+
+
+CELLS = [1, 1.0, "1", " x ", "Ja", "TRUE", True, False, 0, "0", "nein", "", None, np.nan, 2, "1.0", "abc"]
+
+
+def _grid(n_rows: int = 60, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cols = {"respondent_id": np.arange(1, n_rows + 1)}
+    pool = np.empty(len(CELLS), dtype=object)
+    pool[:] = CELLS
+    for item in ["RFID", "KI (z.B. ML)"]:
+        for phase in ["1", "2", "Keine Antwort"]:
+            cols[f"{PREFIX} [{item}][{phase}]"] = pool[rng.integers(0, len(pool), n_rows)]
+    cols[f"{PREFIX}\u00A0[NBSP]\u00A0[1] "] = pool[rng.integers(0, len(pool), n_rows)]
+    cols[f"{PREFIX} ohne Klammern"] = pool[rng.integers(0, len(pool), n_rows)]  # parse failure
+    cols[f"{PREFIX} [Numerisch][3]"] = rng.choice([0.0, 1.0, np.nan], n_rows)  # numeric block column
+    return pd.DataFrame(cols)
+
+
+def test_selected_mask_matches_predicate():
+    block = _grid().drop(columns="respondent_id")
+    want = np.vectorize(_is_selected_reference, otypes=[bool])(block.to_numpy(dtype=object))
+    assert np.array_equal(selected_mask(block), want)
+    assert all(is_selected(v) == _is_selected_reference(v) for v in CELLS)
+
+    numeric = pd.DataFrame({"a": [1, 0, 1], "b": [np.nan, 1.0, 2.0], "c": [True, False, True]})
+    assert np.array_equal(selected_mask(numeric), np.vectorize(_is_selected_reference, otypes=[bool])(numeric.to_numpy(dtype=object)))
+
+
+def test_tidy_matrix_multi_equals_melt():
+    df_q = _grid()
+    q = {"question_text": "Phasen", "cols_prefix": PREFIX}
+    got = tidy_matrix_multi(df_q, q)
+    want = _reference(df_q, q)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+    none = df_q.copy()
+    none.iloc[:, 1:] = np.nan
+    assert tidy_matrix_multi(none, q).empty and _reference(none, q).empty
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import build_conditional_virtual_questions, build_q2_conditional_virtual_questions
+from tidy_access import TidyStore
+
+Q1, Q2, Q3 = "Mehrwert Technologien", "Phasen je Technologie", "Hemmnisse je Technologie"
+ITEMS = ["RFID", "Sensorik", "KI", "AAS"]
+HIGH = ["Hoher Mehrwert", "Sehr hoher Mehrwert"]
+
+
+def _reference(df_tidy, q1_text, q2_text, items_order=None, q1_high_answers=("Hoher Mehrwert", "Sehr hoher Mehrwert"),
+               q2_answer_keep=None, q2_virtual_prefix="Q2 (filtered by Q1 high value)"):
+    """the former per-item loop"""
+    d1 = df_tidy[df_tidy["question_text"] == q1_text].copy()
+    d1["item"] = d1["item"].astype(str)
+    d1["answer"] = d1["answer"].astype(str)
+    d2 = df_tidy[df_tidy["question_text"] == q2_text].copy()
+    d2["item"] = d2["item"].astype(str)
+    d2["answer"] = d2["answer"].astype(str)
+    if items_order:
+        items = list(items_order)
+    else:
+        items = sorted(set(d1["item"].dropna().unique()).intersection(set(d2["item"].dropna().unique())))
+    out_rows = []
+    for it in items:
+        keep_ids = d1.loc[(d1["item"] == it) & (d1["answer"].isin(q1_high_answers)), "respondent_id"].unique()
+        if len(keep_ids) == 0:
+            continue
+        sel = d2.loc[(d2["item"] == it) & (d2["respondent_id"].isin(keep_ids)), ["respondent_id", "answer"]].copy()
+        if q2_answer_keep is not None:
+            sel = sel[sel["answer"].isin(set(map(str, q2_answer_keep)))]
+        if sel.empty:
+            continue
+        sel["question_text"] = f"{q2_virtual_prefix} | {it}"
+        sel["item"] = None
+        out_rows.append(sel[["respondent_id", "question_text", "item", "answer"]])
+    if not out_rows:
+        return pd.DataFrame(columns=["respondent_id", "question_text", "item", "answer"])
+    return pd.concat(out_rows, ignore_index=True)
+
+
+def _tidy(n: int = 80, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for rid in range(1, n + 1):
+        for it in ITEMS[:3]:
+            rows.append((rid, Q1, it, rng.choice(HIGH + ["Geringer Mehrwert", "Keine Antwort"])))
+        for it in ITEMS:
+            for phase in ["Design", "Nutzung", "Recycling"]:
+                if rng.random() < 0.4:
+                    rows.append((rid, Q2, it, phase))
+                if rng.random() < 0.3:
+                    rows.append((rid, Q3, it, phase))
+        rows.append((rid, "Branche", None, rng.choice(["A", "B"])))
+    df = pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _eq(got, want):
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), want.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"items_order": ["KI", "RFID", "AAS", "Sensorik"]},
+    {"q2_answer_keep": ["Nutzung", "Recycling"]},
+    {"q1_high_answers": ["Geringer Mehrwert"], "q2_answer_keep": []},
+])
+def test_single_pair_matches_loop(kwargs):
+    df = _tidy()
+    want = _reference(df, Q1, Q2, **kwargs)
+    _eq(build_q2_conditional_virtual_questions(df, Q1, Q2, **kwargs), want)
+    _eq(build_q2_conditional_virtual_questions(TidyStore(df), Q1, Q2, **kwargs), want)
+
+
+def test_pairs_match_concatenated_loops():
+    df = _tidy(seed=3)
+    pairs = [
+        {"condition_question": Q1, "condition_answers": HIGH, "target_question": Q2, "question_prefix": "P2"},
+        {"condition_question": Q1, "condition_answers": ["Geringer Mehrwert"], "target_question": Q3,
+         "target_answers": ["Design"], "items_order": ITEMS, "question_prefix": "P3"},
+    ]
+    want = pd.concat([
+        _reference(df, Q1, Q2, q1_high_answers=HIGH, q2_virtual_prefix="P2"),
+        _reference(df, Q1, Q3, items_order=ITEMS, q1_high_answers=["Geringer Mehrwert"], q2_answer_keep=["Design"],
+                   q2_virtual_prefix="P3"),
+    ], ignore_index=True)
+    _eq(build_conditional_virtual_questions(df, pairs), want)
+    assert build_conditional_virtual_questions(df, []).empty
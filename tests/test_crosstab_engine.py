@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import QUESTION_LIST as const
+from Umfrage_JG_Analyse.preprocessing_jg_analyse import crosstab_engine
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.crosstab_engine import compute_crosstabs
+
+SEG, TAR = "Unternehmensgröße", "Eingesetzte Kennzahlen"
+PAIRS = [
+    {"analysis_key": "all", "segment_question": SEG, "target_question": TAR},
+    {"analysis_key": "ab", "segment_question": SEG, "target_question": TAR, "target_answers": ["A", "B"]},
+]
+BOOTSTRAP = {"replicates": 50, "seed": 1, "level": 0.95, "workers": 1}
+
+
+def _tidy(n: int = 120, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for rid in range(1, n + 1):
+        rows.append((rid, SEG, None, rng.choice(["GU", "KMU"])))
+        for a in "ABCD":
+            if rng.random() < 0.4:
+                rows.append((rid, TAR, None, a))
+    return pd.DataFrame(rows, columns=[const.COL_ID, "question_text", "item", "answer"])
+
+
+def _reference(df: pd.DataFrame, answers=None) -> pd.DataFrame:
+    """n = respondents per (segment, answer), total = respondents of the segment with any target answer"""
+    seg = df[df["question_text"] == SEG].set_index(const.COL_ID)["answer"].rename("segment")
+    tar = df[df["question_text"] == TAR]
+    if answers is not None:
+        tar = tar[tar["answer"].isin(answers)]
+    tar = tar.join(seg, on=const.COL_ID)
+    n = tar.groupby(["segment", "answer"])[const.COL_ID].nunique().rename("n").reset_index()
+    total = tar.groupby("segment")[const.COL_ID].nunique().rename("total")
+    out = n.join(total, on="segment")
+    out["pct"] = out["n"] / out["total"] * 100.0
+    return out
+
+
+@pytest.mark.parametrize("i, answers", [(0, None), (1, ["A", "B"])])
+def test_counts_match_pandas(i, answers):
+    df = _tidy()
+    got = compute_crosstabs(df, PAIRS)[i]
+    want = _reference(df, answers)
+    pd.testing.assert_frame_equal(got[["segment", "answer", "n", "total", "pct"]].reset_index(drop=True), want, check_dtype=False)
+
+
+def test_ratio_inputs_only_for_bootstrap(monkeypatch):
+    df = _tidy()
+    built = []
+    inner = crosstab_engine._crosstab_from_indicators
+
+    def spy(*args, **kwargs):
+        out = inner(*args, **kwargs)
+        built.append(out[1] is not None)
+        return out
+
+    monkeypatch.setattr(crosstab_engine, "_crosstab_from_indicators", spy)
+    plain = compute_crosstabs(df, PAIRS)
+    assert built == [False, False]
+    assert all("pct_lo" not in out for out in plain)
+
+    with_ci = compute_crosstabs(df, PAIRS, bootstrap=BOOTSTRAP)
+    assert built[2:] == [True, True]
+    for a, b in zip(plain, with_ci):
+        pd.testing.assert_frame_equal(b.drop(columns=["pct_lo", "pct_hi"]), a)
+        assert ((b["pct_lo"] <= b["pct"] + 1e-9) & (b["pct"] <= b["pct_hi"] + 1e-9)).all()
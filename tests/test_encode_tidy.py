@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from answer_matrix import build_answer_matrix
+from plot_data import aggregate_question
+from preprocessing import encode_tidy
+from tidy_access import TidyStore, select_question
+
+Q = "Welche konkreten Mehrwerte?"
+Q_OTHER = "Branche?"
+
+
+def _tidy() -> pd.DataFrame:
+    """one single-choice question with both missing kinds: NaN (not answered) and pd.NA"""
+    answers = ["Kosten", np.nan, "Zeit", pd.NA, np.nan, "Kosten", "Zeit", np.nan, pd.NA, "Kosten"]
+    rows = [{"respondent_id": i + 1, "question_text": Q, "item": None, "answer": a} for i, a in enumerate(answers)]
+    rows += [{"respondent_id": i + 1, "question_text": Q_OTHER, "item": None, "answer": "IT"} for i in range(10)]
+    return pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+
+
+@pytest.mark.parametrize("layout", [encode_tidy, lambda d: TidyStore(encode_tidy(d), by_item=True)])
+def test_aggregates_equal_with_encoding(layout):
+    q = {"question_text": Q, "type": "single"}
+    base_map = {Q: 10}
+    plain = aggregate_question(q, _tidy(), base_map)
+    encoded = aggregate_question(q, layout(_tidy()), base_map)
+
+    assert "<NA>" in plain.labels and "nan" in plain.labels
+    assert encoded.labels == plain.labels
+    assert np.array_equal(encoded.counts, plain.counts)
+    assert np.allclose(encoded.pcts, plain.pcts)
+
+
+def test_decoded_slice_keeps_pd_na():
+    d = select_question(encode_tidy(_tidy()), Q)
+    kinds = [type(a).__name__ for a in d["answer"]]
+    assert kinds.count("NAType") == 2
+    assert kinds.count("float") == 3
+
+
+def test_answer_matrix_ignores_na_category():
+    am_plain = build_answer_matrix(_tidy())
+    am_encoded = build_answer_matrix(encode_tidy(_tidy()))
+    assert am_encoded.codebooks == am_plain.codebooks
+    assert np.array_equal(am_encoded.codes, am_plain.codes)
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.plotting.plotting_config as cfg
+from preprocessing import (
+    HEADER_RE, MATRIX_MULTI_PATTERN, MATRIX_SINGLE_PATTERN,
+    clear_header_cache, header_group, parse_header, split_header, tidy_matrix_single,
+)
+
+HEADERS = [
+    "Frage", "Frage [Item]", "Frage [Item][1]", "Frage  [ A ]  ", "Frage\u00A0[NBSP]\u00A0",
+    "Frage [a] [b]", "Frage []", "[nur Item]", "", "Frage [Item", "Frage [x]][y]", 42,
+]
+
+
+def _split_reference(colname) -> Tuple[str, Optional[str]]:
+    """the former uncached split_header"""
+    m = HEADER_RE.match(str(colname))
+    if not m:
+        return str(colname).strip(), None
+    q = (m.group(1) or "").strip()
+    item = (m.group(2) or "").strip() if m.group(2) else None
+    return q, item
+
+
+def _excel_headers():
+    if not Path(cfg.EXCEL_PATH).exists():
+        return []
+    return list(pd.read_excel(cfg.EXCEL_PATH, nrows=0).columns)
+
+
+def test_split_header_matches_regex():
+    clear_header_cache()
+    for h in HEADERS + _excel_headers():
+        assert split_header(h) == _split_reference(h), h
+    # second pass is served from the cache and stays identical
+    hits = parse_header.cache_info().hits
+    for h in HEADERS + _excel_headers():
+        assert split_header(h) == _split_reference(h), h
+    assert parse_header.cache_info().hits > hits
+
+
+def test_header_group_matches_str_extract():
+    for pattern in (MATRIX_SINGLE_PATTERN, MATRIX_MULTI_PATTERN):
+        cols = pd.Series([str(h) for h in HEADERS + _excel_headers()], dtype=object)
+        norm = (cols.str.replace("\u00A0", " ", regex=False)
+                .str.replace(r"\s+", " ", regex=True).str.strip())
+        extracted = norm.str.extract(pattern)
+        for name in extracted.columns:
+            want = extracted[name].str.strip()
+            got = [header_group(c, pattern, name) for c in cols]
+            assert [None if pd.isna(v) else v for v in want] == got
+
+
+def _tidy_single_reference(df_q: pd.DataFrame, q) -> pd.DataFrame:
+    """the former melt + str.extract implementation"""
+    qcols = [c for c in df_q.columns if str(c).startswith(q["cols_prefix"])]
+    melted = df_q[["respondent_id"] + qcols].melt(id_vars="respondent_id", var_name="col", value_name="answer")
+    col_norm = (melted["col"].astype(str).str.replace("\u00A0", " ", regex=False)
+                .str.replace(r"\s+", " ", regex=True).str.strip())
+    pattern = (q.get("col_parse") or {}).get("pattern") or r"\[(?P<item>[^\]]+)\]\s*$"
+    extracted = col_norm.str.extract(pattern)
+    melted["question_text"] = q["question_text"]
+    melted["item"] = extracted["item"].fillna(col_norm).astype(str).str.strip()
+    melted = melted.dropna(subset=["answer"])
+    return melted[["respondent_id", "question_text", "item", "answer"]]
+
+
+@pytest.mark.parametrize("col_parse", [None, {"pattern": r"\((?P<item>[^)]+)\)\s*$"}])
+def test_tidy_matrix_single_unchanged(col_parse):
+    prefix = "Wie bewerten Sie"
+    rng = np.random.default_rng(1)
+    n = 40
+    cols = {"respondent_id": np.arange(1, n + 1)}
+    for h in ["[RFID]", "[ KI ]", "\u00A0[Cloud]", "(Klammer)", "ohne Item", "[a][b]"]:
+        cols[f"{prefix} {h}"] = rng.choice(np.array(["hoch", "niedrig", None], dtype=object), n)
+    df_q = pd.DataFrame(cols)
+    q = {"question_text": "Bewertung", "cols_prefix": prefix, "col_parse": col_parse}
+    pd.testing.assert_frame_equal(tidy_matrix_single(df_q, q), _tidy_single_reference(df_q, q), check_dtype=False)
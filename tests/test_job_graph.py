@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import job_graph
+import src.plotting.plotting_config as cfg
+from answer_matrix import build_answer_matrix
+from job_graph import run_jobs, value_fingerprint
+from likert_codes import build_likert_codes, likert_codes_of
+from preprocessing import prepare_data
+from tidy_access import TidyStore
+
+Q = "Wie stark ist das Hemmnis?"
+SCALE = ["Kein Hemmnis", "Geringes Hemmnis", "Starkes Hemmnis"]
+CALLS = []
+
+
+def likert_mean(df_tidy):
+    CALLS.append(1)
+    return float(np.mean(likert_codes_of(df_tidy).codes_of(Q)))
+
+
+JOBS = [{"key": "likert_mean", "func": likert_mean, "needs": ["df_tidy"]}]
+
+
+def _store(options_order, strong=None):
+    df = pd.DataFrame({
+        "respondent_id": [1, 2, 3, 4],
+        "question_text": [Q] * 4,
+        "item": [None] * 4,
+        "answer": ["Kein Hemmnis", "Starkes Hemmnis", "Starkes Hemmnis", "Geringes Hemmnis"],
+    })
+    catalog = [{"question_text": Q, "type": "likert", "options_order": options_order, "strong_answers": strong}]
+    store = TidyStore(df)
+    store.answers = build_answer_matrix(store, catalog)
+    store.likert = build_likert_codes(store.answers, catalog)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    """empty in-process memo: a hit must come from the disk cache"""
+    monkeypatch.setattr(job_graph, "_MEMO", {})
+    CALLS.clear()
+
+
+def _run(store, cache_dir):
+    job_graph._MEMO.clear()
+    return run_jobs(JOBS, {"df_tidy": store}, workers=1, cache_dir=cache_dir)["likert_mean"]
+
+
+def test_same_spec_hits_changed_spec_misses(tmp_path):
+    first = _run(_store(SCALE), tmp_path)
+    assert _run(_store(SCALE), tmp_path) == first
+    assert len(CALLS) == 1
+
+    reversed_ = _run(_store(SCALE[::-1]), tmp_path)
+    assert len(CALLS) == 2
+    assert reversed_ != first
+
+    assert value_fingerprint(_store(SCALE, strong=["Starkes Hemmnis"])) != value_fingerprint(_store(SCALE))
+    assert value_fingerprint(_store(SCALE)) == value_fingerprint(_store(SCALE))
+
+
+@pytest.mark.skipif(not cfg.EXCEL_PATH.exists(), reason="survey export not available")
+def test_reversed_spec_recomputes_likert_mean(tmp_path, monkeypatch):
+    from Umfrage_JG_Analyse.preprocessing_jg_analyse import df_jg_dict
+
+    spec = json.loads(cfg.SPEC_PATH.read_text(encoding="utf-8"))
+    q = next(k for k in spec if "Hemmnis für die Umsetzung" in k)
+    reversed_spec = dict(spec, **{q: dict(spec[q], options_order=spec[q]["options_order"][-2::-1] + ["Keine Antwort"])})
+    reversed_path = tmp_path / "spec.json"
+    reversed_path.write_text(json.dumps(reversed_spec, ensure_ascii=False), encoding="utf-8")
+
+    def mean(spec_path):
+        _, _, _, store, _ = prepare_data(
+            cfg.EXCEL_PATH, cfg.FIRST_QUESTION_TEXT, spec_path=spec_path,
+            tidy_store=True, answer_matrix=True, likert_codes=True,
+        )
+        job_graph._MEMO.clear()
+        out = run_jobs(df_jg_dict, {"df_tidy": store, "bootstrap": None, "weights": None},
+                       targets=["likert_mean"], workers=1, cache_dir=tmp_path / "cache")
+        return out["likert_mean"]
+
+    plain = mean(cfg.SPEC_PATH)
+    cached = mean(cfg.SPEC_PATH)
+    pd.testing.assert_frame_equal(cached, plain)
+    flipped = mean(reversed_path)
+    assert not flipped["value"].equals(plain["value"])
@@ -0,0 +1,70 @@
+import json
+import tracemalloc
+
+import pytest
+
+import job_graph
+import logger as logger_mod
+import src.plotting.plotting_config as cfg
+from job_graph import run_jobs
+from logger import TinyLogger, span
+from preprocessing import prepare_data
+
+
+@pytest.fixture
+def log(tmp_path):
+    lg = TinyLogger(tmp_path / "run_log.txt", trace_memory=True)
+    yield lg
+    if logger_mod._ACTIVE is lg:
+        lg.close()
+    tracemalloc.stop()
+
+
+def _lines(lg):
+    return [json.loads(line) for line in lg.spans_path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_spans_are_recorded_and_summarized(log):
+    with log.span("outer", figure="a.png") as extra:
+        with span("inner"):
+            sum(range(10000))
+        extra["rows"] = 3
+    with pytest.raises(ValueError):
+        with span("broken"):
+            raise ValueError
+    log.record_span("figure", wall_s=2.5, cpu_s=2.0, figure="b.png")
+
+    stages = [s["stage"] for s in log.spans]
+    assert stages == ["inner", "outer", "broken", "figure"]
+    outer = log.spans[1]
+    assert outer["figure"] == "a.png" and outer["rows"] == 3 and outer["status"] == "ok"
+    assert outer["wall_s"] >= log.spans[0]["wall_s"] >= 0
+    assert {"cpu_s", "t_start_s", "py_alloc_mb", "py_peak_mb", "thread"} <= set(outer)
+    assert log.spans[2]["status"] == "error"
+    assert [s["stage"] for s in _lines(log)] == stages
+
+    summary = log.span_summary()
+    assert summary["figures"]["figure"].tolist()[0] == "b.png"
+    log.close()
+    text = log.log_path.read_text(encoding="utf-8")
+    assert "Slowest stages:" in text and "Slowest figures:" in text
+
+
+def test_span_without_active_logger_is_a_no_op():
+    assert logger_mod._ACTIVE is None
+    with span("nothing", job="x") as extra:
+        assert extra == {"job": "x"}
+
+
+def test_pipeline_stages_record_spans(log, monkeypatch):
+    monkeypatch.setattr(job_graph, "_MEMO", {})
+    jobs = [{"key": "double", "func": lambda x: 2 * x, "needs": ["x"]}]
+    assert run_jobs(jobs, {"x": 21}, workers=1, cache_dir=None) == {"double": 42}
+    job_spans = [s for s in log.spans if s["stage"] == "job double"]
+    assert job_spans and job_spans[0]["job"] == "double"
+
+    if not cfg.EXCEL_PATH.exists():
+        pytest.skip("survey export not available")
+    prepare_data(cfg.EXCEL_PATH, cfg.FIRST_QUESTION_TEXT, spec_path=cfg.SPEC_PATH, chunksize=50)
+    stages = {s["stage"] for s in log.spans}
+    assert {"read_excel", "build_tidy"} <= stages
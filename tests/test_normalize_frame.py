@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+import src.plotting.plotting_config as cfg
+from benchmarks.bench_normalize import make_wide_export
+from preprocessing import normalize_frame, normalize_str, normalize_yes_no
+
+
+def _per_cell(df: pd.DataFrame) -> pd.DataFrame:
+    """the former two DataFrame.map passes"""
+    return df.map(normalize_str).map(normalize_yes_no)
+
+
+def test_normalize_frame_equals_per_cell_map():
+    df = make_wide_export(500, 60, seed=1)
+    pd.testing.assert_frame_equal(normalize_frame(df), _per_cell(df))
+
+
+@pytest.mark.skipif(not cfg.EXCEL_PATH.exists(), reason="survey export not available")
+def test_normalize_frame_on_export():
+    df = pd.read_excel(cfg.EXCEL_PATH, dtype=str)
+    pd.testing.assert_frame_equal(normalize_frame(df), _per_cell(df))
+
+
+def test_empty_frame():
+    df = pd.DataFrame(index=range(3))
+    pd.testing.assert_frame_equal(normalize_frame(df), df)
@@ -0,0 +1,91 @@
+import numpy as np
+
+from main import plan_question_entries
+from plot_data import PlotData, aggregate_question
+from tidy_access import select_question
+
+
+#---------------------
+#REFERENCE: aggregation as the former plot_* functions did it inline
+#---------------------
+
+def _single(d, base_n, order):
+    counts = d["answer"].value_counts(dropna=False)
+    if order:
+        counts = counts.reindex(order, fill_value=0)
+    if base_n is None:
+        base_n = int(counts.sum())
+    pcts = (counts.values / base_n * 100) if base_n > 0 else np.zeros(len(counts))
+    return [str(x) for x in counts.index.tolist()], pcts
+
+
+def _checkbox(d, base_n, order):
+    counts = d["answer"].value_counts()
+    if order:
+        counts = counts.reindex(order, fill_value=0)
+    if base_n is None:
+        base_n = int(d["respondent_id"].nunique())
+    pcts = (counts.values / base_n * 100) if base_n > 0 else np.zeros(len(counts))
+    return counts.index.astype(str).tolist(), pcts
+
+
+def _matrix(d, items_order, answer_order):
+    tab = d.groupby(["item", "answer"]).size().reset_index(name="n")
+    all_items = list(items_order) if items_order else tab["item"].dropna().astype(str).unique().tolist()
+    all_answers = list(answer_order) if answer_order else tab["answer"].dropna().astype(str).unique().tolist()
+    pivot_n = tab.pivot(index="item", columns="answer", values="n").reindex(index=all_items, columns=all_answers).fillna(0.0)
+    row_sum = pivot_n.sum(axis=1).replace(0, np.nan)
+    pivot_pct = (pivot_n.div(row_sum, axis=0) * 100).fillna(0.0)
+    return pivot_pct.columns.astype(str).tolist(), pivot_pct.to_numpy(), pivot_pct.index.astype(str).tolist()
+
+
+def _donut_split(d, question_text, items_order, answer_order, base_n):
+    items = list(items_order) if items_order else d["item"].dropna().astype(str).unique().tolist()
+    out = []
+    for it in items:
+        di = d[d["item"].astype(str) == str(it)]
+        if not di.empty:
+            out.append((it, _single(di, base_n, answer_order)))
+    return out
+
+
+def _reference(q, df_tidy, base_map):
+    qtext, qtype = q["question_text"], q["type"]
+    plot_type = (q.get("plot_type") or "").lower()
+    base_n = base_map.get(qtext)
+    options_order = q.get("options_order") or None
+    answer_order = q.get("answer_order") or None
+    items_order = q.get("items_order") or None
+    d = select_question(df_tidy, qtext)
+    if qtype in {"single", "likert"}:
+        return _single(d, base_n, options_order)
+    if qtype == "checkbox":
+        return _checkbox(d, base_n, options_order)
+    if qtype == "matrix" and plot_type == "donut":
+        return _donut_split(d, qtext, items_order, options_order or answer_order, base_n)
+    return _matrix(d, items_order, answer_order)
+
+
+def _assert_same(got: PlotData, want):
+    if got.kind == "matrix":
+        labels, pcts, items = want
+        assert got.items == items
+    else:
+        labels, pcts = want
+    assert got.labels == labels
+    np.testing.assert_allclose(got.pcts, pcts)
+
+
+def test_plot_data_matches_inline_aggregation(survey):
+    catalog, df_tidy, base_map = survey
+    plotted = [q for kind, q, _ in plan_question_entries(catalog) if kind == "plot"]
+    assert plotted
+    for q in plotted:
+        got, want = aggregate_question(q, df_tidy, base_map), _reference(q, df_tidy, base_map)
+        if isinstance(got, list):
+            assert [it for it, _ in got] == [it for it, _ in want], q["question_text"]
+            for (_, g), (_, w) in zip(got, want):
+                _assert_same(g, w)
+        else:
+            _assert_same(got, want)
+
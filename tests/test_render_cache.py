@@ -0,0 +1,84 @@
+import dataclasses
+
+import pytest
+
+import plotting_function
+import src.plotting.plotting_config as cfg
+from plot_data import PlotData
+from plotting_function import plot_question_and_save
+from render_cache import MANIFEST_DIR
+from render_pool import init_worker
+
+
+@pytest.fixture
+def draws(monkeypatch):
+    """counts the actual renders behind plot_question_and_save"""
+    init_worker()
+    calls = []
+    render = plotting_function._render_question_figures
+
+    def counted(*args, **kwargs):
+        calls.append(args[0]["question_text"])
+        return render(*args, **kwargs)
+
+    monkeypatch.setattr(plotting_function, "_render_question_figures", counted)
+    return calls
+
+
+def _job(question_jobs):
+    return next(j for j in question_jobs if isinstance(j["plot_data"], PlotData))
+
+
+def _render(job, out_dir, plot_data=None, **changes):
+    return plot_question_and_save(
+        dict(job["q"], **changes), None, {}, out_dir,
+        prefix_index=job["prefix_index"], plot_data=plot_data or job["plot_data"],
+    )
+
+
+def test_hit_returns_recorded_files(question_jobs, tmp_path, draws):
+    job = _job(question_jobs)
+    first = _render(job, tmp_path / "a")
+    assert first and (tmp_path / "a" / MANIFEST_DIR).is_dir()
+    mtimes = [p.stat().st_mtime_ns for p in first]
+
+    assert _render(job, tmp_path / "a") == first
+    assert [p.stat().st_mtime_ns for p in first] == mtimes
+    assert len(draws) == 1
+
+    # the cached figure is the one a fresh render draws
+    fresh = _render(job, tmp_path / "b")
+    assert [p.read_bytes() for p in fresh] == [p.read_bytes() for p in first]
+
+
+def test_changed_inputs_miss(question_jobs, tmp_path, draws, monkeypatch):
+    job = _job(question_jobs)
+    first = _render(job, tmp_path)
+    assert len(draws) == 1
+
+    # caption (catalog entry) -> redrawn under the same file name
+    recaptioned = _render(job, tmp_path, caption="Andere Beschriftung")
+    assert [p.name for p in recaptioned] == [p.name for p in first]
+    assert len(draws) == 2
+
+    # aggregate
+    pdata = job["plot_data"]
+    _render(job, tmp_path, caption="Andere Beschriftung", plot_data=dataclasses.replace(pdata, counts=pdata.counts + 1))
+    assert len(draws) == 3
+
+    # plotting_config constant
+    monkeypatch.setattr(cfg, "SAVE_DPI", cfg.SAVE_DPI + 1)
+    _render(job, tmp_path, caption="Andere Beschriftung", plot_data=dataclasses.replace(pdata, counts=pdata.counts + 1))
+    assert len(draws) == 4
+
+
+def test_missing_file_or_disabled_cache_redraws(question_jobs, tmp_path, draws, monkeypatch):
+    job = _job(question_jobs)
+    first = _render(job, tmp_path)
+    first[0].unlink()
+    assert _render(job, tmp_path)[0].exists()
+    assert len(draws) == 2
+
+    monkeypatch.setattr(cfg, "RENDER_CACHE", False)
+    _render(job, tmp_path)
+    assert len(draws) == 3
@@ -0,0 +1,27 @@
+from render_pool import init_worker, make_job, render_questions
+
+
+def _names(results):
+    return [[p.name for p in r["out_paths"]] for r in results]
+
+
+def test_pool_matches_serial(question_jobs, tmp_path):
+    init_worker()  # main applies the same backend / style before rendering serially
+    serial = list(render_questions(question_jobs, tmp_path / "serial", workers=1))
+    pooled = list(render_questions(question_jobs, tmp_path / "pooled", workers=3))
+
+    assert [r["status"] for r in pooled] == [r["status"] for r in serial]
+    assert _names(pooled) == _names(serial)
+    assert any(r["out_paths"] for r in serial)
+    for s, p in zip(serial, pooled):
+        for fs, fp in zip(s["out_paths"], p["out_paths"]):
+            assert fs.read_bytes() == fp.read_bytes(), fs.name
+
+
+def test_failure_stays_with_its_job(question_jobs, tmp_path):
+    broken = make_job(dict(question_jobs[0]["q"], question_text="kaputt"), plot_data=object(), prefix_index=99)
+    jobs = question_jobs[:2] + [broken] + question_jobs[2:3]
+    for workers in (1, 2):
+        results = list(render_questions(jobs, tmp_path / str(workers), workers=workers))
+        assert [r["status"] for r in results] == ["ok", "ok", "fail", "ok"]
+        assert "traceback" in results[2] and not results[2]["out_paths"]
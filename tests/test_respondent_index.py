@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing import encode_tidy
+from respondent_index import RespondentIndex
+from tidy_access import TidyStore
+
+
+def _filter(df, question, item=None, answers=None):
+    """the pandas filter the index replaces: respondents with (one of) the answers"""
+    m = (df["question_text"] == question) & df["answer"].notna()
+    if item is not None:
+        m &= df["item"] == item
+    if answers is not None:
+        m &= df["answer"].isin(answers)
+    return set(df.loc[m, "respondent_id"])
+
+
+def _lookups(df, rng):
+    """(question, item, answers) per question / item: any answer and a random answer subset"""
+    for (q, it), d in df[df["answer"].notna()].groupby(["question_text", df["item"].fillna("\0")], sort=False):
+        it = None if it == "\0" else it
+        answers = pd.unique(d["answer"])
+        subset = list(rng.choice(answers, size=max(1, len(answers) // 2), replace=False)) + ["gibt es nicht"]
+        yield q, it, None
+        yield q, it, subset
+        yield q, None, subset
+
+
+def test_bits_match_pandas_filters(survey):
+    _, df_tidy, _ = survey
+    rng = np.random.default_rng(0)
+    for layout in (lambda d: d, encode_tidy, lambda d: TidyStore(encode_tidy(d))):
+        idx = RespondentIndex(layout(df_tidy))
+        assert set(idx.respondents) == set(df_tidy["respondent_id"])
+        for q, it, answers in _lookups(df_tidy, rng):
+            bits = idx.bits(q, item=it, answers=answers)
+            assert set(idx.ids(bits)) == _filter(df_tidy, q, it, answers), (q, it, answers)
+            assert idx.count(bits) == len(_filter(df_tidy, q, it, answers))
+        assert not idx.ids(idx.bits("keine Frage")).size
+
+
+def test_set_algebra_and_membership(survey):
+    _, df, _ = survey
+    idx = RespondentIndex(df)
+    everyone = set(df["respondent_id"])
+    lookups = list(_lookups(df, np.random.default_rng(1)))[:30]
+    sets = [_filter(df, *k) for k in lookups]
+    bits = [idx.bits(q, item=it, answers=a) for q, it, a in lookups]
+    for (a, ba), (b, bb) in zip(zip(sets, bits), zip(sets[1:], bits[1:])):
+        assert set(idx.ids(ba & bb)) == a & b
+        assert set(idx.ids(ba | bb)) == a | b
+        assert set(idx.ids(idx.all() & ~ba)) == everyone - a
+
+    ids = np.concatenate([df["respondent_id"].unique(), [-5, 10 ** 9]])
+    for s, b in zip(sets, bits):
+        assert np.array_equal(idx.member(ids, b), pd.Series(ids).isin(s).to_numpy())
+    which = np.arange(len(ids)) % len(bits)
+    want = np.array([rid in sets[w] for rid, w in zip(ids, which)])
+    assert np.array_equal(idx.member_of(ids, which, np.stack(bits)), want)
+
+
+def test_other_bits_match_pandas():
+    df = pd.DataFrame({
+        "respondent_id": [1, 2, 3, 3, 4],
+        "question_text": ["Branche?"] * 5,
+        "item": [None] * 5,
+        "answer": ["Sonstiges", "IT", "Sonstiges", "Bau", "Sonstiges"],
+        "other_text": ["Chemie", None, "Pharma", None, "Chemie"],
+    })
+    idx = RespondentIndex(df)
+    for texts in (["Chemie"], ["Pharma", "Chemie"], ["Holz"]):
+        want = set(df.loc[(df["question_text"] == "Branche?") & df["other_text"].isin(texts), "respondent_id"])
+        assert set(idx.ids(idx.other_bits("Branche?", texts))) == want
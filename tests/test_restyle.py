@@ -0,0 +1,96 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+import src.plotting.plotting_config as cfg
+from Hypotheses import df_hypotheses_dict
+from Hypotheses.plotting_function_hypotheses import plot_hypotheses_and_save
+from Hypotheses.preprocessing_hypotheses import get_df_hypotheses, strong_answer_sets
+from Umfrage_JG_Analyse.plotting_function_jg_analyse.plot_jg_and_save import plot_jg_and_save
+from Umfrage_JG_Analyse.preprocessing_jg_analyse import df_jg_dict
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.finalize_output import get_df_jg
+from plot_data import PlotData, aggregate_questions, load_frames, load_plot_data, save_frames, save_plot_data
+from render_pool import init_worker, make_job, render_questions
+
+
+@pytest.fixture(scope="module")
+def results(survey):
+    """hypothesis + JG result frames of a full run (in-memory job cache)"""
+    catalog, df_tidy, _ = survey
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(cfg, "JOB_CACHE_DIR", None)
+        hypotheses = get_df_hypotheses(df_tidy, df_hypotheses_dict, strong_sets=strong_answer_sets(catalog))
+        jg = get_df_jg(df_jg_dict, {"df_tidy": df_tidy})
+    return hypotheses, jg
+
+
+def _pairs(v):
+    return v if isinstance(v, list) else [(None, v)]
+
+
+def _bytes(paths):
+    return [(p.name, p.read_bytes()) for p in paths]
+
+
+def test_plot_data_round_trip(survey, tmp_path):
+    catalog, df_tidy, base_map = survey
+    entries = main.plan_question_entries(catalog)
+    data = aggregate_questions([q for kind, q, _ in entries if kind == "plot"], df_tidy, base_map)
+    loaded = load_plot_data(save_plot_data(tmp_path / "questions.npz", data))
+
+    assert list(loaded) == list(data)
+    for key, v in data.items():
+        assert [it for it, _ in _pairs(loaded[key])] == [it for it, _ in _pairs(v)]
+        for (_, a), (_, b) in zip(_pairs(v), _pairs(loaded[key])):
+            for f in dataclasses.fields(PlotData):
+                x, y = getattr(a, f.name), getattr(b, f.name)
+                if isinstance(x, np.ndarray):
+                    assert x.dtype == y.dtype and np.array_equal(x, y), (key, f.name)
+                else:
+                    assert x == y, (key, f.name)
+
+    # plan (catalog entries + numbering) round trip
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(cfg, "PLOT_ENTRIES_PATH", tmp_path / "questions.json")
+        main.save_plot_entries(entries)
+        assert main.load_plot_entries() == entries
+
+
+def test_restyled_questions_match_full_run(question_jobs, tmp_path):
+    init_worker()
+    data = {j["q"]["question_text"]: j["plot_data"] for j in question_jobs}
+    loaded = load_plot_data(save_plot_data(tmp_path / "questions.npz", data))
+    restyle_jobs = [make_job(j["q"], loaded[j["q"]["question_text"]], j["prefix_index"]) for j in question_jobs]
+
+    full = list(render_questions(question_jobs, tmp_path / "full"))
+    restyled = list(render_questions(restyle_jobs, tmp_path / "restyle"))
+    assert [_bytes(r["out_paths"]) for r in restyled] == [_bytes(r["out_paths"]) for r in full]
+
+
+def test_result_frames_round_trip(results, tmp_path):
+    for name, frames in zip(("hypotheses", "jg"), results):
+        loaded = load_frames(save_frames(tmp_path / f"{name}.npz", frames))
+        assert list(loaded) == list(frames)
+        for key, v in frames.items():
+            if isinstance(v, pd.DataFrame):
+                pd.testing.assert_frame_equal(loaded[key], v, obj=key)
+            else:
+                pd.testing.assert_series_equal(loaded[key], v, obj=key)
+
+
+def test_restyled_results_match_full_run(results, tmp_path):
+    init_worker()
+    hypotheses, jg = results
+    hypotheses_r = load_frames(save_frames(tmp_path / "hypotheses.npz", hypotheses))
+    jg_r = load_frames(save_frames(tmp_path / "jg.npz", jg))
+
+    full_h, _ = plot_hypotheses_and_save(hypotheses, out_dir=tmp_path / "full_h")
+    restyled_h, _ = plot_hypotheses_and_save(hypotheses_r, out_dir=tmp_path / "restyle_h")
+    assert full_h and _bytes(restyled_h) == _bytes(full_h)
+
+    full_jg, _ = plot_jg_and_save(jg, out_dir=tmp_path / "full_jg")
+    restyled_jg, _ = plot_jg_and_save(jg_r, out_dir=tmp_path / "restyle_jg")
+    assert full_jg and _bytes(restyled_jg) == _bytes(full_jg)
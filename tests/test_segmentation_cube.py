@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.segmentation_cube import build_segmentation_cube
+
+SEG, MATRIX, BOX = "Unternehmensgröße", "Mehrwert", "Kennzahlen"
+SEGMENTATIONS = [{"key": "size", "question": SEG}, {"key": "class", "mapping": "m", "column": "klasse"}]
+
+
+def _tidy(n: int = 150, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for rid in range(1, n + 1):
+        rows.append((rid, SEG, None, rng.choice(["GU", "KMU"])))
+        for it in ["RFID", "KI"]:
+            if rng.random() < 0.8:
+                rows.append((rid, MATRIX, it, rng.choice(["Hoch", "Gering", "Keine Antwort", None])))
+        for a in "ABC":
+            if rng.random() < 0.4:
+                rows.append((rid, BOX, None, a))
+    return pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+
+
+def _mapping(df: pd.DataFrame) -> pd.DataFrame:
+    ids = df["respondent_id"].unique()
+    return pd.DataFrame({"respondent_id": ids, "klasse": np.where(ids % 3 == 0, "X", "Y")})
+
+
+def _members(df, mapping):
+    seg = df[df["question_text"] == SEG][["respondent_id", "answer"]].rename(columns={"answer": "segment"})
+    return {"size": seg, "class": mapping.rename(columns={"klasse": "segment"})}
+
+
+def test_table_matches_pandas():
+    df, mapping = _tidy(), _mapping(_tidy())
+    cube = build_segmentation_cube(df, SEGMENTATIONS, {"m": mapping})
+    for key, members in _members(df, mapping).items():
+        for q in (MATRIX, BOX):
+            got = cube.table(key, q)
+            d = df[df["question_text"] == q].merge(members, on="respondent_id")
+            by = ["segment", "answer"] if q == BOX else ["item", "segment", "answer"]
+            n = d.dropna(subset=["answer"]).groupby(by)["respondent_id"].nunique()
+            got_n = got.set_index(by if q == MATRIX else ["segment", "answer"])["n"]
+            assert got_n[got_n > 0].sort_index().to_dict() == n.sort_index().to_dict()
+            total = members.groupby("segment")["respondent_id"].nunique()
+            assert (got["total"].to_numpy() == got["segment"].map(total).to_numpy()).all()
+            if q == MATRIX:
+                rows = d.groupby(["item", "segment"])["respondent_id"].nunique()
+                want_rows = pd.Series(list(zip(got["item"], got["segment"]))).map(rows).to_numpy()
+                assert (got["rows"].to_numpy() == want_rows).all()
+
+
+def test_strong_table_matches_pandas():
+    df = _tidy(seed=2)
+    cube = build_segmentation_cube(df, SEGMENTATIONS[:1])
+    out = cube.strong_table({MATRIX: ["Hoch"]})
+    total = out[out["segmentation"] == "total"].set_index("item")
+    d = df[df["question_text"] == MATRIX]
+    assert total["n_strong"].to_dict() == d[d["answer"] == "Hoch"].groupby("item")["respondent_id"].nunique().to_dict()
+    valid = d[d["answer"].notna() & (d["answer"] != "Keine Antwort")]
+    assert total["n_valid"].to_dict() == valid.groupby("item")["respondent_id"].nunique().to_dict()
+
+
+def test_weighted_and_bootstrap_paths():
+    df, mapping = _tidy(seed=3), _mapping(_tidy(seed=3))
+    ones = pd.Series(1.0, index=df["respondent_id"].unique())
+    plain = build_segmentation_cube(df, SEGMENTATIONS, {"m": mapping})
+    weighted = build_segmentation_cube(df, SEGMENTATIONS, {"m": mapping}, weights=ones)
+    np.testing.assert_allclose(weighted.counts, plain.counts)
+    np.testing.assert_allclose(weighted.rows, plain.rows)
+    np.testing.assert_allclose(weighted.key_totals, plain.key_totals)
+
+    bs = {"replicates": 30, "seed": 0, "level": 0.9, "workers": 1}
+    t = plain.table("size", MATRIX, answers=["Hoch", "gibt es nicht"], bootstrap=bs)
+    pct = t["n"] / t["total"] * 100
+    ok = t["pct_lo"].notna()
+    assert ((t["pct_lo"][ok] <= pct[ok] + 1e-9) & (pct[ok] <= t["pct_hi"][ok] + 1e-9)).all()
+    assert (t.loc[t["answer"] == "gibt es nicht", "n"] == 0).all()
+
+
+def test_no_dense_answer_copies():
+    df = _tidy()
+    cube = build_segmentation_cube(df, SEGMENTATIONS[:1])
+    n_resp = df["respondent_id"].nunique()
+    arrays = {k: v for k, v in vars(cube).items() if isinstance(v, np.ndarray) and v.ndim == 2 and len(v) == n_resp}
+    assert set(arrays) == {"member", "codes"}
+    assert cube.member.dtype == bool and cube.codes.itemsize == 1
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from significance import attach_significance, fisher_exact_2x2
+
+
+def _hypothesis(rest: bool) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "initial_question_label": ["A", "B", "C"],
+        "yes_n": [30.0, 12.0, 20.0],
+        "no_n": [10.0, 14.0, 9.0],
+    })
+    if rest:  # checkbox grouping: respondents outside each group
+        df["rest_yes_n"] = [25.0, 40.0, 31.0]
+        df["rest_no_n"] = [20.0, 16.0, 21.0]
+    return df
+
+
+def test_overlapping_groups_tested_one_by_one():
+    (out,) = attach_significance([{"H": _hypothesis(rest=True)}], correction=None)
+    p = out["H"]["p_value"].to_numpy()
+    assert np.isfinite(p).all()
+    assert len(set(np.round(p, 12))) == 3  # one 2x2 per group, not one shared table
+
+    (single,) = attach_significance([{"H": _hypothesis(rest=False)}], correction=None)
+    assert single["H"]["p_value"].nunique() == 1
+
+
+def test_weighted_counts_use_effective_n():
+    weights = pd.Series([0.2] * 80 + [4.2] * 20)  # mean 1, Kish n_eff ~ 26 of 100
+    (plain,) = attach_significance([{"H": _hypothesis(rest=False)}], correction=None)
+    (weighted,) = attach_significance([{"H": _hypothesis(rest=False)}], correction=None, weights=weights)
+    assert weighted["H"]["p_value"].iloc[0] > plain["H"]["p_value"].iloc[0]
+
+
+def test_fisher_rounds_float_counts():
+    t = np.array([[[2.9, 0.2], [0.1, 2.8]]])
+    assert np.allclose(fisher_exact_2x2(t), fisher_exact_2x2(np.array([[[3, 0], [0, 3]]])))
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+import src.plotting.plotting_config as cfg
+from preprocessing import prepare_data
+
+pytestmark = pytest.mark.skipif(not cfg.EXCEL_PATH.exists(), reason="survey export not available")
+
+
+def _prepare(chunksize):
+    return prepare_data(cfg.EXCEL_PATH, cfg.FIRST_QUESTION_TEXT, spec_path=cfg.SPEC_PATH, chunksize=chunksize)
+
+
+def test_streaming_df_tidy_equals_in_memory():
+    _, _, catalog, df_tidy, base_map = _prepare(None)
+    _, _, catalog_s, df_tidy_s, base_map_s = _prepare(7)  # chunks smaller than any question block
+
+    assert catalog_s == catalog
+    assert base_map_s == base_map
+    pd.testing.assert_frame_equal(df_tidy_s, df_tidy)
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from Hypotheses.preprocessing_hypotheses import strong_series
+from Umfrage_JG_Analyse.preprocessing_jg_analyse.segmentation_cube import TOTAL_SEGMENT, TOTAL_SEGMENTATION
+
+Q = "Wo erwarten Sie Hemmnisse?"
+
+
+def _ranking(items, n_strong) -> pd.DataFrame:
+    return pd.DataFrame({
+        "segmentation": TOTAL_SEGMENTATION,
+        "segment": TOTAL_SEGMENT,
+        "question_text": Q,
+        "item": items,
+        "n_strong": n_strong,
+        "n_valid": 40,
+    })
+
+
+def test_ties_ordered_by_item_label():
+    # rows in order of first appearance in the data: the tied item seen first sorts last
+    s = strong_series(_ranking(["Produktdesign", "Rückwärtslogistik", "Demontage", "Befundung", "Remontage"],
+                               [20, 33, 20, 23, 0]), Q)
+    assert list(s.index) == ["Rückwärtslogistik", "Befundung", "Demontage", "Produktdesign"]
+    assert list(s) == [33, 23, 20, 20]
+
+
+def test_order_independent_of_row_order():
+    items = ["Endprüfung", "Definition", "Demontage", "Produktdesign"]
+    n = [13, 13, 20, 20]
+    a = strong_series(_ranking(items, n), Q)
+    b = strong_series(_ranking(items[::-1], n[::-1]), Q)
+    assert list(a.index) == list(b.index) == ["Demontage", "Produktdesign", "Definition", "Endprüfung"]
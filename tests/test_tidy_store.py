@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing import encode_tidy
+from tidy_access import TidyStore, select_question, select_questions
+
+
+def _tidy() -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    questions = ["Q1", "Q2", "Q3"]
+    rows = []
+    for r in range(1, 41):
+        for q in rng.permutation(questions):  # questions interleaved, like melted + virtual rows
+            for item in ([None] if q == "Q1" else ["A", "B"]):
+                if rng.random() < 0.8:
+                    rows.append((r, q, item, rng.choice(["Ja", "Nein", "Keine Antwort"])))
+    df = pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+    return df.set_axis(np.arange(len(df)) * 3 + 7)  # non-default index labels
+
+
+def test_slices_equal_boolean_masks():
+    df = _tidy()
+    for frame in (df, encode_tidy(df)):
+        store = TidyStore(frame, by_item=True)
+        for q in ["Q1", "Q2", "Q3", "missing"]:
+            pd.testing.assert_frame_equal(select_question(store, q), select_question(frame, q))
+            if frame is df:
+                pd.testing.assert_frame_equal(select_question(store, q), df[df["question_text"] == q])
+        for item in ["A", "B"]:
+            pd.testing.assert_frame_equal(select_question(store, "Q2", item=item), select_question(frame, "Q2", item=item))
+        pd.testing.assert_frame_equal(select_questions(store, ["Q3", "Q1"]), select_questions(frame, ["Q3", "Q1"]))
+
+
+def test_store_keeps_one_frame():
+    df = _tidy()
+    store = TidyStore(df)
+    pd.testing.assert_frame_equal(store.df, df)  # original order rebuilt on demand
+    assert len(store) == len(df)
+    assert not any(isinstance(v, pd.DataFrame) for k, v in vars(store).items() if k != "_frame")
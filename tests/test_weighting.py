@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import plan_question_entries
+from plot_data import aggregate_question
+from weighting import rake, rake_weights, weighted_nunique, weighted_value_counts
+
+SIZE, SECTOR, TOOLS = "Größe?", "Branche?", "Werkzeuge?"
+TARGETS = {
+    SIZE: {"GU": 0.3, "KMU": 0.7},
+    SECTOR: {"IT": 0.2, "Bau": 0.5, "Chemie": 0.3},
+    TOOLS: {"ERP": 0.6, "MES": 0.25},
+}
+
+
+def _tidy(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for rid in range(1, n + 1):
+        rows.append((rid, SIZE, None, rng.choice(["GU", "KMU"], p=[0.6, 0.4])))
+        rows.append((rid, SECTOR, None, rng.choice(["IT", "Bau", "Chemie", "Keine Antwort"], p=[0.4, 0.2, 0.3, 0.1])))
+        if rng.random() < 0.8:  # asked the checkbox question
+            picked = [o for o, p in (("ERP", 0.3), ("MES", 0.5), ("CAD", 0.4)) if rng.random() < p] or ["CAD"]
+            rows += [(rid, TOOLS, None, o) for o in picked]
+    return pd.DataFrame(rows, columns=["respondent_id", "question_text", "item", "answer"])
+
+
+def _shares(df: pd.DataFrame, w: pd.Series, question: str, answers) -> np.ndarray:
+    """weighted share of each answer among the respondents with one of the listed answers"""
+    d = df[(df["question_text"] == question) & df["answer"].isin(answers)].drop_duplicates(["respondent_id", "answer"])
+    per = d.assign(w=d["respondent_id"].map(w)).groupby("answer")["w"].sum()
+    base = w[d["respondent_id"].unique()].sum()
+    return per.reindex(answers).to_numpy() / base
+
+
+def test_raked_weights_hit_their_targets():
+    df = _tidy()
+    w = rake_weights(df, TARGETS, tol=1e-10, max_iter=500)
+    assert w.index.tolist() == df["respondent_id"].unique().tolist()
+    assert w.mean() == pytest.approx(1.0) and (w > 0).all()
+
+    for q in (SIZE, SECTOR):
+        answers = list(TARGETS[q])
+        want = np.array([TARGETS[q][a] for a in answers])
+        np.testing.assert_allclose(_shares(df, w, q, answers), want / want.sum(), rtol=1e-6)
+
+    # checkbox: share of the respondents of the question selecting each option
+    asked = df.loc[df["question_text"] == TOOLS, "respondent_id"].unique()
+    for option, p in TARGETS[TOOLS].items():
+        picked = df.loc[(df["question_text"] == TOOLS) & (df["answer"] == option), "respondent_id"].unique()
+        assert w[picked].sum() / w[asked].sum() == pytest.approx(p, rel=1e-6)
+
+
+def test_targets_already_met_give_unit_weights():
+    df = _tidy()
+    sizes = df[df["question_text"] == SIZE]["answer"].value_counts(normalize=True).to_dict()
+    w = rake_weights(df, {SIZE: sizes})
+    np.testing.assert_allclose(w.to_numpy(), 1.0)
+
+
+def test_rake_warns_without_convergence():
+    cat = np.array([0, 0, 1, 1])
+    margins = [(cat, np.array([0.5, 0.5])), (np.array([0, 1, 0, 1]), np.array([0.9, 0.1])), (np.array([0, 1, 1, 0]), np.array([0.1, 0.9]))]
+    with pytest.warns(UserWarning, match="did not converge"):
+        rake(margins, 4, max_iter=2)
+
+
+def test_weighted_counts_match_plain_counts():
+    df = _tidy()
+    ones = pd.Series(1.0, index=df["respondent_id"].unique())
+    for dropna in (True, False):
+        plain, weighted = weighted_value_counts(df, None, dropna=dropna), weighted_value_counts(df, ones, dropna=dropna)
+        assert weighted.index.tolist() == plain.index.tolist()
+        np.testing.assert_allclose(weighted.to_numpy(), plain.to_numpy())
+    assert weighted_nunique(df, ones) == weighted_nunique(df, None)
+    pd.testing.assert_series_equal(weighted_nunique(df, ones, by="question_text"),
+                                   weighted_nunique(df, None, by="question_text").astype(float), check_names=False)
+
+
+def test_unit_weights_match_unweighted_aggregates(survey):
+    catalog, df_tidy, base_map = survey
+    ones = pd.Series(1.0, index=pd.unique(df_tidy["respondent_id"]))
+    for kind, q, _ in plan_question_entries(catalog):
+        if kind != "plot":
+            continue
+        plain, weighted = aggregate_question(q, df_tidy, base_map), aggregate_question(q, df_tidy, base_map, weights=ones)
+        pairs = zip(plain, weighted) if isinstance(plain, list) else [((None, plain), (None, weighted))]
+        for (_, a), (_, b) in pairs:
+            assert a.labels == b.labels, q["question_text"]
+            np.testing.assert_allclose(a.counts, b.counts)
+            np.testing.assert_allclose(a.pcts, b.pcts)
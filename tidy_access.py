@@ -0,0 +1,192 @@
+# tidy_access.py
+"""
+Read access to df_tidy for plots and analysis jobs.
+
+df_tidy is either
+  - a plain frame,
+  - a dictionary-encoded frame (categorical question_text / item / answer,
+    see preprocessing.encode_tidy), or
+  - a TidyStore (question-partitioned index over one of the above).
+Plots and analysis jobs always slice through select_question() / select_questions()
+and get a plain frame back (object columns), so they never depend on the layout:
+  - on a frame the filter runs as one vectorized scan (on the codes if encoded)
+  - on a TidyStore a question is a contiguous row range -> no scan at all
+  - only the (small) slice is decoded
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# pd.NA cells of an encoded column: a category of their own (categories cannot hold
+# pd.NA next to NaN, both would end up as NaN), mapped back to pd.NA when decoding
+NA_CATEGORY = "\x00<NA>"
+
+
+def is_categorical(s: pd.Series) -> bool:
+    return isinstance(s.dtype, pd.CategoricalDtype)
+
+
+def decode_column(s: pd.Series) -> pd.Series:
+    """categorical -> object column, NA_CATEGORY -> pd.NA (other columns unchanged)"""
+    if not is_categorical(s):
+        return s
+    out = s.astype(object)
+    if NA_CATEGORY in s.cat.categories:
+        out[(s == NA_CATEGORY).to_numpy()] = pd.NA
+    return out
+
+
+def decode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """categorical columns -> object columns (in place, returns df)"""
+    for c in df.columns:
+        if is_categorical(df[c]):
+            df[c] = decode_column(df[c])
+    return df
+
+
+def _slice(df_tidy: pd.DataFrame, mask, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    cols = list(columns) if columns is not None else df_tidy.columns
+    return decode_categoricals(df_tidy.loc[mask, cols].copy())
+
+
+def _take(frame: pd.DataFrame, rows, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """rows: slice or positions into frame"""
+    if columns is not None:
+        frame = frame[list(columns)]
+    return decode_categoricals(frame.iloc[rows].copy())
+
+
+#---------------------
+#TIDY STORE
+#---------------------
+
+class TidyStore:
+    """
+    Question-partitioned view of df_tidy, built once (prepare_data(tidy_store=True)).
+
+    The rows are stably sorted by question (questions in order of first appearance),
+    so every question is one contiguous row range of the sorted frame:
+      - question(q)      -> frame.iloc[start:stop], a view, no copy and no scan
+      - item partitions  -> row positions per (question, item), built with by_item=True
+    Within a question the original row order and index labels are kept, so slices
+    are identical to the boolean-mask slices on the original frame.
+
+    Only the sorted frame is kept (no second copy of the largest table): .df rebuilds
+    the original row order on demand (exports, code that needs the whole table), so
+    do not hold on to it longer than needed.
+    .answers is the dense answer-code matrix (answer_matrix.py) when built,
+    .respondent_index the bitmap index (respondent_index.py) when built,
+    .likert the ordinal Likert codes (likert_codes.py) when built.
+    """
+
+    def __init__(self, df_tidy: pd.DataFrame, by_item: bool = False):
+        self.answers = None
+        self.respondent_index = None
+        self.likert = None
+
+        codes, uniques = pd.factorize(df_tidy["question_text"], sort=False)
+        order = np.argsort(codes, kind="stable")
+        self._frame = df_tidy.iloc[order]
+        self._pos = order  # original row position of every sorted row
+        self._inverse = np.empty_like(order)  # sorted row position of every original row
+        self._inverse[order] = np.arange(len(order))
+
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self._ranges: Dict[str, Tuple[int, int]] = {
+            q: (int(bounds[i]), int(bounds[i + 1])) for i, q in enumerate(uniques)
+        }
+
+        self._items: Optional[Dict[Tuple[str, str], np.ndarray]] = None
+        if by_item:
+            self._items = {}
+            for q, (start, stop) in self._ranges.items():
+                item_codes, item_uniques = pd.factorize(self._frame["item"].iloc[start:stop], sort=False)
+                for j, it in enumerate(item_uniques):
+                    self._items[(q, it)] = start + np.flatnonzero(item_codes == j)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """the frame in its original row order (a new copy per call)"""
+        return self._frame.iloc[self._inverse]
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    def __contains__(self, question_text: str) -> bool:
+        return question_text in self._ranges
+
+    @property
+    def questions(self) -> List[str]:
+        return list(self._ranges)
+
+    def question(self, question_text: str) -> pd.DataFrame:
+        """Rows of one question as a view (do not modify; use select_question for a copy)."""
+        start, stop = self._ranges.get(question_text, (0, 0))
+        return self._frame.iloc[start:stop]
+
+    def rows(self, question_text: str, item: Optional[str] = None):
+        """slice (whole question) or positions (one item) into the sorted frame"""
+        start, stop = self._ranges.get(question_text, (0, 0))
+        if item is None:
+            return slice(start, stop)
+        if self._items is not None:
+            return self._items.get((question_text, item), np.empty(0, dtype=np.intp))
+        items = self._frame["item"].iloc[start:stop].to_numpy()
+        return start + np.flatnonzero(items == item)
+
+    def rows_many(self, question_texts: Sequence[str]) -> np.ndarray:
+        """positions into the sorted frame, in original row order"""
+        parts = [np.arange(*self._ranges[q]) for q in dict.fromkeys(question_texts) if q in self._ranges]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        rows = np.concatenate(parts)
+        return rows[np.argsort(self._pos[rows], kind="stable")]
+
+
+TidyLike = Union[pd.DataFrame, TidyStore]
+
+
+def as_frame(df_tidy: TidyLike) -> pd.DataFrame:
+    """the full df_tidy frame behind a frame or a TidyStore"""
+    return df_tidy.df if isinstance(df_tidy, TidyStore) else df_tidy
+
+
+#---------------------
+#SELECTION
+#---------------------
+
+def select_question(
+    df_tidy: TidyLike,
+    question_text: str,
+    item: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Rows of one question (optionally one item), as a plain copy.
+    Same result as df_tidy[df_tidy["question_text"] == question_text].copy()
+    """
+    if isinstance(df_tidy, TidyStore):
+        return _take(df_tidy._frame, df_tidy.rows(question_text, item), columns)
+
+    mask = df_tidy["question_text"] == question_text
+    if item is not None:
+        mask &= df_tidy["item"] == item
+    return _slice(df_tidy, mask, columns)
+
+
+def select_questions(
+    df_tidy: TidyLike,
+    question_texts: List[str],
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Rows of several questions (original row order), as a plain copy."""
+    if isinstance(df_tidy, TidyStore):
+        return _take(df_tidy._frame, df_tidy.rows_many(question_texts), columns)
+
+    mask = df_tidy["question_text"].isin(question_texts)
+    return _slice(df_tidy, mask, columns)
@@ -0,0 +1,232 @@
+# weighting.py
+"""
+Survey weights by raking (iterative proportional fitting) to population marginals.
+
+Targets are declared per question in QUESTION_LIST.WEIGHTING_TARGETS:
+    {question_text: {answer: population share}}
+  - single / likert question   one margin over the listed answers
+  - checkbox question          one binary margin per listed option
+                               (share of respondents selecting it)
+Shares are normalized per margin. Respondents without a listed answer (no answer,
+"Keine Antwort", not asked) are not part of that margin and keep their weight there.
+Answers without any respondent in the sample are dropped from the margin (warning).
+
+The raking runs on the answer matrix (answer_matrix.py): every margin is a category
+code per respondent, and one IPF step is
+    current = bincount(category, weights=w)      w *= (target / current)[category]
+so a sweep over all margins is a few array operations, independent of df_tidy.
+Final weights are scaled to mean 1, so weighted counts stay on the sample scale.
+
+Counting with weights (weights = None -> the plain unweighted counts):
+  - weighted_value_counts   value_counts of a df_tidy slice
+  - weighted_nunique        (groupby-)nunique of respondents
+  - weights_for             weight per respondent id (e.g. answer matrix rows)
+  - weighted_base_map       base_map with sums of weights
+The weights (pd.Series, index respondent_id) are the context value "weights" of the
+analysis jobs (df_jg_dict, df_hypotheses_dict).
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from answer_matrix import AnswerMatrix, answer_matrix_of
+from tidy_access import TidyLike
+
+COL_ID = "respondent_id"
+
+
+def weighting_settings(cfg) -> Optional[Dict[str, Any]]:
+    """settings dict from the WEIGHTING_* config constants (None if switched off)"""
+    if not cfg.WEIGHTING:
+        return None
+    return {
+        "max_iter": int(cfg.WEIGHTING_MAX_ITER),
+        "tol": float(cfg.WEIGHTING_TOL),
+    }
+
+
+#---------------------
+#RAKING
+#---------------------
+
+def _margin(am: AnswerMatrix, question: str, item: Optional[str], shares: Dict[str, float]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(category per respondent (-1: not in the margin), target shares) of one column"""
+    j = am.column(question, item)
+    if j < 0:
+        warnings.warn(f"Weighting: no answers for {question!r} / {item!r}, margin skipped")
+        return None
+    book = am.codebooks[j]
+    codes = am.codes[:, j].astype(np.intp)
+
+    if am.multi[j]:
+        # checkbox option: selected (0) / not selected (1) among respondents of the question
+        answered = np.zeros(am.n_respondents, dtype=bool)
+        for k in am.question_columns(question):
+            answered |= am.codes[:, k] >= 0
+        p = float(shares[item])
+        cat = np.where(answered, np.where(codes >= 0, 0, 1), -1)
+        labels, target = ["selected", "not selected"], np.array([p, 1.0 - p])
+    else:
+        labels = list(shares)
+        local = np.full(len(book) + 1, -1, dtype=np.intp)  # last slot: NO_ROW / NA_ANSWER
+        for n, a in enumerate(labels):
+            if a in book:
+                local[book.index(a)] = n
+        cat = local[np.where(codes >= 0, codes, len(book))]
+        target = np.array([float(shares[a]) for a in labels])
+
+    observed = np.bincount(cat[cat >= 0], minlength=len(labels)) > 0
+    missing = [a for a, o, t in zip(labels, observed, target) if not o and t > 0]
+    if missing:
+        warnings.warn(f"Weighting: no respondents with {missing} for {question!r}, dropped from the margin")
+    target = np.where(observed, target, 0.0)
+    if target.sum() <= 0:
+        return None
+    return cat, target / target.sum()
+
+
+def _margins(am: AnswerMatrix, targets: Dict[str, Dict[str, float]]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    out = []
+    for question, shares in targets.items():
+        cols = am.question_columns(question)
+        if cols and am.multi[cols[0]]:
+            specs = [(question, option, {option: p}) for option, p in shares.items()]
+        else:
+            specs = [(question, None, shares)]
+        for q, item, s in specs:
+            m = _margin(am, q, item, s)
+            if m is not None:
+                out.append(m)
+    return out
+
+
+def rake(
+    margins: Sequence[Tuple[np.ndarray, np.ndarray]],
+    n: int,
+    max_iter: int = 100,
+    tol: float = 1e-6,
+) -> Tuple[np.ndarray, int]:
+    """
+    IPF weights for n respondents; margins: (category per respondent, -1 = not in the
+    margin; target shares per category). Returns (weights with mean 1, sweeps used).
+    Converged when every margin is within tol (relative) of its target totals.
+    """
+    w = np.ones(n, dtype=np.float64)
+    prepared = []
+    for cat, shares in margins:
+        ok = cat >= 0
+        # target totals: share x respondents in the margin
+        prepared.append((ok, cat[ok], shares * ok.sum()))
+
+    sweeps = 0
+    for sweeps in range(1, max_iter + 1):
+        deviation = 0.0
+        for ok, cat, target in prepared:
+            current = np.bincount(cat, weights=w[ok], minlength=len(target))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                factor = np.where(current > 0, target / current, 1.0)
+                deviation = max(deviation, float(np.nanmax(np.abs(current / target - 1.0), initial=0.0, where=target > 0)))
+            w[ok] *= factor[cat]
+        if deviation < tol:
+            break
+    else:
+        warnings.warn(f"Weighting: raking did not converge in {max_iter} sweeps (deviation {deviation:.2e})")
+
+    return w / w.mean() if n else w, sweeps
+
+
+def rake_weights(
+    df_tidy: TidyLike,
+    targets: Dict[str, Dict[str, float]],
+    max_iter: int = 100,
+    tol: float = 1e-6,
+) -> pd.Series:
+    """weight per respondent (index respondent_id, order of the answer matrix)"""
+    am = answer_matrix_of(df_tidy)
+    w, _ = rake(_margins(am, targets), am.n_respondents, max_iter=max_iter, tol=tol)
+    return pd.Series(w, index=pd.Index(am.respondents, name=COL_ID), name="weight")
+
+
+def describe_weights(weights: pd.Series) -> Dict[str, float]:
+    """min / max weight and Kish effective sample size"""
+    w = weights.to_numpy(float)
+    return {
+        "n": float(len(w)),
+        "min": float(w.min()) if len(w) else np.nan,
+        "max": float(w.max()) if len(w) else np.nan,
+        "n_effective": float(w.sum() ** 2 / (w ** 2).sum()) if len(w) else 0.0,
+    }
+
+
+#---------------------
+#WEIGHTED COUNTING
+#---------------------
+
+def weights_for(weights: Optional[pd.Series], respondent_ids) -> np.ndarray:
+    """weight per given respondent id (None or unknown ids -> 1.0)"""
+    ids = pd.Index(np.asarray(respondent_ids))
+    if weights is None:
+        return np.ones(len(ids), dtype=np.float64)
+    return weights.reindex(ids).fillna(1.0).to_numpy(np.float64)
+
+
+def weighted_value_counts(
+    d: pd.DataFrame,
+    weights: Optional[pd.Series],
+    column: str = "answer",
+    dropna: bool = True,
+) -> pd.Series:
+    """d[column].value_counts(), each row counted with the weight of its respondent"""
+    if weights is None:
+        return d[column].value_counts(dropna=dropna)
+    # the keys of value_counts (NaN / <NA> / None apart, first appearance) and its sort,
+    # so labels and the order of ties match the unweighted counts
+    keys = d[column].value_counts(dropna=dropna, sort=False).index
+    pos = keys.get_indexer(d[column])
+    ok = pos >= 0
+    w = weights_for(weights, d[COL_ID])
+    counts = pd.Series(np.bincount(pos[ok], weights=w[ok], minlength=len(keys)), index=keys, name="count")
+    return counts.sort_values(ascending=False)
+
+
+def weighted_nunique(
+    d: pd.DataFrame,
+    weights: Optional[pd.Series],
+    by: Union[str, List[str], None] = None,
+) -> Union[float, pd.Series]:
+    """
+    Distinct respondents (sum of their weights) of d, or per group of `by`
+    (like d.groupby(by)[respondent_id].nunique()).
+    """
+    if weights is None:
+        if by is None:
+            return d[COL_ID].nunique()
+        return d.groupby(by)[COL_ID].nunique()
+    keys = ([by] if isinstance(by, str) else list(by or [])) + [COL_ID]
+    first = d.drop_duplicates(keys)
+    w = pd.Series(weights_for(weights, first[COL_ID]), index=first.index, name=COL_ID)
+    if by is None:
+        return float(w.sum())
+    groups = first[by] if isinstance(by, str) else [first[k] for k in by]
+    return w.groupby(groups).sum()
+
+
+def weighted_base_map(
+    df_tidy: TidyLike,
+    catalog: Sequence[Dict[str, Any]],
+    weights: pd.Series,
+) -> Dict[str, float]:
+    """base_map (respondents with any answer per question) as sums of weights"""
+    am = answer_matrix_of(df_tidy)
+    w = weights_for(weights, am.respondents)
+    base_map: Dict[str, float] = {}
+    for q in catalog:
+        cols = am.question_columns(q["question_text"])
+        answered = (am.codes[:, cols] >= 0).any(axis=1) if cols else np.zeros(am.n_respondents, dtype=bool)
+        base_map[q["question_text"]] = float(w[answered].sum())
+    return base_map